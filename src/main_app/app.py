@@ -1,14 +1,93 @@
 """Main FastHTML application entry point."""
 
+import json
+from functools import partial
 from pathlib import Path
 
 from fasthtml.common import *
 from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.middleware.gzip import GZipMiddleware
 from starlette.requests import Request
 from starlette.responses import HTMLResponse
 
-from .utils.content import get_pygments_css, load_recent_posts
+from .components import SCRIPT_SRC, Layout, is_partial
+from .utils.cache import backend_from_env, set_backend
+from .utils.compression import CompressionMiddleware
+from .utils.content import get_pygments_css, load_all_posts, load_posts_by_tag, load_recent_posts
+from .utils.fastpath import FastPathMiddleware, FastRoute
+from .utils.feeds import FEED_FORMATS, build_robots_txt, build_sitemap, serialize_feed
+from .utils.metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE
+from .utils.metrics import MetricsMiddleware, render_metrics
+from .utils.pagecache import PageCacheMiddleware
+from .utils.profiling import ProfilingMiddleware, configure_from_env
+from .utils.ratelimit import RateLimitMiddleware, limiter_from_env
+from .utils.timing import ServerTimingMiddleware, begin_handler_phase, end_handler_phase
+
+SECURITY_HEADERS = {
+    "Content-Security-Policy": (
+        "default-src 'self'; "
+        "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
+        "font-src 'self' https://fonts.gstatic.com; "
+        "img-src 'self' data:; "
+        "connect-src 'self'; "
+        f"script-src {SCRIPT_SRC}; "
+        "object-src 'none'; "
+        "base-uri 'self'; "
+        "form-action 'self'; "
+        "upgrade-insecure-requests"
+    ),
+    "Referrer-Policy": "strict-origin-when-cross-origin",
+    "X-Content-Type-Options": "nosniff",
+    "X-Frame-Options": "DENY",
+    "Permissions-Policy": "geolocation=(), microphone=(), camera=()",
+}
+
+HEALTH = {"status": "healthy", "service": "personal-website"}
+
+FEED_CACHE_CONTROL = "public, max-age=300"
+
+
+def feed_route(name: str, tag: str | None = None) -> FastRoute:
+    """Fast route serving a feed from precompressed bytes.
+
+    Args:
+        name: Feed file name, a key of ``FEED_FORMATS``
+        tag: Tag whose feed to serve, or None for the site feed
+
+    Returns:
+        Fast route labelled with the feed's route template
+    """
+    route_path = f"/{name}" if tag is None else f"/tags/{{tag}}/{name}"
+    media_type = FEED_FORMATS[name][1]
+    return FastRoute(
+        partial(serialize_feed, name, tag), media_type, FEED_CACHE_CONTROL, route_path=route_path, precompress=True
+    )
+
+
+def resolve_tag_feed(path: str) -> FastRoute | None:
+    """Fast route for a tag feed path such as ``/tags/python/atom.xml``.
+
+    Only tags that have posts and are spelled in their normalized form are
+    resolved; anything else falls through to the router. Resolving runs on the
+    event loop, so it only looks the tag up in the tag index and leaves
+    building the feed to the fast path's worker thread.
+
+    Args:
+        path: Request path
+
+    Returns:
+        The tag feed's fast route, or None
+    """
+    prefix, _, name = path.rpartition("/")
+    if name not in FEED_FORMATS or not prefix.startswith("/tags/"):
+        return None
+    tag = prefix.removeprefix("/tags/")
+    if not tag or "/" in tag or tag != tag.lower().strip() or not load_posts_by_tag(tag):
+        return None
+    return feed_route(name, tag)
+
+
+# Request headers that select between partial and full HTML pages
+PARTIAL_VARY = ("HX-Request", "HX-History-Restore-Request")
 
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -25,26 +104,7 @@ class SecurityHeadersMiddleware(BaseHTTPMiddleware):
             HTTP response with security headers added
         """
         response = await call_next(request)
-
-        csp = (
-            "default-src 'self'; "
-            "style-src 'self' 'unsafe-inline' https://fonts.googleapis.com; "
-            "font-src 'self' https://fonts.gstatic.com; "
-            "img-src 'self' data:; "
-            "connect-src 'self'; "
-            "script-src 'self'; "
-            "object-src 'none'; "
-            "base-uri 'self'; "
-            "form-action 'self'; "
-            "upgrade-insecure-requests"
-        )
-        response.headers["Content-Security-Policy"] = csp
-
-        response.headers["Referrer-Policy"] = "strict-origin-when-cross-origin"
-        response.headers["X-Content-Type-Options"] = "nosniff"
-        response.headers["X-Frame-Options"] = "DENY"
-        response.headers["Permissions-Policy"] = "geolocation=(), microphone=(), camera=()"
-
+        response.headers.update(SECURITY_HEADERS)
         return response
 
 
@@ -65,7 +125,7 @@ class CacheControlMiddleware(BaseHTTPMiddleware):
 
         if request.url.path.startswith("/static/"):
             response.headers["Cache-Control"] = "public, max-age=31536000"
-        elif request.url.path == "/health":
+        elif request.url.path in ("/health", "/metrics") or request.url.path.startswith("/admin/"):
             response.headers["Cache-Control"] = "no-store"
         else:
             response.headers["Cache-Control"] = "public, max-age=300"
@@ -79,6 +139,10 @@ class NavigationMiddleware(BaseHTTPMiddleware):
     async def dispatch(self, request: Request, call_next) -> Response:
         """Add recent posts to request state for navigation menu.
 
+        Partial (htmx) navigations render no sidebar or head, so they skip the
+        navigation context. HTML responses vary on ``HX-Request``, so browser
+        and shared caches keep partial and full pages apart.
+
         Args:
             request: The incoming HTTP request
             call_next: The next middleware or route handler
@@ -86,23 +150,48 @@ class NavigationMiddleware(BaseHTTPMiddleware):
         Returns:
             HTTP response with navigation context added
         """
-        request.state.recent_posts = load_recent_posts(limit=3)
-        request.state.pygments_css = get_pygments_css()
+        if not is_partial(request):
+            request.state.recent_posts = load_recent_posts(limit=3)
+            request.state.pygments_css = get_pygments_css()
         response = await call_next(request)
+        if response.headers.get("content-type", "").startswith("text/html"):
+            vary = [value.strip() for value in response.headers.get("Vary", "").split(",") if value.strip()]
+            missing = [name for name in PARTIAL_VARY if name.lower() not in {value.lower() for value in vary}]
+            if missing:
+                response.headers["Vary"] = ", ".join(vary + missing)
         return response
 
 
-app = FastHTML()
+app = FastHTML(before=begin_handler_phase, after=end_handler_phase)
 
-app.add_middleware(GZipMiddleware, minimum_size=1000)
+app.add_middleware(PageCacheMiddleware, vary=PARTIAL_VARY)
+app.add_middleware(CompressionMiddleware, minimum_size=1000)
 app.add_middleware(SecurityHeadersMiddleware)
 app.add_middleware(CacheControlMiddleware)
 app.add_middleware(NavigationMiddleware)
+app.add_middleware(
+    FastPathMiddleware,
+    routes={
+        "/health": FastRoute(lambda: json.dumps(HEALTH, separators=(",", ":")), "application/json", "no-store", False),
+        "/robots.txt": FastRoute(build_robots_txt, "text/plain; charset=utf-8", "public, max-age=300", False),
+        **{f"/{name}": feed_route(name) for name in FEED_FORMATS},
+        "/sitemap.xml": FastRoute(lambda: build_sitemap(load_all_posts()), "application/xml", "public, max-age=300"),
+    },
+    headers=SECURITY_HEADERS,
+    minimum_size=1000,
+    resolve=resolve_tag_feed,
+)
+app.add_middleware(ProfilingMiddleware)
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ServerTimingMiddleware)
+app.add_middleware(RateLimitMiddleware, limiter=limiter_from_env(), headers=SECURITY_HEADERS)
 
 static_dir = Path(__file__).parent / "static"
 app.mount("/static", StaticFiles(directory=static_dir), name="static")
 
 from .routes.about import register_about_routes
+from .routes.admin import register_admin_routes
+from .routes.archive import register_archive_routes
 from .routes.home import register_home_routes
 from .routes.posts import register_post_routes
 from .routes.tags import register_tag_routes
@@ -111,6 +200,11 @@ register_home_routes(app)
 register_about_routes(app)
 register_post_routes(app)
 register_tag_routes(app)
+register_archive_routes(app)
+register_admin_routes(app)
+
+configure_from_env()
+set_backend(backend_from_env())
 
 
 @app.get("/health")
@@ -120,7 +214,17 @@ def health_check():
     Returns:
         Dictionary containing service health status and name
     """
-    return {"status": "healthy", "service": "personal-website"}
+    return HEALTH
+
+
+@app.get("/metrics")
+def metrics():
+    """Metrics endpoint in the Prometheus text exposition format.
+
+    Returns:
+        Plain text response with request, cache and content metrics
+    """
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
 
 
 @app.exception_handler(404)
@@ -134,8 +238,6 @@ def not_found(request, exc):
     Returns:
         HTML response containing styled 404 page
     """
-    from .components import Layout
-
     page_content = (
         H1("Page Not Found", cls="post-title"),
         P("Sorry, the page you're looking for doesn't exist."),
@@ -143,7 +245,7 @@ def not_found(request, exc):
     )
 
     layout_content = Layout(request, *page_content, title="Not Found")
-    return HTMLResponse(str(layout_content), status_code=404)
+    return HTMLResponse(to_xml(layout_content), status_code=404)
 
 
 if __name__ == "__main__":
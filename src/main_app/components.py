@@ -1,19 +1,83 @@
 """Reusable UI components for the FastHTML blog application."""
 
+import json
+from pathlib import Path
+
 from fasthtml.common import *
 
+STREAM_SLOT = "<!--stream-slot-->"
+
+# The htmx build FastHTML pins, and where the Docker build vendors it
+HTMX_CDN = htmxsrc.attrs["src"]
+HTMX_VENDORED = "/static/js/htmx.min.js"
+
+
+def _htmx_src(static_dir: Path) -> str:
+    """URL htmx is loaded from: the vendored copy when present, else the pinned CDN build.
+
+    Args:
+        static_dir: Directory mounted at ``/static``
+
+    Returns:
+        Script URL
+    """
+    return HTMX_VENDORED if (static_dir / "js" / "htmx.min.js").is_file() else HTMX_CDN
+
+
+HTMX_SRC = _htmx_src(Path(__file__).parent / "static")
+
+# Script origins for the CSP; the CDN is only allowed when htmx is not vendored
+SCRIPT_SRC = "'self'" if HTMX_SRC == HTMX_VENDORED else f"'self' {HTMX_SRC}"
+
+# Swap 404 pages into the main area like any other page; other errors are not swapped
+HTMX_CONFIG = json.dumps(
+    {
+        "responseHandling": [
+            {"code": "204", "swap": False},
+            {"code": "[23]..", "swap": True},
+            {"code": "404", "swap": True},
+            {"code": "[45]..", "swap": False, "error": True},
+        ]
+    },
+    separators=(",", ":"),
+)
+
+
+def is_partial(request) -> bool:
+    """Whether a request is an in-site htmx navigation that only needs the main content.
+
+    History restores (``HX-History-Restore-Request``) rebuild the whole page,
+    so they get the full document.
+
+    Args:
+        request: The incoming request
+
+    Returns:
+        True if only the title and main content should be rendered
+    """
+    return request.headers.get("HX-Request") == "true" and "HX-History-Restore-Request" not in request.headers
+
 
 def Layout(request, *content, title: str):
     """A reusable layout component for all pages.
 
+    In-site links are boosted with htmx: clicks fetch the next page with an
+    ``HX-Request`` header and swap only the main element. Those requests get
+    just the title and main content instead of the whole document.
+
     Args:
         request: The FastHTML request object containing state
         *content: Variable number of content elements to render in main
         title: The page title (will be prefixed with site name)
 
     Returns:
-        Complete HTML document with consistent layout
+        Complete HTML document with consistent layout, or the title and main
+        element for partial requests
     """
+    main = Main(*content, cls="content", id="main-content")
+    if is_partial(request):
+        return Title(f"{title} - Personal Blog"), main
+
     return Html(
         Head(
             Meta(charset="UTF-8"),
@@ -28,8 +92,12 @@ def Layout(request, *content, title: str):
             ),
             Link(rel="stylesheet", href="/static/css/custom.css"),
             Link(rel="alternate", type="application/rss+xml", title="RSS Feed", href="/feed.xml"),
+            Link(rel="alternate", type="application/atom+xml", title="Atom Feed", href="/atom.xml"),
+            Link(rel="alternate", type="application/feed+json", title="JSON Feed", href="/feed.json"),
             Style(request.state.pygments_css),
+            Meta(name="htmx-config", content=HTMX_CONFIG),
             Script(src="/static/js/dark-mode.js"),
+            Script(src=HTMX_SRC, defer=True),
         ),
         Body(
             # Skip to content link for accessibility
@@ -40,6 +108,7 @@ def Layout(request, *content, title: str):
                     Header(H2(A("Personal Blog", href="/")), cls="sidebar-header"),
                     Ul(
                         Li(A("Home", href="/")),
+                        Li(A("Archive", href="/archive")),
                         Li(A("About", href="/about")),
                         cls="nav-links",
                     ),
@@ -50,11 +119,11 @@ def Layout(request, *content, title: str):
                             *[
                                 Li(
                                     A(
-                                        post["title"],
-                                        href=f"/posts/{post['slug']}",
-                                        title=post["title"],
+                                        post.title,
+                                        href=f"/posts/{post.slug}",
+                                        title=post.title,
                                     ),
-                                    Small(post["date"].strftime("%b %d, %Y"), cls="post-date"),
+                                    Small(post.date.strftime("%b %d, %Y"), cls="post-date"),
                                 )
                                 for post in request.state.recent_posts
                             ]
@@ -66,7 +135,7 @@ def Layout(request, *content, title: str):
                     cls="sidebar",
                 ),
                 # Page-specific content is injected here
-                Main(*content, cls="content", id="main-content"),
+                main,
                 cls="grid-container",
             ),
             # Subtle dark mode toggle button - fixed bottom left
@@ -82,5 +151,61 @@ def Layout(request, *content, title: str):
                 title="Toggle dark mode",
                 **{"aria-pressed": "false"},
             ),
+            hx_boost="true",
+            hx_target="#main-content",
+            hx_swap="outerHTML show:window:top",
+        ),
+    )
+
+
+def split_layout(request, *content, title: str) -> tuple[str, str]:
+    """Render a Layout and split it at ``STREAM_SLOT`` for streamed responses.
+
+    The content must contain ``NotStr(STREAM_SLOT)`` exactly once, where the
+    streamed body belongs. Everything before it (head, sidebar and any content
+    preceding the slot) can be flushed before the streamed body is produced.
+
+    Args:
+        request: The FastHTML request object containing state
+        *content: Content elements including the slot marker
+        title: The page title (will be prefixed with site name)
+
+    Returns:
+        Tuple of the document HTML before and after the slot
+    """
+    document = to_xml(Layout(request, *content, title=title), indent=fh_cfg.indent)
+    head, tail = document.split(STREAM_SLOT, 1)
+    return head, tail
+
+
+def Pagination(page, base_path: str):
+    """Previous/next navigation for a paginated post listing.
+
+    Numbered pages link to their neighbours by number; pages reached through a
+    ``before`` cursor keep following cursors so deep listings stay cheap.
+
+    Args:
+        page: The Page being rendered
+        base_path: Path of the listing the links point to
+
+    Returns:
+        Pagination navigation element, or None for single-page listings
+    """
+    if page.total_pages <= 1:
+        return None
+
+    next_href = f"{base_path}?before={page.next_cursor}" if page.cursor else f"{base_path}?page={page.number + 1}"
+
+    return Nav(
+        Div(
+            A("← Previous", href=f"{base_path}?page={page.prev_number}", cls="pagination-link prev")
+            if page.has_prev
+            else Span("← Previous", cls="pagination-link prev disabled"),
+            Span(f"Page {page.number} of {page.total_pages}", cls="pagination-info"),
+            A("Next →", href=next_href, cls="pagination-link next")
+            if page.has_next
+            else Span("Next →", cls="pagination-link next disabled"),
+            cls="pagination",
         ),
+        cls="pagination-nav",
     )
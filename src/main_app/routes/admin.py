@@ -0,0 +1,218 @@
+"""Admin-only operational routes."""
+
+import hmac
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+from fasthtml.common import *
+from starlette.exceptions import HTTPException
+from starlette.responses import JSONResponse, Response
+
+from ..utils.minify import SAVINGS
+from ..utils.profiling import PROFILER, to_collapsed, to_pstats
+
+ROOT = Path(__file__).resolve().parents[3]
+
+# Seconds the memory report may run, and the largest parameters it accepts
+MEMORY_REPORT_TIMEOUT = 120
+MAX_MEMORY_SAMPLE = 500
+MAX_MEMORY_TOP = 100
+MAX_MEMORY_PAGES = 100
+
+
+def require_admin(request):
+    """Reject requests that do not carry the admin token.
+
+    Admin routes are hidden (404) unless ``ADMIN_TOKEN`` is set, and then
+    require an ``Authorization: Bearer <token>`` header.
+
+    Args:
+        request: HTTP request object
+
+    Raises:
+        HTTPException: 404 if admin routes are disabled, 403 if the token is wrong
+    """
+    token = os.environ.get("ADMIN_TOKEN")
+    if not token:
+        raise HTTPException(status_code=404)
+
+    supplied = request.headers.get("Authorization", "").removeprefix("Bearer ").strip()
+    if not hmac.compare_digest(supplied.encode(), token.encode()):
+        raise HTTPException(status_code=403)
+
+
+def _download(content: bytes | str, filename: str, media_type: str) -> Response:
+    return Response(
+        content,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+def _clamp(value: int, low: int, high: int) -> int:
+    return min(max(value, low), high)
+
+
+def run_memory_report(sample: int, top: int, pages: int, timeout: float = MEMORY_REPORT_TIMEOUT) -> dict:
+    """Run the memory report in a fresh interpreter.
+
+    A child process measures a cold load of the corpus, so the caches and
+    tracemalloc overhead never touch the worker serving the request.
+
+    Args:
+        sample: Number of posts measured on their own
+        top: Number of allocation sites and largest posts listed
+        pages: Number of post and tag pages requested
+        timeout: Seconds before the child process is killed
+
+    Returns:
+        Report produced by ``tools.memory``
+
+    Raises:
+        subprocess.CalledProcessError: If the report fails
+        subprocess.TimeoutExpired: If the report outlives the timeout
+    """
+    command = [sys.executable, "-m", "src.main_app.tools.memory", "--json"]
+    command += ["--sample", str(sample), "--top", str(top), "--pages", str(pages)]
+    result = subprocess.run(command, cwd=ROOT, capture_output=True, text=True, check=True, timeout=timeout)
+    return json.loads(result.stdout)
+
+
+def register_admin_routes(app):
+    """Register admin routes with the FastHTML app.
+
+    Args:
+        app: FastHTML application instance
+    """
+
+    @app.get("/admin/profile")
+    def profile_status(request):
+        """Describe the current or last profile capture.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            JSON response with the profiler state
+        """
+        require_admin(request)
+        return JSONResponse(PROFILER.status())
+
+    @app.post("/admin/profile")
+    def profile_start(
+        request, mode: str = "window", seconds: float = 30.0, interval_ms: float = 5.0, slowest: int = 10
+    ):
+        """Start a profile capture.
+
+        Args:
+            request: HTTP request object
+            mode: ``window`` to sample everything, ``slowest`` to keep the slowest requests
+            seconds: Capture length; 0 runs until stopped
+            interval_ms: Milliseconds between samples
+            slowest: Number of requests kept in ``slowest`` mode
+
+        Returns:
+            JSON response with the profiler state
+        """
+        require_admin(request)
+        try:
+            PROFILER.start(mode, interval=interval_ms / 1000, window=seconds or None, slowest=slowest)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+        return JSONResponse(PROFILER.status(), status_code=202)
+
+    @app.delete("/admin/profile")
+    def profile_stop(request):
+        """Stop the capture in progress.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            JSON response with the profiler state
+        """
+        require_admin(request)
+        PROFILER.stop()
+        return JSONResponse(PROFILER.status())
+
+    @app.get("/admin/profile.collapsed")
+    def profile_collapsed(request):
+        """Download the profile as collapsed stacks for flame graph tools.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            Plain text attachment
+        """
+        require_admin(request)
+        return _download(to_collapsed(PROFILER.samples()), "profile.collapsed", "text/plain")
+
+    @app.get("/admin/profile.pstats")
+    def profile_pstats(request):
+        """Download the profile as a pstats file.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            Binary attachment loadable with ``pstats.Stats``
+        """
+        require_admin(request)
+        return _download(to_pstats(PROFILER.samples(), PROFILER.interval), "profile.pstats", "application/octet-stream")
+
+    @app.get("/admin/minify")
+    def minify_report(request):
+        """Report the bytes saved by HTML minification per page.
+
+        Args:
+            request: HTTP request object
+
+        Returns:
+            JSON response with totals and per-page sizes, largest savings first
+        """
+        require_admin(request)
+        pages = SAVINGS.report()
+        before = sum(page["before"] for page in pages)
+        after = sum(page["after"] for page in pages)
+        return JSONResponse(
+            {"pages": len(pages), "before": before, "after": after, "saved": before - after, "report": pages}
+        )
+
+    @app.get("/admin/memory")
+    def memory_report(request, sample: int = 50, top: int = 10, pages: int = 20):
+        """Report the memory retained by each content structure and post.
+
+        Parameters are clamped to ``MAX_MEMORY_SAMPLE``, ``MAX_MEMORY_TOP`` and
+        ``MAX_MEMORY_PAGES``, and the report is stopped after
+        ``MEMORY_REPORT_TIMEOUT`` seconds.
+
+        Args:
+            request: HTTP request object
+            sample: Number of posts measured on their own
+            top: Number of allocation sites and largest posts listed
+            pages: Number of post and tag pages requested
+
+        Returns:
+            JSON response with the ``tools.memory`` report, or a JSON error
+            with status 500 if the report fails and 504 if it times out
+        """
+        require_admin(request)
+        try:
+            report = run_memory_report(
+                _clamp(sample, 0, MAX_MEMORY_SAMPLE), _clamp(top, 1, MAX_MEMORY_TOP), _clamp(pages, 0, MAX_MEMORY_PAGES)
+            )
+        except subprocess.TimeoutExpired:
+            return JSONResponse(
+                {"error": f"Memory report did not finish within {MEMORY_REPORT_TIMEOUT} s"}, status_code=504
+            )
+        except subprocess.CalledProcessError as e:
+            # The last line of a traceback names the exception
+            detail = (e.stderr or "").strip().rpartition("\n")[2]
+            return JSONResponse({"error": "Memory report failed", "detail": detail}, status_code=500)
+        except json.JSONDecodeError:
+            return JSONResponse({"error": "Memory report returned invalid JSON"}, status_code=500)
+        return JSONResponse(report)
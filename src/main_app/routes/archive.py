@@ -0,0 +1,164 @@
+"""Date-based archive routes."""
+
+from calendar import month_name
+
+from fasthtml.common import *
+from starlette.exceptions import HTTPException
+
+from ..components import Layout
+from ..utils.content import get_archive_months, load_posts_by_date
+
+
+def _post_list(posts):
+    """Compact list of post titles and dates.
+
+    Args:
+        posts: Posts to list
+
+    Returns:
+        Unordered list of post links
+    """
+    return Ul(
+        *[
+            Li(
+                A(post.title, href=f"/posts/{post.slug}"),
+                Span(f"{post.date.strftime('%B %d, %Y')} · {post.reading_minutes} min", cls="post-date"),
+            )
+            for post in posts
+        ],
+        cls="archive-posts",
+    )
+
+
+def _count(total: int) -> str:
+    return f"{total} post{'s' if total != 1 else ''}"
+
+
+def register_archive_routes(app):
+    """Register archive routes with the FastHTML app.
+
+    Args:
+        app: FastHTML application instance
+    """
+
+    @app.get("/archive")
+    def archive(request):
+        """Display every year and month that has posts.
+
+        Args:
+            request: HTTP request object with navigation context
+
+        Returns:
+            Rendered HTML page with links to each year and month
+        """
+        archive_months = get_archive_months()
+        years: dict[int, list[tuple[int, int]]] = {}
+        for year, month, total in archive_months:
+            years.setdefault(year, []).append((month, total))
+
+        page_content = (
+            Header(
+                H1("Archive", cls="post-title"),
+                P(f"Browse {_count(sum(total for _, _, total in archive_months))} by date.", cls="tag-meta"),
+                cls="post-header",
+            ),
+            Section(
+                *[
+                    Section(
+                        H2(A(str(year), href=f"/archive/{year}")),
+                        Ul(
+                            *[
+                                Li(
+                                    A(f"{month_name[month]} {year}", href=f"/archive/{year}/{month:02d}"),
+                                    Span(_count(total), cls="post-date"),
+                                )
+                                for month, total in months
+                            ],
+                            cls="archive-months",
+                        ),
+                        cls="archive-year",
+                    )
+                    for year, months in years.items()
+                ]
+                if years
+                else [P("No blog posts available yet.")],
+                cls="archive-index",
+            ),
+            Footer(Nav(A("← Back to Home", href="/", cls="back-link")), cls="archive-footer"),
+        )
+
+        return Layout(request, *page_content, title="Archive")
+
+    @app.get("/archive/{year}")
+    def archive_year(request, year: int):
+        """Display posts published in a year, grouped by month.
+
+        Args:
+            request: HTTP request object with navigation context
+            year: Publication year
+
+        Returns:
+            Rendered HTML page with the year's posts
+
+        Raises:
+            HTTPException: 404 if no posts were published in the year
+        """
+        posts = load_posts_by_date(year)
+        if not posts:
+            raise HTTPException(status_code=404)
+
+        months = [month for post_year, month, _ in get_archive_months() if post_year == year]
+
+        page_content = (
+            Header(
+                H1(f"Posts from {year}", cls="post-title"),
+                P(f"Found {_count(len(posts))} from {year}.", cls="tag-meta"),
+                cls="post-header",
+            ),
+            *[
+                Section(
+                    H2(A(month_name[month], href=f"/archive/{year}/{month:02d}")),
+                    _post_list(load_posts_by_date(year, month)),
+                    cls="archive-month",
+                )
+                for month in months
+            ],
+            Footer(Nav(A("← Full archive", href="/archive", cls="back-link")), cls="archive-footer"),
+        )
+
+        return Layout(request, *page_content, title=f"Posts from {year}")
+
+    @app.get("/archive/{year}/{month}")
+    def archive_month(request, year: int, month: int):
+        """Display posts published in a month.
+
+        Args:
+            request: HTTP request object with navigation context
+            year: Publication year
+            month: Publication month (1-12)
+
+        Returns:
+            Rendered HTML page with the month's posts
+
+        Raises:
+            HTTPException: 404 if no posts were published in the month
+        """
+        posts = load_posts_by_date(year, month)
+        if not posts:
+            raise HTTPException(status_code=404)
+
+        period = f"{month_name[month]} {year}"
+        page_content = (
+            Header(
+                H1(f"Posts from {period}", cls="post-title"),
+                P(f"Found {_count(len(posts))} from {period}.", cls="tag-meta"),
+                cls="post-header",
+            ),
+            Section(_post_list(posts), cls="archive-month"),
+            Footer(
+                Nav(A(f"← All of {year}", href=f"/archive/{year}", cls="back-link")),
+                cls="archive-footer",
+            ),
+        )
+
+        return Layout(request, *page_content, title=f"Posts from {period}")
@@ -1,12 +1,19 @@
 """Homepage route displaying blog index."""
 
-from datetime import datetime
-
 from fasthtml.common import *
+from starlette.exceptions import HTTPException
 from starlette.responses import Response
 
-from ..components import Layout
-from ..utils.content import load_all_posts
+from ..components import Layout, Pagination
+from ..utils.content import get_page_index, load_all_posts
+from ..utils.feeds import (
+    ATOM_MEDIA_TYPE,
+    JSON_FEED_MEDIA_TYPE,
+    RSS_MEDIA_TYPE,
+    build_robots_txt,
+    build_sitemap,
+    serialize_feed,
+)
 
 
 def register_home_routes(app):
@@ -17,27 +24,26 @@ def register_home_routes(app):
     """
 
     @app.get("/")
-    def home(request, page: int = 1):
+    def home(request, page: int = 1, before: str | None = None):
         """Display blog posts with pagination.
 
         Args:
             request: HTTP request object with navigation context
             page: Page number for pagination (default: 1)
+            before: Optional slug cursor; shows the posts listed after it
 
         Returns:
             Rendered HTML page with paginated blog post list
-        """
-        posts_per_page = 10
-        all_posts = load_all_posts()
-        total_posts = len(all_posts)
 
-        start = (page - 1) * posts_per_page
-        end = start + posts_per_page
-        posts = all_posts[start:end]
+        Raises:
+            HTTPException: 404 if the page number or cursor is out of range
+        """
+        page_index = get_page_index()
+        current = page_index.page_before(before) if before else page_index.page(page)
+        if current is None:
+            raise HTTPException(status_code=404)
 
-        total_pages = (total_posts + posts_per_page - 1) // posts_per_page
-        has_prev = page > 1
-        has_next = page < total_pages
+        posts = current.posts
 
         page_content = (
             H1("Jack McPherson's Blog", cls="sr-only"),
@@ -45,24 +51,24 @@ def register_home_routes(app):
                 *[
                     Article(
                         Header(
-                            H2(A(post["title"], href=f"/posts/{post['slug']}")),
+                            H2(A(post.title, href=f"/posts/{post.slug}")),
                             P(
-                                f"Published on {post['date'].strftime('%B %d, %Y')}",
+                                f"Published on {post.date.strftime('%B %d, %Y')} · {post.reading_minutes} min read",
                                 cls="blog-post-meta",
                             ),
                             cls="blog-post-header",
                         ),
                         P(
-                            post["excerpt"] or "No excerpt available.",
+                            post.excerpt or "No excerpt available.",
                             cls="blog-post-excerpt",
                         )
-                        if post["excerpt"]
+                        if post.excerpt
                         else None,
                         Div(
-                            *[A(tag, href=f"/tags/{tag}", cls="tag") for tag in post["tags"]],
+                            *[A(tag, href=f"/tags/{tag}", cls="tag") for tag in post.tags],
                             cls="post-tags",
                         )
-                        if post["tags"]
+                        if post.tags
                         else None,
                         cls="blog-post",
                     )
@@ -72,21 +78,7 @@ def register_home_routes(app):
                 else [P("No blog posts available yet.")],
                 cls="blog-index",
             ),
-            Nav(
-                Div(
-                    A("← Previous", href=f"/?page={page - 1}", cls="pagination-link prev")
-                    if has_prev
-                    else Span("← Previous", cls="pagination-link prev disabled"),
-                    Span(f"Page {page} of {total_pages}", cls="pagination-info"),
-                    A("Next →", href=f"/?page={page + 1}", cls="pagination-link next")
-                    if has_next
-                    else Span("Next →", cls="pagination-link next disabled"),
-                    cls="pagination",
-                ),
-                cls="pagination-nav",
-            )
-            if total_pages > 1
-            else None,
+            Pagination(current, "/"),
         )
 
         return Layout(request, *page_content, title="Home")
@@ -98,35 +90,25 @@ def register_home_routes(app):
         Returns:
             XML RSS feed response containing the latest 10 blog posts
         """
-        posts = load_all_posts()[:10]
-
-        rss_items = []
-        for post in posts:
-            pub_date = post["date"].strftime("%a, %d %b %Y %H:%M:%S +0000")
-            description = post["excerpt"] or post["content"][:200] + "..."
-            rss_items.append(f"""
-            <item>
-                <title><![CDATA[{post["title"]}]]></title>
-                <link>https://yoursite.com/posts/{post["slug"]}</link>
-                <description><![CDATA[{description}]]></description>
-                <pubDate>{pub_date}</pubDate>
-                <guid>https://yoursite.com/posts/{post["slug"]}</guid>
-            </item>""")
-
-        rss_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
-    <channel>
-        <title>Jack McPherson's Blog</title>
-        <link>https://yoursite.com</link>
-        <description>Technical blog posts about software development</description>
-        <language>en-US</language>
-        <lastBuildDate>{datetime.now().strftime("%a, %d %b %Y %H:%M:%S +0000")}</lastBuildDate>
-        <atom:link href="https://yoursite.com/feed.xml" rel="self" type="application/rss+xml"/>
-        {"".join(rss_items)}
-    </channel>
-</rss>"""
-
-        return Response(rss_content, media_type="application/rss+xml")
+        return Response(serialize_feed("feed.xml"), media_type=RSS_MEDIA_TYPE)
+
+    @app.get("/atom.xml")
+    def atom_feed():
+        """Generate Atom feed for the blog.
+
+        Returns:
+            Atom feed response containing the latest 10 blog posts
+        """
+        return Response(serialize_feed("atom.xml"), media_type=ATOM_MEDIA_TYPE)
+
+    @app.get("/feed.json")
+    def json_feed():
+        """Generate JSON Feed for the blog.
+
+        Returns:
+            JSON Feed response containing the latest 10 blog posts
+        """
+        return Response(serialize_feed("feed.json"), media_type=JSON_FEED_MEDIA_TYPE)
 
     @app.get("/sitemap.xml")
     def sitemap():
@@ -135,45 +117,7 @@ def register_home_routes(app):
         Returns:
             XML sitemap response containing all pages and blog posts
         """
-        posts = load_all_posts()
-
-        urls = [
-            """
-            <url>
-                <loc>https://yoursite.com/</loc>
-                <changefreq>weekly</changefreq>
-                <priority>1.0</priority>
-            </url>""",
-            """
-            <url>
-                <loc>https://yoursite.com/about</loc>
-                <changefreq>monthly</changefreq>
-                <priority>0.8</priority>
-            </url>""",
-            """
-            <url>
-                <loc>https://yoursite.com/tags</loc>
-                <changefreq>weekly</changefreq>
-                <priority>0.7</priority>
-            </url>""",
-        ]
-
-        for post in posts:
-            last_mod = post["date"].strftime("%Y-%m-%d")
-            urls.append(f"""
-            <url>
-                <loc>https://yoursite.com/posts/{post["slug"]}</loc>
-                <lastmod>{last_mod}</lastmod>
-                <changefreq>monthly</changefreq>
-                <priority>0.9</priority>
-            </url>""")
-
-        sitemap_content = f"""<?xml version="1.0" encoding="UTF-8"?>
-<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
-    {"".join(urls)}
-</urlset>"""
-
-        return Response(sitemap_content, media_type="application/xml")
+        return Response(build_sitemap(load_all_posts()), media_type="application/xml")
 
     @app.get("/robots.txt")
     def robots_txt():
@@ -182,9 +126,4 @@ def register_home_routes(app):
         Returns:
             Plain text response containing robots.txt directives
         """
-        robots_content = """User-agent: *
-Allow: /
-
-Sitemap: https://yoursite.com/sitemap.xml
-"""
-        return Response(robots_content, media_type="text/plain")
+        return Response(build_robots_txt(), media_type="text/plain")
@@ -1,9 +1,90 @@
 """Individual blog post routes."""
 
+import os
+
 from fasthtml.common import *
+from starlette.responses import StreamingResponse
 
-from ..components import Layout
+from ..components import STREAM_SLOT, Layout, split_layout
 from ..utils.content import load_post
+from ..utils.related import get_related_posts
+
+STREAM_CHUNK_SIZE = 16 * 1024
+DEFAULT_STREAM_THRESHOLD = 64 * 1024
+
+
+def _stream_threshold() -> int:
+    """Rendered post size above which post pages are streamed (0 disables streaming)."""
+    try:
+        return int(os.environ.get("STREAM_THRESHOLD_BYTES", DEFAULT_STREAM_THRESHOLD))
+    except ValueError:
+        return DEFAULT_STREAM_THRESHOLD
+
+
+def _chunks(html: str, size: int = STREAM_CHUNK_SIZE):
+    """Split HTML into chunks of roughly ``size`` characters, ending each after a tag.
+
+    Args:
+        html: HTML to split
+        size: Target chunk size in characters
+
+    Yields:
+        Consecutive pieces of ``html``
+    """
+    start = 0
+    while start < len(html):
+        end = html.find(">", start + size) + 1 or len(html)
+        yield html[start:end]
+        start = end
+
+
+def _stream_page(request, *content, title: str, body: str) -> StreamingResponse:
+    """Stream a Layout page, flushing everything before the slot first.
+
+    Args:
+        request: HTTP request object with navigation context
+        *content: Page content containing ``NotStr(STREAM_SLOT)``
+        title: The page title
+        body: HTML streamed in chunks in place of the slot
+
+    Returns:
+        Streaming HTML response
+    """
+    head, tail = split_layout(request, *content, title=title)
+
+    def generate():
+        yield head
+        yield from _chunks(body)
+        yield tail
+
+    return StreamingResponse(generate(), media_type="text/html; charset=utf-8")
+
+
+def _related_section(slug: str):
+    """Build the "Related posts" section for a post.
+
+    Args:
+        slug: The post slug
+
+    Returns:
+        Section listing related posts, or None when there are none
+    """
+    related = get_related_posts(slug)
+    if not related:
+        return None
+    return Section(
+        H2("Related posts"),
+        Ul(
+            *[
+                Li(
+                    A(post.title, href=f"/posts/{post.slug}"),
+                    Span(post.date.strftime("%B %d, %Y"), cls="post-date"),
+                )
+                for post in related
+            ]
+        ),
+        cls="related-posts",
+    )
 
 
 def register_post_routes(app):
@@ -17,6 +98,10 @@ def register_post_routes(app):
     def post_detail(request, slug: str):
         """Display individual blog post.
 
+        Posts whose rendered HTML exceeds ``STREAM_THRESHOLD_BYTES`` are
+        streamed: the head, sidebar and post header are sent immediately and
+        the article body follows in chunks.
+
         Args:
             request: HTTP request object with navigation context
             slug: The post slug (filename without .md extension)
@@ -45,29 +130,47 @@ def register_post_routes(app):
                 ),
             )
 
-            layout_html = str(Layout(request, *content_404, title="Post Not Found"))
+            layout_html = to_xml(Layout(request, *content_404, title="Post Not Found"))
             return Response(content=layout_html, media_type="text/html", status_code=404)
 
-        page_content = (
-            Header(
-                H1(post["title"], cls="post-title"),
-                P(
-                    f"Published on {post['date'].strftime('%B %d, %Y')}",
-                    cls="post-meta",
-                ),
-                Div(
-                    *[A(tag, href=f"/tags/{tag}", cls="tag") for tag in post["tags"]],
-                    cls="post-tags",
-                )
-                if post["tags"]
-                else None,
-                cls="post-header",
+        header = Header(
+            H1(post.title, cls="post-title"),
+            P(
+                f"Published on {post.date.strftime('%B %d, %Y')} · {post.reading_minutes} min read",
+                cls="post-meta",
             ),
+            Div(
+                *[A(tag, href=f"/tags/{tag}", cls="tag") for tag in post.tags],
+                cls="post-tags",
+            )
+            if post.tags
+            else None,
+            Nav(
+                H2("Contents"),
+                NotStr(post.toc),  # Heading links rendered at compile time
+                cls="post-toc",
+                **{"aria-label": "Table of contents"},
+            )
+            if post.toc
+            else None,
+            cls="post-header",
+        )
+        related = _related_section(slug)
+        footer = Footer(Nav(A("← Back to Home", href="/", cls="back-link")), cls="post-footer")
+
+        threshold = _stream_threshold()
+        if threshold and len(post.content) > threshold:
+            article = Article(NotStr(STREAM_SLOT), cls="post-content")
+            return _stream_page(request, header, article, related, footer, title=post.title, body=post.content)
+
+        page_content = (
+            header,
             Article(
-                NotStr(post["content"]),  # Raw HTML content from markdown
+                NotStr(post.content),  # Raw HTML content from markdown
                 cls="post-content",
             ),
-            Footer(Nav(A("← Back to Home", href="/", cls="back-link")), cls="post-footer"),
+            related,
+            footer,
         )
 
-        return Layout(request, *page_content, title=post["title"])
+        return Layout(request, *page_content, title=post.title)
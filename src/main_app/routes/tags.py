@@ -1,9 +1,11 @@
 """Tag filtering routes."""
 
 from fasthtml.common import *
+from starlette.exceptions import HTTPException
 
-from ..components import Layout
-from ..utils.content import get_all_tags, load_posts_by_tag
+from ..components import Layout, Pagination
+from ..utils.content import get_all_tags, get_page_index
+from ..utils.feeds import FEED_FORMATS, serialize_feed
 
 
 def register_tag_routes(app):
@@ -14,37 +16,36 @@ def register_tag_routes(app):
     """
 
     @app.get("/tags/{tag}")
-    def tag_posts(request, tag: str, page: int = 1):
+    def tag_posts(request, tag: str, page: int = 1, before: str | None = None):
         """Display posts with specific tag with pagination.
 
         Args:
             request: HTTP request object with navigation context
             tag: The tag name to filter posts by
             page: Page number for pagination (default: 1)
+            before: Optional slug cursor; shows the posts listed after it
 
         Returns:
             Rendered HTML page with filtered posts
-        """
-        posts_per_page = 10
-        all_tag_posts = load_posts_by_tag(tag)
-        total_posts = len(all_tag_posts)
-
-        # Calculate pagination
-        start = (page - 1) * posts_per_page
-        end = start + posts_per_page
-        posts = all_tag_posts[start:end]
 
-        total_pages = (total_posts + posts_per_page - 1) // posts_per_page
-        has_prev = page > 1
-        has_next = page < total_pages
+        Raises:
+            HTTPException: 404 if the page number or cursor is out of range
+        """
+        page_index = get_page_index(tag)
+        current = page_index.page_before(before) if before else page_index.page(page)
+        if current is None:
+            raise HTTPException(status_code=404)
 
+        posts = current.posts
+        total_posts = page_index.total_posts
         all_tags = get_all_tags()
 
         page_content = (
             Header(
                 H1(f"Posts tagged with '{tag}'", cls="post-title"),
                 P(
-                    f"Found {len(posts)} post{'s' if len(posts) != 1 else ''} with this tag.",
+                    f"Found {total_posts} post{'s' if total_posts != 1 else ''} with this tag. ",
+                    A("Subscribe to this tag", href=f"/tags/{tag}/feed.xml") if total_posts else None,
                     cls="tag-meta",
                 ),
                 cls="post-header",
@@ -53,23 +54,23 @@ def register_tag_routes(app):
                 *[
                     Article(
                         Header(
-                            H2(A(post["title"], href=f"/posts/{post['slug']}")),
+                            H2(A(post.title, href=f"/posts/{post.slug}")),
                             P(
-                                f"Published on {post['date'].strftime('%B %d, %Y')}",
+                                f"Published on {post.date.strftime('%B %d, %Y')} · {post.reading_minutes} min read",
                                 cls="blog-post-meta",
                             ),
                         ),
                         P(
-                            post["excerpt"] or "No excerpt available.",
+                            post.excerpt or "No excerpt available.",
                             cls="blog-post-excerpt",
                         )
-                        if post["excerpt"]
+                        if post.excerpt
                         else None,
                         Div(
-                            *[A(post_tag, href=f"/tags/{post_tag}", cls="tag") for post_tag in post["tags"]],
+                            *[A(post_tag, href=f"/tags/{post_tag}", cls="tag") for post_tag in post.tags],
                             cls="post-tags",
                         )
-                        if post["tags"]
+                        if post.tags
                         else None,
                         cls="blog-post",
                     )
@@ -79,22 +80,7 @@ def register_tag_routes(app):
                 else [P(f"No posts found with the tag '{tag}'.")],
                 cls="tag-posts-list",
             ),
-            # Pagination
-            Nav(
-                Div(
-                    A("← Previous", href=f"/tags/{tag}?page={page - 1}", cls="pagination-link prev")
-                    if has_prev
-                    else Span("← Previous", cls="pagination-link prev disabled"),
-                    Span(f"Page {page} of {total_pages}", cls="pagination-info"),
-                    A("Next →", href=f"/tags/{tag}?page={page + 1}", cls="pagination-link next")
-                    if has_next
-                    else Span("Next →", cls="pagination-link next disabled"),
-                    cls="pagination",
-                ),
-                cls="pagination-nav",
-            )
-            if total_pages > 1
-            else None,
+            Pagination(current, f"/tags/{tag}"),
             Section(
                 H2("All Tags"),
                 P("Browse posts by other tags:"),
@@ -117,6 +103,25 @@ def register_tag_routes(app):
 
         return Layout(request, *page_content, title=f"Posts tagged '{tag}'")
 
+    @app.get("/tags/{tag}/{name}")
+    def tag_feed(tag: str, name: str):
+        """Generate the RSS, Atom or JSON feed of a tag.
+
+        Args:
+            tag: The tag name to filter posts by
+            name: Feed file name (``feed.xml``, ``atom.xml`` or ``feed.json``)
+
+        Returns:
+            Feed response containing the tag's latest 10 posts
+
+        Raises:
+            HTTPException: 404 if the feed format is unknown or no post has the tag
+        """
+        body = serialize_feed(name, tag) if name in FEED_FORMATS else None
+        if body is None:
+            raise HTTPException(status_code=404)
+        return Response(body, media_type=FEED_FORMATS[name][1])
+
     @app.get("/tags")
     def all_tags_page(request):
         """Display all available tags.
@@ -0,0 +1,406 @@
+"""Production launcher: a pre-forking supervisor of uvicorn workers.
+
+The supervisor imports the application, loads the content indexes (and, with
+``COMPILED_DIR``, the most recent compiled posts) and freezes the garbage
+collector before forking, so workers share that memory copy-on-write instead
+of each loading it. Workers all accept on one listening socket bound by the
+supervisor. Their number follows the CPUs available to the process, and
+uvloop and httptools are used when installed::
+
+    python -m src.main_app.server --port 8000
+
+Signals sent to the supervisor:
+
+* ``SIGHUP`` reloads content and rolls the workers one at a time: a new worker
+  is forked from the reloaded supervisor and must be accepting connections
+  before an old one is told to stop. A stopping worker stops accepting, moves
+  its keep-alive clients to other workers and finishes in-flight requests
+  before exiting, so capacity never drops and no connection is lost.
+* ``SIGTERM`` and ``SIGINT`` stop the workers gracefully, then the supervisor.
+
+Workers that die unexpectedly are replaced.
+"""
+
+import argparse
+import asyncio
+import gc
+import importlib.util
+import logging
+import math
+import os
+import select
+import signal
+import socket
+import sys
+import time
+from pathlib import Path
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+# Seconds a new worker has to start accepting connections during a roll
+READY_TIMEOUT = 30.0
+
+# Seconds between checks for exited workers and pending signals
+POLL_INTERVAL = 0.2
+
+# Seconds a stopping worker keeps serving keep-alive connections, marking each
+# response "Connection: close", before closing the connections left idle
+DRAIN_SECONDS = 1.0
+
+CGROUP_CPU_MAX = Path("/sys/fs/cgroup/cpu.max")
+
+
+def available_cpus(cpu_max: Path = CGROUP_CPU_MAX) -> int:
+    """Count the CPUs this process may use.
+
+    The CPU affinity mask is capped by a cgroup v2 CPU quota, so a container
+    limited to two CPUs on a large host counts two.
+
+    Args:
+        cpu_max: Path of the cgroup ``cpu.max`` file
+
+    Returns:
+        Number of usable CPUs, at least 1
+    """
+    try:
+        cpus = len(os.sched_getaffinity(0))
+    except AttributeError:  # pragma: no cover - not on Linux
+        cpus = os.cpu_count() or 1
+    try:
+        quota, period = cpu_max.read_text().split()
+        if quota != "max":
+            cpus = min(cpus, math.ceil(int(quota) / int(period)))
+    except (OSError, ValueError):
+        pass
+    return max(cpus, 1)
+
+
+def worker_count() -> int:
+    """Number of workers to run: ``WEB_CONCURRENCY``, or one per available CPU.
+
+    Returns:
+        Worker count
+    """
+    configured = os.environ.get("WEB_CONCURRENCY")
+    return max(int(configured), 1) if configured else available_cpus()
+
+
+def select_implementations() -> tuple[str, str]:
+    """Pick the fastest installed event loop and HTTP parser.
+
+    Returns:
+        uvicorn ``loop`` and ``http`` settings: uvloop and httptools when
+        installed, otherwise asyncio and h11
+    """
+    loop = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http = "httptools" if importlib.util.find_spec("httptools") else "h11"
+    return loop, http
+
+
+def preload():
+    """Import the application and load everything workers would load first.
+
+    Builds the post listing, tag, archive, page and related-post indexes, the
+    site feed and the Pygments style sheet and, for compiled content, loads
+    the most recent posts into the post cache. The objects are then moved to
+    the garbage collector's permanent generation so collections in the
+    workers do not touch, and so copy, the pages holding them.
+    """
+    from .app import app  # noqa: F401
+    from .utils import content
+    from .utils.feeds import get_feed
+    from .utils.profiling import PROFILER
+    from .utils.related import get_related_index
+
+    started = time.perf_counter()
+    posts = content.load_all_posts()
+    content.get_all_tags()
+    content.get_archive_months()
+    content.get_page_index()
+    content.get_pygments_css()
+    get_feed()
+    get_related_index()
+    if content._get_compiled_directory() is not None:
+        for post in posts[: content._load_post.cache_info().maxsize]:
+            content.load_post(post.slug)
+
+    # A capture started by PROFILE_MODE belongs in the workers, not here
+    PROFILER.stop()
+    gc.collect()
+    gc.freeze()
+    logger.info(f"Preloaded {len(posts)} posts in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+
+def reload_content():
+    """Discard cached content in the supervisor and load it again."""
+    from .utils.content import clear_content_cache
+
+    gc.unfreeze()
+    clear_content_cache()
+    preload()
+
+
+class WorkerServer(uvicorn.Server):
+    """uvicorn server that moves keep-alive clients away before shutting down.
+
+    uvicorn closes idle keep-alive connections as soon as it stops, racing
+    clients that are about to reuse them. This server first stops accepting,
+    then keeps serving for ``DRAIN_SECONDS`` while ``close_connections`` marks
+    every response ``Connection: close``, so active clients reconnect to
+    another worker before the remaining connections are closed.
+    """
+
+    draining = False
+
+    async def shutdown(self, sockets: list[socket.socket] | None = None):
+        """Stop accepting, drain keep-alive connections, then shut down as uvicorn does."""
+        for server in self.servers:
+            server.close()
+        self.draining = True
+        await asyncio.sleep(DRAIN_SECONDS)
+        await super().shutdown(sockets=sockets)
+
+
+def close_connections(app, server: WorkerServer):
+    """Wrap an ASGI app to end keep-alive connections while ``server`` drains.
+
+    Args:
+        app: ASGI application
+        server: Worker whose ``draining`` flag is checked per response
+
+    Returns:
+        Wrapped ASGI application
+    """
+
+    async def wrapped(scope, receive, send):
+        if scope["type"] != "http":
+            return await app(scope, receive, send)
+
+        async def send_closing(message):
+            if message["type"] == "http.response.start" and server.draining:
+                message = {**message, "headers": [*message.get("headers", ()), (b"connection", b"close")]}
+            await send(message)
+
+        await app(scope, receive, send_closing)
+
+    return wrapped
+
+
+def _serve(config: uvicorn.Config, sock: socket.socket, ready_fd: int):
+    """Run one worker, writing to ``ready_fd`` once it accepts connections."""
+    from .utils.profiling import configure_from_env
+
+    configure_from_env()
+    server = WorkerServer(config)
+    config.loaded_app = close_connections(config.loaded_app, server)
+
+    async def serve():
+        task = asyncio.ensure_future(server.serve(sockets=[sock]))
+        while not server.started and not task.done():
+            await asyncio.sleep(0.01)
+        os.write(ready_fd, b"1" if server.started else b"0")
+        os.close(ready_fd)
+        await task
+
+    config.setup_event_loop()
+    asyncio.run(serve())
+
+
+class Supervisor:
+    """Fork, watch, roll and stop uvicorn workers sharing one socket."""
+
+    def __init__(self, config: uvicorn.Config, workers: int):
+        """Create a supervisor.
+
+        Args:
+            config: uvicorn configuration shared by the workers
+            workers: Number of workers to keep running
+        """
+        self.config = config
+        self.workers = workers
+        self.pids: list[int] = []
+        self.socket: socket.socket | None = None
+        self._signals: list[int] = []
+
+    def spawn(self) -> tuple[int, int]:
+        """Fork a worker.
+
+        Returns:
+            The worker's process id and the pipe it reports readiness on
+        """
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+                signal.signal(sig, signal.SIG_DFL)
+            code = 0
+            try:
+                _serve(self.config, self.socket, write_fd)
+            except BaseException:
+                logger.exception("Worker crashed")
+                code = 1
+            finally:
+                os._exit(code)
+        os.close(write_fd)
+        self.pids.append(pid)
+        return pid, read_fd
+
+    def wait_ready(self, pid: int, read_fd: int, timeout: float = READY_TIMEOUT) -> bool:
+        """Wait until a worker accepts connections.
+
+        Args:
+            pid: Worker process id
+            read_fd: Readiness pipe returned by ``spawn``
+            timeout: Seconds to wait
+
+        Returns:
+            Whether the worker became ready in time
+        """
+        try:
+            readable, _, _ = select.select([read_fd], [], [], timeout)
+            ready = bool(readable) and os.read(read_fd, 1) == b"1"
+        finally:
+            os.close(read_fd)
+        if not ready:
+            logger.error(f"Worker {pid} did not become ready within {timeout:.0f} s")
+        return ready
+
+    def stop_worker(self, pid: int, timeout: float | None = None):
+        """Stop a worker gracefully, killing it if it outlives the timeout.
+
+        Args:
+            pid: Worker process id
+            timeout: Seconds to wait for in-flight requests (defaults to the
+                configured graceful shutdown timeout plus a margin)
+        """
+        if timeout is None:
+            timeout = DRAIN_SECONDS + (self.config.timeout_graceful_shutdown or 30) + 5
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if os.waitpid(pid, os.WNOHANG)[0] == pid:
+                break
+            time.sleep(0.05)
+        else:
+            logger.warning(f"Worker {pid} did not stop within {timeout:.0f} s, killing it")
+            os.kill(pid, signal.SIGKILL)
+            os.waitpid(pid, 0)
+        if pid in self.pids:
+            self.pids.remove(pid)
+
+    def roll(self):
+        """Reload content and replace every worker, one at a time, without losing capacity."""
+        logger.info("Reloading content and rolling workers")
+        reload_content()
+        for old in list(self.pids):
+            pid, read_fd = self.spawn()
+            if not self.wait_ready(pid, read_fd):
+                self.stop_worker(pid, timeout=5)
+                logger.error("Roll aborted; remaining workers keep the previous content")
+                return
+            self.stop_worker(old)
+            logger.info(f"Replaced worker {old} with {pid}")
+        logger.info(f"Rolled {len(self.pids)} workers")
+
+    def reap(self):
+        """Replace workers that exited without being asked to."""
+        while self.pids:
+            try:
+                pid, status = os.waitpid(-1, os.WNOHANG)
+            except ChildProcessError:
+                return
+            if pid == 0:
+                return
+            if pid in self.pids:
+                self.pids.remove(pid)
+                logger.error(f"Worker {pid} exited unexpectedly (status {status}), starting a replacement")
+                self.wait_ready(*self.spawn())
+
+    def _on_signal(self, sig: int, frame):
+        self._signals.append(sig)
+
+    def run(self) -> int:
+        """Bind the socket, start the workers and supervise them until stopped.
+
+        Returns:
+            Process exit code
+        """
+        self.socket = self.config.bind_socket()
+        for sig in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(sig, self._on_signal)
+
+        host, port = self.socket.getsockname()[:2]
+        logger.info(
+            f"Serving on http://{host}:{port} with {self.workers} workers "
+            f"(loop {self.config.loop}, http {self.config.http}, supervisor {os.getpid()})"
+        )
+        # Fork every worker before waiting, so they start up in parallel
+        started = [self.spawn() for _ in range(self.workers)]
+        for pid, read_fd in started:
+            self.wait_ready(pid, read_fd)
+
+        while True:
+            while self._signals:
+                sig = self._signals.pop(0)
+                if sig == signal.SIGHUP:
+                    self.roll()
+                else:
+                    logger.info("Stopping workers")
+                    for pid in list(self.pids):
+                        os.kill(pid, signal.SIGTERM)
+                    for pid in list(self.pids):
+                        self.stop_worker(pid)
+                    self.socket.close()
+                    return 0
+            self.reap()
+            time.sleep(POLL_INTERVAL)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the production launcher command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv``)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--host", default=os.environ.get("HOST", "0.0.0.0"), help="address to listen on")
+    parser.add_argument("--port", type=int, default=int(os.environ.get("PORT", 8000)), help="port to listen on")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default WEB_CONCURRENCY or CPUs)")
+    parser.add_argument(
+        "--graceful-timeout",
+        type=int,
+        default=int(os.environ.get("GRACEFUL_TIMEOUT", 30)),
+        help="seconds a stopping worker has to finish in-flight requests",
+    )
+    args = parser.parse_args(argv)
+
+    loop, http = select_implementations()
+    config = uvicorn.Config(
+        "src.main_app.app:app",
+        host=args.host,
+        port=args.port,
+        loop=loop,
+        http=http,
+        timeout_keep_alive=30,
+        timeout_graceful_shutdown=args.graceful_timeout,
+    )
+    logging.basicConfig(level=logging.INFO, format="%(levelname)s:     [supervisor] %(message)s")
+    workers = args.workers or worker_count()
+    # The application reads the worker count on import, e.g. to split rate limit budgets
+    os.environ["WEB_CONCURRENCY"] = str(workers)
+    preload()
+    config.load()
+    return Supervisor(config, workers).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
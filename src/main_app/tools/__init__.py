@@ -0,0 +1 @@
+"""Command-line tools for benchmarking and operating the website."""
@@ -0,0 +1,336 @@
+"""Render and latency benchmarks over synthetic corpora.
+
+Generates corpora of increasing size and measures the content layer, the
+``Layout`` component and every public route through the ASGI app. Results are
+written as JSON so runs from different releases can be compared::
+
+    python -m src.main_app.tools.bench --sizes 100 1000 10000 --output bench.json
+    python -m src.main_app.tools.bench --compare baseline.json bench.json
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+DEFAULT_SIZES = (100, 1000, 10000)
+
+ROUTES = ("/", "/posts/{slug}", "/tags/{tag}", "/feed.xml", "/sitemap.xml")
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Compute a percentile with linear interpolation between closest ranks.
+
+    Args:
+        values: Sample values (need not be sorted)
+        pct: Percentile between 0 and 100
+
+    Returns:
+        The interpolated percentile, or 0.0 for an empty sample
+    """
+    if not values:
+        return 0.0
+
+    ordered = sorted(values)
+    rank = (len(ordered) - 1) * pct / 100
+    lower = math.floor(rank)
+    upper = math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def summarize(samples: list[float]) -> dict[str, float]:
+    """Summarize timing samples given in seconds.
+
+    Args:
+        samples: Durations in seconds
+
+    Returns:
+        Dictionary of count, mean, p50, p99 and max in milliseconds
+    """
+    return {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 4) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 4),
+        "p99_ms": round(percentile(samples, 99) * 1000, 4),
+        "max_ms": round(max(samples) * 1000, 4) if samples else 0.0,
+    }
+
+
+def bench_load_all_posts(repeat: int) -> dict[str, float]:
+    """Time cold ``load_all_posts`` calls, clearing caches before each one.
+
+    Args:
+        repeat: Number of cold loads to time
+
+    Returns:
+        Timing summary
+    """
+    from ..utils.content import clear_content_cache, load_all_posts
+
+    samples = []
+    for _ in range(repeat):
+        clear_content_cache()
+        started = time.perf_counter()
+        load_all_posts()
+        samples.append(time.perf_counter() - started)
+    return summarize(samples)
+
+
+def bench_parse(paths: list[Path]) -> dict[str, float]:
+    """Measure ``_parse_post_file`` throughput over a set of files.
+
+    Args:
+        paths: Markdown files to parse
+
+    Returns:
+        Files and bytes parsed per second plus per-file timing summary
+    """
+    from ..utils.content import _parse_post_file
+
+    samples = []
+    total_bytes = 0
+    for path in paths:
+        total_bytes += path.stat().st_size
+        started = time.perf_counter()
+        _parse_post_file(path)
+        samples.append(time.perf_counter() - started)
+
+    elapsed = sum(samples)
+    return {
+        "files": len(paths),
+        "files_per_second": round(len(paths) / elapsed, 2) if elapsed else 0.0,
+        "bytes_per_second": round(total_bytes / elapsed, 2) if elapsed else 0.0,
+        **summarize(samples),
+    }
+
+
+def bench_layout(repeat: int) -> dict[str, dict[str, float]]:
+    """Time building and serializing ``Layout`` around a post body.
+
+    Args:
+        repeat: Number of renders to time
+
+    Returns:
+        Timing summaries for FT construction and HTML serialization
+    """
+    from fasthtml.common import Article, NotStr, to_xml
+    from starlette.requests import Request
+
+    from ..components import Layout
+    from ..utils.content import get_pygments_css, load_all_posts, load_post, load_recent_posts
+
+    request = Request({"type": "http", "method": "GET", "path": "/", "headers": [], "query_string": b""})
+    request.state.recent_posts = load_recent_posts(limit=3)
+    request.state.pygments_css = get_pygments_css()
+
+    posts = load_all_posts()
+    post = load_post(posts[0].slug) if posts else None
+    body = NotStr(post.content) if post else NotStr("")
+
+    build_samples = []
+    render_samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        page = Layout(request, Article(body, cls="post-content"), title="Benchmark")
+        built = time.perf_counter()
+        to_xml(page)
+        build_samples.append(built - started)
+        render_samples.append(time.perf_counter() - built)
+
+    return {"build": summarize(build_samples), "render": summarize(render_samples)}
+
+
+async def bench_routes(requests: int) -> dict[str, dict[str, float]]:
+    """Measure per-route latency by driving the ASGI app in-process.
+
+    Args:
+        requests: Requests to time per route (after one warm-up request)
+
+    Returns:
+        Timing summary and status codes keyed by route template
+    """
+    import httpx
+
+    from ..app import app
+    from ..utils.content import get_all_tags, load_all_posts
+
+    slugs = [post.slug for post in load_all_posts()] or ["missing"]
+    tags = get_all_tags() or ["missing"]
+
+    def url_for(route: str, i: int) -> str:
+        return route.format(slug=slugs[i % len(slugs)], tag=tags[i % len(tags)])
+
+    results = {}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for route in ROUTES:
+            await client.get(url_for(route, 0))
+
+            samples = []
+            statuses: dict[str, int] = {}
+            for i in range(requests):
+                started = time.perf_counter()
+                response = await client.get(url_for(route, i), headers={"Accept-Encoding": "gzip"})
+                samples.append(time.perf_counter() - started)
+                statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+
+            results[route] = {**summarize(samples), "status": statuses}
+    return results
+
+
+def run_corpus(size: int, *, requests: int, repeat: int, parse_sample: int, workdir: Path) -> dict[str, Any]:
+    """Generate one corpus and run every benchmark against it.
+
+    Args:
+        size: Number of posts in the corpus
+        requests: Requests per route
+        repeat: Cold loads to time
+        parse_sample: Maximum number of files for the parse benchmark
+        workdir: Scratch directory for the generated corpus
+
+    Returns:
+        Results for this corpus size
+    """
+    from ..utils.content import clear_content_cache
+    from .corpus import generate_corpus
+
+    posts_dir = workdir / f"posts-{size}"
+    paths = generate_corpus(posts_dir, size)
+    os.environ["POSTS_DIR"] = str(posts_dir)
+    clear_content_cache()
+
+    result = {
+        "posts": size,
+        "corpus_bytes": sum(path.stat().st_size for path in paths),
+        "load_all_posts": bench_load_all_posts(repeat),
+        "parse_post_file": bench_parse(paths[:parse_sample]),
+        "layout": bench_layout(max(requests, 1)),
+        "routes": asyncio.run(bench_routes(requests)),
+    }
+    clear_content_cache()
+    return result
+
+
+def _metadata() -> dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True, timeout=5
+        ).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+
+    return {
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def run(sizes: list[int], *, requests: int, repeat: int, parse_sample: int) -> dict[str, Any]:
+    """Run the benchmark suite for each corpus size.
+
+    Args:
+        sizes: Corpus sizes to benchmark
+        requests: Requests per route
+        repeat: Cold loads to time per corpus
+        parse_sample: Maximum number of files for the parse benchmark
+
+    Returns:
+        Machine-readable results including run metadata
+    """
+    previous_posts_dir = os.environ.get("POSTS_DIR")
+    try:
+        with tempfile.TemporaryDirectory(prefix="bench-") as workdir:
+            corpora = [
+                run_corpus(size, requests=requests, repeat=repeat, parse_sample=parse_sample, workdir=Path(workdir))
+                for size in sizes
+            ]
+    finally:
+        if previous_posts_dir is None:
+            os.environ.pop("POSTS_DIR", None)
+        else:
+            os.environ["POSTS_DIR"] = previous_posts_dir
+
+    return {"meta": _metadata(), "corpora": corpora}
+
+
+def _flatten(prefix: str, value: Any, out: dict[str, float]):
+    if isinstance(value, dict):
+        for key, item in value.items():
+            _flatten(f"{prefix}.{key}" if prefix else key, item, out)
+    elif isinstance(value, (int, float)) and not prefix.endswith(".count"):
+        out[prefix] = value
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    """Compare two result documents metric by metric.
+
+    Args:
+        baseline: Earlier benchmark results
+        current: Newer benchmark results
+
+    Returns:
+        Report lines with the relative change of every shared metric
+    """
+    base_metrics: dict[str, float] = {}
+    current_metrics: dict[str, float] = {}
+    for corpus in baseline["corpora"]:
+        _flatten(f"{corpus['posts']}", corpus, base_metrics)
+    for corpus in current["corpora"]:
+        _flatten(f"{corpus['posts']}", corpus, current_metrics)
+
+    lines = []
+    for key in sorted(base_metrics.keys() & current_metrics.keys()):
+        if not key.endswith(("_ms", "_per_second")):
+            continue
+        before, after = base_metrics[key], current_metrics[key]
+        change = (after - before) / before * 100 if before else 0.0
+        lines.append(f"{key:<60} {before:>12.3f} {after:>12.3f} {change:>+8.1f}%")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the benchmark command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv``)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES), help="corpus sizes to generate")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per route")
+    parser.add_argument("--repeat", type=int, default=1, help="cold load_all_posts runs per corpus")
+    parser.add_argument("--parse-sample", type=int, default=500, help="files timed for parse throughput")
+    parser.add_argument("--output", type=Path, help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two results")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (json.loads(path.read_text(encoding="utf-8")) for path in args.compare)
+        print("\n".join(compare(baseline, current)))
+        return 0
+
+    results = run(args.sizes, requests=args.requests, repeat=args.repeat, parse_sample=args.parse_sample)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Compile markdown posts ahead of time into JSON artifacts.
+
+Every post below the content roots (nested directories included) is validated
+strictly (frontmatter, title, date and tags) and rendered once. The output
+directory holds one JSON file per post, a ``manifest.json`` recording each
+post's source path and hash, size, compile time and listing metadata (so index
+builds read the manifest alone), and the ``pygments.css`` style sheet for
+highlighted code; later runs only recompile posts whose source changed and
+print what changed::
+
+    python -m src.main_app.tools.compile --output compiled
+    python -m src.main_app.tools.compile --check
+
+Point ``COMPILED_DIR`` at the output directory to serve the compiled posts
+instead of parsing markdown at request time. The command exits non-zero if any
+post fails to compile, so CI and image builds stop on broken posts.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from ..utils.content import (
+    PYGMENTS_CSS_FILE,
+    _get_posts_directories,
+    compile_post_file,
+    discover_posts,
+    render_pygments_css,
+    serialize_post,
+)
+from ..utils.schema import PostError
+
+MANIFEST_VERSION = 4
+
+
+@dataclass
+class CompileReport:
+    """Outcome of a compile run, grouped by what happened to each slug."""
+
+    added: list[str] = field(default_factory=list)
+    changed: list[str] = field(default_factory=list)
+    removed: list[str] = field(default_factory=list)
+    unchanged: list[str] = field(default_factory=list)
+    failed: dict[str, str] = field(default_factory=dict)
+
+    @property
+    def ok(self) -> bool:
+        """Whether every post compiled."""
+        return not self.failed
+
+    def lines(self) -> list[str]:
+        """Format the report as a diff-style listing with a summary line."""
+        lines = [f"+ {slug}" for slug in self.added]
+        lines += [f"~ {slug}" for slug in self.changed]
+        lines += [f"- {slug}" for slug in self.removed]
+        lines += [f"! {slug}: {error}" for slug, error in self.failed.items()]
+        lines.append(
+            f"{len(self.added)} added, {len(self.changed)} changed, {len(self.removed)} removed, "
+            f"{len(self.unchanged)} unchanged, {len(self.failed)} failed"
+        )
+        return lines
+
+
+def _read_manifest(output_dir: Path) -> dict[str, dict[str, Any]]:
+    path = output_dir / "manifest.json"
+    try:
+        manifest = json.loads(path.read_text(encoding="utf-8"))
+    except (FileNotFoundError, json.JSONDecodeError):
+        return {}
+    if manifest.get("version") != MANIFEST_VERSION:
+        return {}
+    return manifest.get("posts", {})
+
+
+def _write_json(path: Path, data: Any):
+    tmp = path.with_suffix(".tmp")
+    tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _relative_source(source: Path, roots: list[Path]) -> str:
+    for root in roots:
+        if source.is_relative_to(root):
+            return source.relative_to(root).as_posix()
+    return source.name
+
+
+def compile_directory(
+    posts_dir: Path | list[Path], output_dir: Path, *, force: bool = False, write: bool = True
+) -> CompileReport:
+    """Compile changed posts and update the manifest.
+
+    Posts are classified against the previous manifest by source hash; only
+    added and changed posts are compiled unless ``force`` is set.
+
+    Args:
+        posts_dir: Directory of markdown posts, or several content roots in
+            priority order; posts may be nested below them
+        output_dir: Directory for artifacts and manifest
+        force: Compile every post even if its source is unchanged
+        write: Write artifacts and the manifest (False only validates)
+
+    Returns:
+        Report of added, changed, removed, unchanged and failed posts
+    """
+    previous = _read_manifest(output_dir)
+    if write:
+        (output_dir / "posts").mkdir(parents=True, exist_ok=True)
+
+    roots = [posts_dir] if isinstance(posts_dir, Path) else posts_dir
+    sources = discover_posts(roots)
+
+    report = CompileReport()
+    manifest: dict[str, dict[str, Any]] = {}
+    for slug, source in sources.items():
+        data = source.read_bytes()
+        digest = hashlib.sha256(data).hexdigest()
+        entry = previous.get(slug)
+        artifact = output_dir / "posts" / f"{slug}.json"
+        unchanged = entry is not None and entry["sha256"] == digest
+
+        if unchanged and not force and artifact.exists():
+            manifest[slug] = entry
+            report.unchanged.append(slug)
+            continue
+
+        started = time.perf_counter()
+        try:
+            post = compile_post_file(source, strict=True)
+        except PostError as e:
+            report.failed[slug] = str(e)
+            if entry is not None:
+                manifest[slug] = entry
+            continue
+        compile_ms = (time.perf_counter() - started) * 1000
+
+        if write:
+            _write_json(artifact, serialize_post(post))
+        manifest[slug] = {
+            "source": _relative_source(source, roots),
+            "sha256": digest,
+            "size": len(data),
+            "html_size": len(post.content.encode("utf-8")),
+            "compile_ms": round(compile_ms, 3),
+            "meta": {
+                "title": post.title,
+                "date": post.date.isoformat(),
+                "tags": post.tags,
+                "excerpt": post.excerpt,
+                "word_count": post.word_count,
+                "draft": post.draft,
+            },
+        }
+        if unchanged:
+            report.unchanged.append(slug)
+        else:
+            (report.changed if entry is not None else report.added).append(slug)
+
+    for slug in sorted(set(previous) - set(sources)):
+        report.removed.append(slug)
+        if write:
+            (output_dir / "posts" / f"{slug}.json").unlink(missing_ok=True)
+
+    if write:
+        (output_dir / PYGMENTS_CSS_FILE).write_text(render_pygments_css(), encoding="utf-8")
+        _write_json(output_dir / "manifest.json", {"version": MANIFEST_VERSION, "posts": manifest})
+    return report
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the compile command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv``)
+
+    Returns:
+        Process exit code (1 if any post failed to compile)
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--posts", type=Path, nargs="+", help="markdown roots, in priority order (default POSTS_DIR)")
+    parser.add_argument("--output", type=Path, default=Path("compiled"), help="artifact and manifest directory")
+    parser.add_argument("--force", action="store_true", help="recompile every post")
+    parser.add_argument("--check", action="store_true", help="validate every post and report the diff without writing")
+    args = parser.parse_args(argv)
+
+    posts_dirs = args.posts or _get_posts_directories()
+    missing = [posts_dir for posts_dir in posts_dirs if not posts_dir.is_dir()]
+    if missing:
+        print(f"Posts directory not found: {missing[0]}", file=sys.stderr)
+        return 1
+
+    report = compile_directory(posts_dirs, args.output, force=args.force or args.check, write=not args.check)
+    print("\n".join(report.lines()))
+    return 0 if report.ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,136 @@
+"""Synthetic blog corpus generation for benchmarks and load tests."""
+
+import random
+import re
+from datetime import date, timedelta
+from pathlib import Path
+
+_WORDS = (
+    "python async cache render layout request response middleware worker latency throughput "
+    "index listing feed sitemap markdown template component server client header body stream "
+    "memory profile compile deploy container socket buffer thread process queue schema record "
+    "the a of and to in is for on with that this as it be are by from at or an"
+).split()
+
+_CODE_SAMPLES = (
+    (
+        "python",
+        "def fibonacci(n: int) -> int:\n"
+        '    """Return the n-th Fibonacci number."""\n'
+        "    a, b = 0, 1\n"
+        "    for _ in range(n):\n"
+        "        a, b = b, a + b\n"
+        "    return a\n",
+    ),
+    (
+        "bash",
+        "uv sync --frozen\nuv run pytest -q\ndocker build -t personal-website .\n",
+    ),
+    (
+        "javascript",
+        "const toggle = document.getElementById('theme-toggle');\n"
+        "toggle.addEventListener('click', () => {\n"
+        "  document.documentElement.classList.toggle('dark');\n"
+        "});\n",
+    ),
+)
+
+
+_DATE = re.compile(r"^date: (\d{4})-(\d{2})", re.MULTILINE)
+
+
+def _sentence(rng: random.Random, length: int) -> str:
+    words = rng.choices(_WORDS, k=length)
+    return " ".join(words).capitalize() + "."
+
+
+def _paragraph(rng: random.Random) -> str:
+    return " ".join(_sentence(rng, rng.randint(8, 18)) for _ in range(rng.randint(3, 6)))
+
+
+def _table(rng: random.Random) -> str:
+    rows = ["| Metric | Before | After |", "| --- | --- | --- |"]
+    for _ in range(rng.randint(3, 8)):
+        rows.append(f"| {rng.choice(_WORDS)} | {rng.randint(1, 999)} ms | {rng.randint(1, 999)} ms |")
+    return "\n".join(rows)
+
+
+def render_post(rng: random.Random, index: int, tag_pool: list[str], sections: int = 4) -> str:
+    """Render one synthetic markdown post with frontmatter.
+
+    Args:
+        rng: Seeded random generator
+        index: Sequence number of the post, used in its title
+        tag_pool: Tags to draw the post's tags from
+        sections: Number of ``##`` sections in the body
+
+    Returns:
+        Markdown document including the YAML frontmatter block
+    """
+    title = f"{_sentence(rng, 4)[:-1]} {index}"
+    published = date(2020, 1, 1) + timedelta(days=rng.randint(0, 2000))
+    tags = rng.sample(tag_pool, k=min(len(tag_pool), rng.randint(3, 8)))
+
+    parts = [
+        "---",
+        f"title: {title}",
+        f"date: {published.isoformat()}",
+        f"tags: [{', '.join(tags)}]",
+        f"excerpt: {_sentence(rng, 20)}",
+        "---",
+        "",
+        f"# {title}",
+        "",
+        _paragraph(rng),
+    ]
+    for section in range(sections):
+        language, code = rng.choice(_CODE_SAMPLES)
+        parts += [
+            "",
+            f"## Section {section + 1}",
+            "",
+            _paragraph(rng),
+            "",
+            f"```{language}",
+            code.rstrip("\n"),
+            "```",
+            "",
+            _table(rng),
+            "",
+            _paragraph(rng),
+        ]
+    return "\n".join(parts) + "\n"
+
+
+def generate_corpus(
+    directory: Path, count: int, *, tags: int = 200, seed: int = 0, sharded: bool = False
+) -> list[Path]:
+    """Write a synthetic corpus of markdown posts.
+
+    Args:
+        directory: Directory to write posts into (created if missing)
+        count: Number of posts to generate
+        tags: Size of the tag pool posts draw from
+        seed: Seed for reproducible output
+        sharded: Lay posts out by publication month (``YYYY/MM/slug.md``)
+            instead of in one flat directory
+
+    Returns:
+        Paths of the generated post files
+    """
+    rng = random.Random(seed)
+    directory.mkdir(parents=True, exist_ok=True)
+    tag_pool = [f"tag-{i}" for i in range(tags)]
+
+    paths = []
+    for index in range(count):
+        text = render_post(rng, index, tag_pool)
+        shard = directory
+        if sharded:
+            year, month = _DATE.search(text).groups()
+            shard = directory / year / month
+            shard.mkdir(parents=True, exist_ok=True)
+        path = shard / f"synthetic-post-{index:05d}.md"
+        path.write_text(text, encoding="utf-8")
+        paths.append(path)
+    return paths
@@ -0,0 +1,480 @@
+"""Load generation with synthetic traffic mixes and access-log replay.
+
+Drives the ASGI app in-process, an already running server, or a local
+uvicorn started with a given number of workers::
+
+    python -m src.main_app.tools.loadtest --mix realistic --requests 5000 --concurrency 32
+    python -m src.main_app.tools.loadtest --spawn 4 --corpus 1000 --duration 30
+    python -m src.main_app.tools.loadtest --url http://127.0.0.1:8000 --replay access.log --speed 10
+
+Reports throughput, latency percentiles per traffic category, status codes
+and resident memory per worker, as text or JSON (``--output``).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import re
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import AsyncIterator, Iterator
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from .bench import summarize
+
+MIXES = {
+    "realistic": {"browse": 25, "read": 45, "tags": 10, "feed": 10, "static": 10},
+    "readers": {"browse": 20, "read": 70, "static": 10},
+    "crawler": {"browse": 30, "tags": 50, "read": 15, "feed": 5},
+    "feeds": {"feed": 90, "read": 10},
+}
+
+STATIC_PATHS = ("/static/css/custom.css", "/static/js/dark-mode.js")
+FEED_PATHS = ("/feed.xml", "/atom.xml", "/feed.json", "/sitemap.xml", "/robots.txt")
+FEED_NAMES = ("feed.xml", "atom.xml", "feed.json")
+
+# Common and combined log format: host ident user [time] "METHOD path protocol" status size ...
+_LOG_LINE = re.compile(r'^\S+ \S+ \S+ \[(?P<time>[^\]]+)\] "(?P<method>[A-Z]+) (?P<path>\S+)[^"]*"')
+_LOC = re.compile(r"<loc>https?://[^/]+(?P<path>/[^<]*)</loc>")
+_TAG_LINK = re.compile(r'href="(/tags/[^"?]+)"')
+
+
+@dataclass
+class Request:
+    """One request to issue."""
+
+    category: str
+    path: str
+    method: str = "GET"
+    offset: float | None = None
+
+
+@dataclass
+class Site:
+    """URLs discovered on the target site."""
+
+    posts: list[str] = field(default_factory=list)
+    tags: list[str] = field(default_factory=list)
+    pages: int = 1
+
+
+def parse_mix(spec: str) -> dict[str, float]:
+    """Parse a named mix or a ``category=weight,...`` specification.
+
+    Args:
+        spec: Mix name from ``MIXES`` or comma-separated weights
+
+    Returns:
+        Weights by traffic category
+
+    Raises:
+        ValueError: If the specification is malformed or names unknown categories
+    """
+    if spec in MIXES:
+        return dict(MIXES[spec])
+
+    weights = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in ("browse", "read", "tags", "feed", "static") or not weight:
+            raise ValueError(f"Invalid mix entry: {part!r}")
+        weights[name] = float(weight)
+    return weights
+
+
+def synthetic_requests(site: Site, mix: dict[str, float], seed: int = 0) -> Iterator[Request]:
+    """Generate an endless stream of requests following a traffic mix.
+
+    Args:
+        site: Discovered posts, tags and page count
+        mix: Weights by traffic category
+        seed: Seed for reproducible traffic
+
+    Yields:
+        Requests drawn according to the mix
+    """
+    rng = random.Random(seed)
+    categories = [name for name in mix if mix[name] > 0]
+    weights = [mix[name] for name in categories]
+
+    while True:
+        category = rng.choices(categories, weights)[0]
+        if category == "browse":
+            page = min(int(rng.expovariate(0.7)) + 1, site.pages)
+            path = "/" if page == 1 else f"/?page={page}"
+        elif category == "read" and site.posts:
+            path = rng.choice(site.posts)
+        elif category == "tags" and site.tags:
+            path = rng.choice(site.tags)
+            if rng.random() < 0.3:
+                path += f"?page={rng.randint(1, 3)}"
+        elif category == "feed":
+            if site.tags and rng.random() < 0.3:
+                path = f"{rng.choice(site.tags)}/{rng.choice(FEED_NAMES)}"
+            else:
+                path = rng.choice(FEED_PATHS)
+        elif category == "static":
+            path = rng.choice(STATIC_PATHS)
+        else:
+            path = "/"
+        yield Request(category, path)
+
+
+def _categorize(path: str) -> str:
+    if path.startswith("/posts/"):
+        return "read"
+    if path in FEED_PATHS or (path.startswith("/tags/") and path.rpartition("/")[2] in FEED_NAMES):
+        return "feed"
+    if path.startswith("/tags"):
+        return "tags"
+    if path.startswith("/static/"):
+        return "static"
+    if path == "/" or path.startswith("/?"):
+        return "browse"
+    return "other"
+
+
+def parse_access_log(lines: Iterator[str]) -> Iterator[Request]:
+    """Parse access-log lines into requests, keeping arrival offsets.
+
+    Accepts common/combined log format lines, or bare paths one per line.
+    Only GET and HEAD requests are replayed.
+
+    Args:
+        lines: Log lines
+
+    Yields:
+        Requests with their offset in seconds from the first logged request
+    """
+    first: datetime | None = None
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        match = _LOG_LINE.match(line)
+        if match is None:
+            if line.startswith("/"):
+                yield Request(_categorize(line), line)
+            continue
+
+        if match["method"] not in ("GET", "HEAD"):
+            continue
+
+        try:
+            logged_at = datetime.strptime(match["time"], "%d/%b/%Y:%H:%M:%S %z")
+        except ValueError:
+            offset = None
+        else:
+            first = first or logged_at
+            offset = (logged_at - first).total_seconds()
+        yield Request(_categorize(match["path"]), match["path"], match["method"], offset)
+
+
+async def discover_site(client) -> Site:
+    """Find post and tag URLs through the sitemap and tag index.
+
+    Args:
+        client: httpx client pointed at the target
+
+    Returns:
+        Discovered site structure
+    """
+    site = Site()
+    sitemap = await client.get("/sitemap.xml")
+    site.posts = [m["path"] for m in _LOC.finditer(sitemap.text) if m["path"].startswith("/posts/")]
+    tags = await client.get("/tags")
+    site.tags = sorted(set(_TAG_LINK.findall(tags.text)))
+    site.pages = max(1, (len(site.posts) + 9) // 10)
+    return site
+
+
+async def _schedule(requests: Iterator[Request], speed: float) -> AsyncIterator[Request]:
+    started = time.perf_counter()
+    for request in requests:
+        if speed > 0 and request.offset is not None:
+            delay = request.offset / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+        yield request
+
+
+async def run_load(
+    client,
+    requests: Iterator[Request],
+    *,
+    concurrency: int,
+    limit: int | None,
+    duration: float | None,
+    speed: float = 0.0,
+) -> dict[str, Any]:
+    """Issue requests with a fixed number of concurrent clients.
+
+    Args:
+        client: httpx client pointed at the target
+        requests: Requests to issue, in order
+        concurrency: Number of concurrent clients
+        limit: Stop after this many requests (None for no limit)
+        duration: Stop after this many seconds (None for no limit)
+        speed: Replay speed-up relative to logged arrival times (0 to ignore them)
+
+    Returns:
+        Throughput, latency, status and byte counts overall and per category
+    """
+    latencies: dict[str, list[float]] = {}
+    statuses: dict[str, int] = {}
+    errors = 0
+    received = 0
+    issued = 0
+    deadline = time.perf_counter() + duration if duration else None
+    source = _schedule(requests, speed)
+    lock = asyncio.Lock()
+
+    async def next_request() -> Request | None:
+        nonlocal issued
+        async with lock:
+            if (limit is not None and issued >= limit) or (deadline is not None and time.perf_counter() >= deadline):
+                return None
+            try:
+                request = await anext(source)
+            except StopAsyncIteration:
+                return None
+            issued += 1
+            return request
+
+    async def worker():
+        nonlocal errors, received
+        while (request := await next_request()) is not None:
+            started = time.perf_counter()
+            try:
+                response = await client.request(request.method, request.path, headers={"Accept-Encoding": "gzip"})
+            except Exception:
+                errors += 1
+                continue
+            latencies.setdefault(request.category, []).append(time.perf_counter() - started)
+            statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+            received += len(response.content)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    all_latencies = [value for values in latencies.values() for value in values]
+    return {
+        "requests": len(all_latencies),
+        "errors": errors,
+        "elapsed_seconds": round(elapsed, 3),
+        "throughput_rps": round(len(all_latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency": summarize(all_latencies),
+        "by_category": {name: summarize(values) for name, values in sorted(latencies.items())},
+        "status": statuses,
+        "bytes_received": received,
+    }
+
+
+def _rss_bytes(pid: int) -> int | None:
+    try:
+        with open(f"/proc/{pid}/status", encoding="ascii") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def _child_pids(pid: int) -> list[int]:
+    children = []
+    for entry in Path("/proc").iterdir() if Path("/proc").is_dir() else []:
+        if not entry.name.isdigit():
+            continue
+        try:
+            stat = (entry / "stat").read_text(encoding="ascii")
+        except OSError:
+            continue
+        # The parent pid is the second field after the parenthesized command name
+        if int(stat.rsplit(")", 1)[1].split()[1]) == pid:
+            children.append(int(entry.name))
+    return children
+
+
+def worker_memory(pid: int) -> dict[str, int | None]:
+    """Resident memory of a server process and its worker processes.
+
+    Args:
+        pid: Pid of the server (or of this process when running in-process)
+
+    Returns:
+        RSS in bytes keyed by pid
+    """
+    pids = _child_pids(pid) or [pid]
+    return {str(worker_pid): _rss_bytes(worker_pid) for worker_pid in pids}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+async def _wait_for_health(client, timeout: float = 30.0):
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            if (await client.get("/health")).status_code == 200:
+                return
+        except Exception:
+            pass
+        await asyncio.sleep(0.2)
+    raise RuntimeError("Server did not become healthy")
+
+
+async def _run(args, requests: Iterator[Request] | None) -> dict[str, Any]:
+    import httpx
+
+    server = None
+    timeout = httpx.Timeout(30.0)
+    if args.url:
+        client = httpx.AsyncClient(base_url=args.url, timeout=timeout)
+        target = args.url
+    elif args.spawn:
+        port = _free_port()
+        server = subprocess.Popen(
+            [sys.executable, "-m", "uvicorn", "src.main_app.app:app"]
+            + ["--port", str(port), "--workers", str(args.spawn)],
+            env=os.environ.copy(),
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        target = f"http://127.0.0.1:{port}"
+        client = httpx.AsyncClient(base_url=target, timeout=timeout, limits=httpx.Limits(max_connections=None))
+    else:
+        from ..app import app
+
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=timeout)
+        target = "in-process"
+
+    try:
+        async with client:
+            if server is not None:
+                await _wait_for_health(client)
+            if requests is None:
+                requests = synthetic_requests(await discover_site(client), parse_mix(args.mix), seed=args.seed)
+
+            results = await run_load(
+                client,
+                requests,
+                concurrency=args.concurrency,
+                limit=args.requests,
+                duration=args.duration,
+                speed=args.speed,
+            )
+            if server is not None:
+                memory = worker_memory(server.pid)
+            elif args.url:
+                memory = {"note": "remote target; see process_resident_memory_bytes on /metrics"}
+            else:
+                memory = {str(os.getpid()): _rss_bytes(os.getpid())}
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=30)
+
+    return {
+        "label": args.label,
+        "target": target,
+        "workers": args.spawn or 1,
+        "mix": "replay" if args.replay else args.mix,
+        "concurrency": args.concurrency,
+        **results,
+        "memory_rss_bytes": memory,
+    }
+
+
+def format_report(report: dict[str, Any]) -> str:
+    """Format load test results for the terminal.
+
+    Args:
+        report: Results from a load test run
+
+    Returns:
+        Human-readable report
+    """
+    latency = report["latency"]
+    lines = [
+        f"target: {report['target']}  workers: {report['workers']}  mix: {report['mix']}  "
+        f"concurrency: {report['concurrency']}",
+        f"requests: {report['requests']}  errors: {report['errors']}  elapsed: {report['elapsed_seconds']}s  "
+        f"throughput: {report['throughput_rps']} req/s",
+        f"latency: p50 {latency['p50_ms']} ms  p99 {latency['p99_ms']} ms  max {latency['max_ms']} ms",
+    ]
+    for category, summary in report["by_category"].items():
+        lines.append(f"  {category:<8} n={summary['count']:<6} p50 {summary['p50_ms']} ms  p99 {summary['p99_ms']} ms")
+    lines.append(f"status: {report['status']}")
+    for pid, rss in report["memory_rss_bytes"].items():
+        lines.append(f"memory {pid}: {rss / 1048576:.1f} MiB" if isinstance(rss, int) else f"memory: {rss}")
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the load test command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv``)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    target = parser.add_mutually_exclusive_group()
+    target.add_argument("--url", help="base URL of a running server")
+    target.add_argument("--spawn", type=int, metavar="WORKERS", help="start a local uvicorn with this many workers")
+    parser.add_argument("--mix", default="realistic", help=f"traffic mix ({', '.join(MIXES)}) or e.g. read=3,feed=1")
+    parser.add_argument("--replay", type=Path, help="replay an access log instead of a synthetic mix")
+    parser.add_argument("--speed", type=float, default=0.0, help="replay speed-up; 0 ignores logged timing")
+    parser.add_argument("--requests", type=int, help="number of requests to issue")
+    parser.add_argument("--duration", type=float, help="seconds to run for")
+    parser.add_argument("--concurrency", type=int, default=16, help="concurrent clients")
+    parser.add_argument("--corpus", type=int, help="serve a synthetic corpus of this many posts (not with --url)")
+    parser.add_argument("--seed", type=int, default=0, help="seed for synthetic traffic")
+    parser.add_argument("--label", default="", help="free-form label recorded in the results")
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    if args.requests is None and args.duration is None and args.replay is None:
+        args.requests = 1000
+
+    try:
+        parse_mix(args.mix)
+    except ValueError as e:
+        parser.error(str(e))
+
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        if args.corpus:
+            from .corpus import generate_corpus
+
+            generate_corpus(Path(workdir), args.corpus)
+            os.environ["POSTS_DIR"] = workdir
+
+        if args.replay:
+            with open(args.replay, encoding="utf-8", errors="replace") as log:
+                report = asyncio.run(_run(args, parse_access_log(log)))
+        else:
+            report = asyncio.run(_run(args, None))
+
+    print(format_report(report))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
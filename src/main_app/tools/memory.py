@@ -0,0 +1,297 @@
+"""Memory footprint of the content layer, measured with tracemalloc.
+
+Loads the configured corpus (``POSTS_DIR`` or ``COMPILED_DIR``) into a fresh
+process the way a worker does, one cache at a time, and reports the memory
+each structure retains: the post listing and publication index, the tag,
+archive and page indexes, the Pygments style sheet, the related-posts index,
+the renderer (modules and parser caches left behind by loading every post
+once, mostly Pygments lexers in markdown mode), the ``load_post`` cache filled
+to capacity, and rendered pages and feeds cached by the compression and
+fast-path layers. A sample of posts (every post with ``--sample -1``) is also
+loaded one at a time to report each post's retained size, the largest posts,
+and the memory that dropping ``raw_content`` from loaded posts would save::
+
+    python -m src.main_app.tools.memory --output memory.json
+    COMPILED_DIR=compiled python -m src.main_app.tools.memory --top 20
+
+``GET /admin/memory`` runs the same report in a subprocess of the worker.
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import gc
+import json
+import sys
+import tracemalloc
+from collections.abc import Callable
+from pathlib import Path
+from typing import Any
+
+DEFAULT_TOP = 10
+
+# Pages requested to fill the page caches, besides the home page and feeds
+DEFAULT_PAGES = 20
+
+# Posts measured on their own; rendering under tracemalloc is several times
+# slower, so large corpora are sampled evenly
+DEFAULT_SAMPLE = 200
+
+
+def _retained() -> int:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0]
+
+
+def _snapshot() -> tracemalloc.Snapshot:
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def measure_stage(name: str, build: Callable[[], int], top: int) -> dict[str, Any]:
+    """Measure the memory retained by building one structure.
+
+    Args:
+        name: Structure name
+        build: Callable that builds and caches the structure, returning its
+            number of entries
+        top: Number of allocation sites to list
+
+    Returns:
+        Retained bytes, entries, bytes per entry and the source lines that
+        allocated most of the retained memory
+    """
+    before_snapshot = _snapshot()
+    before = _retained()
+    entries = build()
+    retained = _retained() - before
+    sites = _snapshot().compare_to(before_snapshot, "lineno")
+    return {
+        "name": name,
+        "bytes": retained,
+        "entries": entries,
+        "bytes_per_entry": retained // entries if entries else 0,
+        "sites": [
+            {"site": f"{stat.traceback[0].filename}:{stat.traceback[0].lineno}", "bytes": stat.size_diff}
+            for stat in sites[:top]
+            if stat.size_diff > 0
+        ],
+    }
+
+
+def _post_fields(post) -> dict[str, int]:
+    return {
+        "content": sys.getsizeof(post.content),
+        "raw_content": sys.getsizeof(post.raw_content),
+        "toc": sys.getsizeof(post.toc),
+    }
+
+
+def measure_posts(slugs: list[str], top: int) -> tuple[dict[str, Any], dict[str, Any]]:
+    """Measure posts on their own, and the saving from dropping ``raw_content``.
+
+    Posts are loaded without going through the ``load_post`` cache and kept
+    alive until all are measured, so each measurement is the memory that one
+    post retains.
+
+    Args:
+        slugs: Posts to measure
+        top: Number of largest posts to list
+
+    Returns:
+        Per-post statistics with the largest posts, and the ``raw_content``
+        saving per post and for a full ``load_post`` cache
+    """
+    from ..utils import content
+
+    load = content._load_post.__wrapped__
+    held = []
+    sizes = []
+    # Freezing what is already measured keeps each collection, which frees
+    # the reference cycles a render leaves behind, to the newest objects
+    before = _retained()
+    gc.freeze()
+    try:
+        for slug in slugs:
+            # Only ``held`` may reference a post, or the raw_content saving
+            # below would miss it
+            held.append(load(slug))
+            if held[-1] is None:
+                held.pop()
+                continue
+            after = _retained()
+            gc.freeze()
+            sizes.append({"slug": slug, "bytes": after - before, **_post_fields(held[-1])})
+            before = after
+    finally:
+        gc.unfreeze()
+
+    total = sum(size["bytes"] for size in sizes)
+    posts = {
+        "measured": len(sizes),
+        "bytes": total,
+        "mean_bytes": total // len(sizes) if sizes else 0,
+        "largest": sorted(sizes, key=lambda size: size["bytes"], reverse=True)[:top],
+    }
+
+    before = _retained()
+    held[:] = [dataclasses.replace(post, raw_content="") for post in held]
+    saved = before - _retained()
+    capacity = content._load_post.cache_info().maxsize
+    per_post = saved // len(held) if held else 0
+    raw_content = {
+        "saved_bytes": saved,
+        "saved_per_post": per_post,
+        "saved_percent": round(100 * saved / total, 1) if total else 0.0,
+        "load_post_capacity": capacity,
+        "saved_in_full_cache": per_post * min(capacity, len(held)),
+    }
+    return posts, raw_content
+
+
+async def _request_pages(paths: list[str]) -> int:
+    import httpx
+
+    from ..app import app
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://memory") as client:
+        for path in paths:
+            await client.get(path, headers={"Accept-Encoding": "gzip"})
+    return len(paths)
+
+
+def run(*, top: int = DEFAULT_TOP, pages: int = DEFAULT_PAGES, sample: int | None = DEFAULT_SAMPLE) -> dict[str, Any]:
+    """Load the corpus under tracemalloc and report retained memory.
+
+    Args:
+        top: Number of allocation sites per structure and of largest posts
+        pages: Number of post and tag pages requested to fill the page caches
+        sample: Number of posts, spread evenly over the corpus, measured on
+            their own; 0 skips them and None measures every post
+
+    Returns:
+        Machine-readable report
+    """
+    from ..app import app  # noqa: F401
+    from ..utils import content
+    from ..utils.feeds import FEED_FORMATS
+    from ..utils.related import get_related_index
+
+    # Serve a request first so lazily imported request machinery is not
+    # attributed to the first structure measured
+    content.clear_content_cache()
+    asyncio.run(_request_pages(["/", "/health"]))
+    content.clear_content_cache()
+
+    tracemalloc.start()
+    try:
+
+        def build_indexes() -> int:
+            tags, months = content.get_all_tags(), content.get_archive_months()
+            return len(tags) + len(months) + content.get_page_index().total_pages
+
+        def render_all() -> int:
+            load = content._load_post.__wrapped__
+            return sum(load(post.slug) is not None for post in content.load_all_posts())
+
+        def fill_post_cache() -> int:
+            capacity = content._load_post.cache_info().maxsize
+            return sum(content.load_post(post.slug) is not None for post in content.load_all_posts()[:capacity])
+
+        start = _retained()
+        stages = [
+            measure_stage("load_all_posts", lambda: len(content.load_all_posts()), top),
+            measure_stage("indexes", build_indexes, top),
+            measure_stage("pygments_css", lambda: 1 if content.get_pygments_css() else 0, top),
+            measure_stage("related_index", lambda: len(get_related_index().posts), top),
+            measure_stage("renderer", render_all, top),
+            measure_stage("load_post", fill_post_cache, top),
+        ]
+        posts = content.load_all_posts()
+        paths = ["/", *(f"/posts/{post.slug}" for post in posts[:pages])]
+        paths += [f"/tags/{tag}" for tag in content.get_all_tags()[:pages]]
+        paths += [f"/{name}" for name in FEED_FORMATS] + ["/sitemap.xml"]
+        stages.append(measure_stage("pages", lambda: asyncio.run(_request_pages(paths)), top))
+        total = _retained() - start
+
+        report: dict[str, Any] = {
+            "mode": "compiled" if content._get_compiled_directory() is not None else "markdown",
+            "posts": len(posts),
+            "total_bytes": total,
+            "structures": stages,
+        }
+        if sample != 0:
+            step = max(1, len(posts) // sample) if sample else 1
+            slugs = [post.slug for post in posts[::step]][:sample]
+            report["per_post"], report["raw_content"] = measure_posts(slugs, top)
+        return report
+    finally:
+        tracemalloc.stop()
+
+
+def format_report(report: dict[str, Any]) -> list[str]:
+    """Format a report as a table for the terminal.
+
+    Args:
+        report: Output of ``run``
+
+    Returns:
+        Report lines
+    """
+
+    def kib(value: int) -> str:
+        return f"{value / 1024:,.1f} KiB"
+
+    lines = [f"{report['posts']} posts ({report['mode']}), {kib(report['total_bytes'])} retained", ""]
+    for stage in report["structures"]:
+        lines.append(
+            f"{stage['name']:<16} {kib(stage['bytes']):>14} {stage['entries']:>8} entries "
+            f"{kib(stage['bytes_per_entry']):>12} each"
+        )
+    if "per_post" in report:
+        per_post, raw = report["per_post"], report["raw_content"]
+        lines += [
+            "",
+            f"{per_post['measured']} of {report['posts']} posts measured, "
+            f"{kib(per_post['mean_bytes'])} each on average",
+        ]
+        lines += [f"  {size['slug']:<50} {kib(size['bytes']):>14}" for size in per_post["largest"]]
+        lines += [
+            "",
+            f"Dropping raw_content saves {kib(raw['saved_per_post'])} per post ({raw['saved_percent']}%), "
+            f"{kib(raw['saved_in_full_cache'])} in a full load_post cache of {raw['load_post_capacity']}",
+        ]
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the memory report command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv``)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--top", type=int, default=DEFAULT_TOP, help="largest posts and allocation sites listed")
+    parser.add_argument("--pages", type=int, default=DEFAULT_PAGES, help="post and tag pages requested")
+    parser.add_argument(
+        "--sample", type=int, default=DEFAULT_SAMPLE, help="posts measured on their own (0 for none, -1 for all)"
+    )
+    parser.add_argument("--json", action="store_true", help="print JSON instead of a table")
+    parser.add_argument("--output", type=Path, help="write JSON results to this file")
+    args = parser.parse_args(argv)
+
+    report = run(top=args.top, pages=args.pages, sample=None if args.sample < 0 else args.sample)
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    elif args.json:
+        print(json.dumps(report))
+    else:
+        print("\n".join(format_report(report)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
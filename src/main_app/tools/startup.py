@@ -0,0 +1,266 @@
+"""Worker start-up profile: import time and time to the first response.
+
+Each run starts a fresh interpreter, the way a new worker boots, imports the
+application and serves one request to ``/`` in-process. Runs are repeated for
+wall-clock timings, and one extra run under ``python -X importtime`` breaks the
+import down by module and by package. Both content modes are profiled:
+``markdown`` parses posts at request time and ``compiled`` serves artifacts
+built by ``tools.compile`` (the posts are compiled into a scratch directory)::
+
+    python -m src.main_app.tools.startup --repeat 10 --output startup.json
+    python -m src.main_app.tools.startup --compare baseline.json startup.json
+
+The report also lists which of the heavy rendering dependencies were imported
+after start-up and after the first request, so a change that pulls one of them
+back into worker boot shows up.
+"""
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from .bench import _flatten, _metadata, summarize
+
+MODES = ("markdown", "compiled")
+
+# Only needed to render markdown; a compiled-content worker should not import them
+HEAVY_MODULES = ("markdown", "frontmatter", "yaml", "pygments.formatters")
+
+ROOT = Path(__file__).resolve().parents[3]
+
+_CHILD = f"""
+import asyncio, json, sys, time
+
+started = time.perf_counter()
+from src.main_app.app import app
+imported = time.perf_counter()
+after_import = [name for name in {HEAVY_MODULES!r} if name in sys.modules]
+
+async def first_request():
+    messages = []
+
+    async def receive():
+        return {{"type": "http.request", "body": b"", "more_body": False}}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {{
+        "type": "http", "asgi": {{"version": "3.0"}}, "http_version": "1.1", "method": "GET", "scheme": "http",
+        "path": "/", "raw_path": b"/", "root_path": "", "query_string": b"", "headers": [(b"host", b"startup")],
+        "client": ("127.0.0.1", 0), "server": ("startup", 80),
+    }}
+    await app(scope, receive, send)
+    return messages[0]["status"]
+
+status = asyncio.run(first_request())
+served = time.perf_counter()
+print(json.dumps({{
+    "import_s": imported - started,
+    "first_request_s": served - imported,
+    "status": status,
+    "after_import": after_import,
+    "after_request": [name for name in {HEAVY_MODULES!r} if name in sys.modules],
+}}))
+"""
+
+_IMPORTTIME = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def parse_importtime(text: str) -> list[dict[str, Any]]:
+    """Parse the output of ``python -X importtime``.
+
+    Args:
+        text: Standard error of an interpreter run with ``-X importtime``
+
+    Returns:
+        One entry per imported module, in import order, with its self and
+        cumulative times in microseconds and its nesting depth
+    """
+    modules = []
+    for line in text.splitlines():
+        match = _IMPORTTIME.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            modules.append(
+                {
+                    "module": name,
+                    "self_us": int(self_us),
+                    "cumulative_us": int(cumulative_us),
+                    "depth": (len(indent) - 1) // 2,
+                }
+            )
+    return modules
+
+
+def summarize_importtime(modules: list[dict[str, Any]], top: int) -> dict[str, Any]:
+    """Summarize parsed import times.
+
+    Args:
+        modules: Output of ``parse_importtime``
+        top: Number of modules and packages to list
+
+    Returns:
+        Total import time, the slowest modules by cumulative and by self
+        time, self time per top-level package, and this application's modules
+    """
+
+    def row(entry: dict[str, Any]) -> dict[str, Any]:
+        return {
+            "module": entry["module"],
+            "self_ms": round(entry["self_us"] / 1000, 3),
+            "cumulative_ms": round(entry["cumulative_us"] / 1000, 3),
+        }
+
+    packages: dict[str, int] = {}
+    for entry in modules:
+        package = entry["module"].split(".")[0]
+        packages[package] = packages.get(package, 0) + entry["self_us"]
+
+    return {
+        "modules": len(modules),
+        "total_ms": round(sum(entry["self_us"] for entry in modules) / 1000, 3),
+        "top_cumulative": [row(e) for e in sorted(modules, key=lambda e: e["cumulative_us"], reverse=True)[:top]],
+        "top_self": [row(e) for e in sorted(modules, key=lambda e: e["self_us"], reverse=True)[:top]],
+        "packages": {
+            name: round(us / 1000, 3) for name, us in sorted(packages.items(), key=lambda item: -item[1])[:top]
+        },
+        "app_modules": [row(e) for e in modules if e["module"].startswith("src.main_app")],
+    }
+
+
+def _child(env: dict[str, str], *options: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, *options, "-c", _CHILD], cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    )
+
+
+def profile_mode(env: dict[str, str], *, repeat: int, top: int) -> dict[str, Any]:
+    """Profile worker start-up for one environment.
+
+    Args:
+        env: Environment of the worker processes
+        repeat: Number of timed cold starts
+        top: Number of modules and packages to list
+
+    Returns:
+        Timing summaries of the whole process, the application import and
+        the first request, the heavy modules loaded, and the import breakdown
+    """
+    process, imports, requests = [], [], []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = json.loads(_child(env).stdout)
+        process.append(time.perf_counter() - started)
+        imports.append(result["import_s"])
+        requests.append(result["first_request_s"])
+
+    profiled = _child(env, "-X", "importtime")
+    result = json.loads(profiled.stdout)
+    return {
+        "process": summarize(process),
+        "import": summarize(imports),
+        "first_request": summarize(requests),
+        "status": result["status"],
+        "heavy_modules": {"after_import": result["after_import"], "after_request": result["after_request"]},
+        "importtime": summarize_importtime(parse_importtime(profiled.stderr), top),
+    }
+
+
+def run(modes: list[str], *, repeat: int, top: int) -> dict[str, Any]:
+    """Profile worker start-up in each content mode.
+
+    Args:
+        modes: Content modes to profile, from ``MODES``
+        repeat: Number of timed cold starts per mode
+        top: Number of modules and packages to list
+
+    Returns:
+        Machine-readable results including run metadata
+    """
+    from ..utils.content import _get_posts_directories
+    from .compile import compile_directory
+
+    results: dict[str, Any] = {}
+    with tempfile.TemporaryDirectory(prefix="startup-") as workdir:
+        for mode in modes:
+            env = {key: value for key, value in os.environ.items() if key != "COMPILED_DIR"}
+            if mode == "compiled":
+                compile_directory(_get_posts_directories(), Path(workdir))
+                env["COMPILED_DIR"] = workdir
+            results[mode] = profile_mode(env, repeat=repeat, top=top)
+    return {"meta": _metadata(), "modes": results}
+
+
+def compare(baseline: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    """Compare two result documents timing by timing.
+
+    Args:
+        baseline: Earlier start-up results
+        current: Newer start-up results
+
+    Returns:
+        Report lines with the relative change of every shared timing
+    """
+    base_metrics: dict[str, float] = {}
+    current_metrics: dict[str, float] = {}
+    for mode, result in baseline["modes"].items():
+        _flatten(mode, {key: result[key] for key in ("process", "import", "first_request")}, base_metrics)
+    for mode, result in current["modes"].items():
+        _flatten(mode, {key: result[key] for key in ("process", "import", "first_request")}, current_metrics)
+
+    lines = []
+    for key in sorted(base_metrics.keys() & current_metrics.keys()):
+        before, after = base_metrics[key], current_metrics[key]
+        change = (after - before) / before * 100 if before else 0.0
+        lines.append(f"{key:<40} {before:>12.3f} {after:>12.3f} {change:>+8.1f}%")
+    for mode in sorted(baseline["modes"].keys() & current["modes"].keys()):
+        before = set(baseline["modes"][mode]["heavy_modules"]["after_import"])
+        after = set(current["modes"][mode]["heavy_modules"]["after_import"])
+        for name in sorted(after - before):
+            lines.append(f"{mode}: now imports {name} at start-up")
+        for name in sorted(before - after):
+            lines.append(f"{mode}: no longer imports {name} at start-up")
+    return lines
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the start-up profile command line interface.
+
+    Args:
+        argv: Command line arguments (defaults to ``sys.argv``)
+
+    Returns:
+        Process exit code
+    """
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--modes", nargs="+", choices=MODES, default=list(MODES), help="content modes to profile")
+    parser.add_argument("--repeat", type=int, default=5, help="timed cold starts per mode")
+    parser.add_argument("--top", type=int, default=15, help="modules and packages listed in the breakdown")
+    parser.add_argument("--output", type=Path, help="write JSON results to this file instead of stdout")
+    parser.add_argument("--compare", type=Path, nargs=2, metavar=("BASELINE", "CURRENT"), help="compare two results")
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        baseline, current = (json.loads(path.read_text(encoding="utf-8")) for path in args.compare)
+        print("\n".join(compare(baseline, current)))
+        return 0
+
+    results = run(args.modes, repeat=args.repeat, top=args.top)
+    output = json.dumps(results, indent=2)
+    if args.output:
+        args.output.write_text(output + "\n", encoding="utf-8")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,446 @@
+"""Two-tier cache for rendered artifacts shared between workers and restarts.
+
+Every worker keeps its own in-process caches (``lru_cache`` for posts, the
+fast-path buffers, the compressed-body cache), so each one renders the same
+pages, feeds and posts again after it starts. ``TieredCache`` puts a shared
+second tier behind an in-process LRU: a lookup tries the worker's own memory
+(L1), then the shared backend (L2), and only renders on a miss in both, after
+which the result is written to both tiers.
+
+Backends follow a small Redis-style protocol (``get``, ``set`` with an
+expiry in seconds, ``delete``), so a ``redis.Redis`` client can be used as is.
+``SQLiteBackend`` shares a database file between the workers of one host and
+survives restarts, and ``MemoryBackend`` is a per-process stand-in for tests
+and single-worker development. ``CACHE_URL`` selects the backend
+(``sqlite:///path/to/cache.db``, ``redis://host:6379/0`` or ``memory://``);
+without it only the in-process tier is used.
+
+Shared entries must not depend on the worker that built them, so keys carry
+``code_version()`` (a digest of the application source and the rendering
+libraries) and callers add a digest of the content they were built from.
+Stale entries are never read again and expire after ``CACHE_TTL`` seconds.
+
+Backends block on file or network I/O. Code running on the event loop uses
+``aget`` and ``aset``, which answer from the in-process tier directly and
+reach the backend from a worker thread.
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from functools import cache
+from importlib import metadata
+from pathlib import Path
+from typing import Protocol
+
+from starlette.concurrency import run_in_threadpool
+
+from .metrics import counter
+
+logger = logging.getLogger(__name__)
+
+CACHE_LOOKUPS = counter(
+    "shared_cache_lookups_total", "Two-tier cache lookups by cache and the tier that answered.", ("cache", "result")
+)
+CACHE_EVICTIONS = counter("shared_cache_evictions_total", "Entries evicted from the in-process tier.", ("cache",))
+
+DEFAULT_TTL = 24 * 60 * 60
+
+# Libraries whose version changes rendered output
+RENDERING_DISTRIBUTIONS = ("python-fasthtml", "markdown", "pygments")
+
+PACKAGE_DIR = Path(__file__).resolve().parents[1]
+
+
+class CacheBackend(Protocol):
+    """Shared key-value store, a subset of the Redis client interface."""
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored under a key, or None if missing or expired."""
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> object:
+        """Store a value, expiring after ``ex`` seconds (never if None)."""
+
+    def delete(self, key: str) -> object:
+        """Remove a key."""
+
+
+class MemoryBackend:
+    """In-process backend with the shared-backend interface.
+
+    Entries live only as long as the process, so this stands in for a shared
+    store in tests and single-worker development.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic):
+        """Create an empty store.
+
+        Args:
+            clock: Time source for expiry, in seconds
+        """
+        self.clock = clock
+        self._entries: dict[str, tuple[bytes, float | None]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored under a key, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            value, expires = entry
+            if expires is not None and expires <= self.clock():
+                del self._entries[key]
+                return None
+            return value
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        """Store a value, expiring after ``ex`` seconds (never if None)."""
+        with self._lock:
+            self._entries[key] = (value, self.clock() + ex if ex is not None else None)
+        return True
+
+    def delete(self, key: str) -> int:
+        """Remove a key, returning the number of keys removed."""
+        with self._lock:
+            return 1 if self._entries.pop(key, None) is not None else 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteBackend:
+    """Backend storing entries in a SQLite database shared by the workers of a host.
+
+    The database runs in WAL mode, so readers never wait for the writer.
+    Each process and thread opens its own connection on first use, which
+    keeps connections from leaking across ``fork``. Expired entries are
+    pruned every ``prune_every`` writes, and the oldest entries beyond
+    ``max_entries`` with them.
+    """
+
+    def __init__(self, path: str | Path, max_entries: int = 10_000, prune_every: int = 256):
+        """Open (and create if needed) a cache database.
+
+        Args:
+            path: Database file
+            max_entries: Entries kept when pruning
+            prune_every: Writes between prunes
+        """
+        self.path = Path(path)
+        self.max_entries = max_entries
+        self.prune_every = prune_every
+        self._local = threading.local()
+        self._writes = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._connection()
+
+    def _connection(self) -> sqlite3.Connection:
+        local = self._local
+        if getattr(local, "pid", None) != os.getpid():
+            connection = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            connection.execute(
+                "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value BLOB NOT NULL, expires REAL)"
+            )
+            local.connection, local.pid = connection, os.getpid()
+        return local.connection
+
+    def get(self, key: str) -> bytes | None:
+        """Return the value stored under a key, or None if missing or expired."""
+        row = (
+            self._connection()
+            .execute("SELECT value FROM entries WHERE key = ? AND (expires IS NULL OR expires > ?)", (key, time.time()))
+            .fetchone()
+        )
+        return bytes(row[0]) if row is not None else None
+
+    def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        """Store a value, expiring after ``ex`` seconds (never if None)."""
+        expires = time.time() + ex if ex is not None else None
+        connection = self._connection()
+        connection.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?)", (key, value, expires))
+        self._writes += 1
+        if self._writes % self.prune_every == 0:
+            self.prune()
+        return True
+
+    def delete(self, key: str) -> int:
+        """Remove a key, returning the number of keys removed."""
+        return self._connection().execute("DELETE FROM entries WHERE key = ?", (key,)).rowcount
+
+    def prune(self) -> int:
+        """Remove expired entries, then the oldest beyond ``max_entries``.
+
+        Returns:
+            Number of entries removed
+        """
+        connection = self._connection()
+        removed = connection.execute("DELETE FROM entries WHERE expires <= ?", (time.time(),)).rowcount
+        removed += connection.execute(
+            "DELETE FROM entries WHERE key IN (SELECT key FROM entries ORDER BY expires IS NULL, expires "
+            "LIMIT max((SELECT count(*) FROM entries) - ?, 0))",
+            (self.max_entries,),
+        ).rowcount
+        return removed
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT count(*) FROM entries").fetchone()[0]
+
+
+def backend_from_url(url: str) -> CacheBackend:
+    """Create the backend a cache URL names.
+
+    Args:
+        url: ``sqlite:///path/to/cache.db``, ``redis://...`` or ``memory://``
+
+    Returns:
+        The backend
+
+    Raises:
+        ValueError: If the scheme is unknown, or Redis is requested without
+            the ``redis`` package installed
+    """
+    scheme, _, location = url.partition("://")
+    if scheme == "memory":
+        return MemoryBackend()
+    if scheme == "sqlite":
+        return SQLiteBackend(location)
+    if scheme in ("redis", "rediss", "unix"):
+        try:
+            import redis
+        except ImportError as e:
+            raise ValueError("redis:// cache URLs need the redis package") from e
+        return redis.Redis.from_url(url)
+    raise ValueError(f"Unknown cache URL scheme {scheme!r}")
+
+
+def backend_from_env() -> CacheBackend | None:
+    """Create the shared backend configured by ``CACHE_URL``.
+
+    Returns:
+        The backend, or None if the shared tier is off or misconfigured
+    """
+    url = os.environ.get("CACHE_URL")
+    if not url:
+        return None
+    try:
+        return backend_from_url(url)
+    except (ValueError, OSError, sqlite3.Error) as e:
+        logger.error(f"Invalid cache configuration, shared cache disabled: {e}")
+        return None
+
+
+_backend: CacheBackend | None = None
+
+
+def get_backend() -> CacheBackend | None:
+    """The shared backend in use, or None if the shared tier is off."""
+    return _backend
+
+
+def set_backend(backend: CacheBackend | None):
+    """Switch the shared backend used by every ``TieredCache``.
+
+    Args:
+        backend: Backend to use, or None to turn the shared tier off
+    """
+    global _backend
+    _backend = backend
+
+
+def cache_ttl() -> int:
+    """Seconds shared entries are kept (``CACHE_TTL``)."""
+    try:
+        return int(os.environ.get("CACHE_TTL", DEFAULT_TTL))
+    except ValueError:
+        return DEFAULT_TTL
+
+
+@cache
+def code_version() -> str:
+    """Digest of the code that renders cached artifacts.
+
+    Covers the application's modules and the versions of the rendering
+    libraries, so workers running different releases never share entries.
+    Computed once, when this module is imported, so no request pays for
+    reading the source.
+
+    Returns:
+        Hex digest
+    """
+    digest = hashlib.blake2b(digest_size=8)
+    for path in sorted(PACKAGE_DIR.rglob("*.py")):
+        digest.update(str(path.relative_to(PACKAGE_DIR)).encode())
+        digest.update(path.read_bytes())
+    for distribution in RENDERING_DISTRIBUTIONS:
+        try:
+            digest.update(f"{distribution}={metadata.version(distribution)}".encode())
+        except metadata.PackageNotFoundError:
+            pass
+    return digest.hexdigest()
+
+
+code_version()
+
+
+class TieredCache:
+    """In-process LRU (L1) in front of the shared backend (L2).
+
+    The in-process tier works with or without a shared backend; a cache
+    with ``max_entries=0``, whose caller keeps its own L1, is only active
+    while a backend is configured. Callers check ``enabled()`` and otherwise
+    build as they did before. Backend errors are logged and treated as
+    misses, so an unavailable store slows workers down but never fails a
+    request.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        max_entries: int = 256,
+        backend: Callable[[], CacheBackend | None] = get_backend,
+        ttl: Callable[[], int] = cache_ttl,
+    ):
+        """Create an empty cache.
+
+        Args:
+            name: Cache name reported in metrics
+            max_entries: Entries kept in process; 0 when the caller keeps its own L1
+            backend: Returns the shared backend, or None when it is off
+            ttl: Returns the expiry of shared entries in seconds
+        """
+        self.name = name
+        self.max_entries = max_entries
+        self.backend = backend
+        self.ttl = ttl
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def enabled(self) -> bool:
+        """Whether either tier can hold entries."""
+        return self.max_entries > 0 or self.backend() is not None
+
+    def _remember(self, key: str, value: bytes) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                CACHE_EVICTIONS.inc(self.name)
+
+    def _get_local(self, key: str) -> bytes | None:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+        if value is not None:
+            CACHE_LOOKUPS.inc(self.name, "l1")
+        return value
+
+    def _get_shared(self, backend: CacheBackend, key: str) -> bytes | None:
+        try:
+            value = backend.get(key)
+        except Exception as e:
+            CACHE_LOOKUPS.inc(self.name, "error")
+            logger.warning(f"Shared cache read failed for {self.name}: {e}")
+            return None
+        if value is None:
+            CACHE_LOOKUPS.inc(self.name, "miss")
+            return None
+        CACHE_LOOKUPS.inc(self.name, "l2")
+        self._remember(key, value)
+        return value
+
+    def _set_shared(self, backend: CacheBackend, key: str, value: bytes) -> None:
+        try:
+            backend.set(key, value, ex=self.ttl())
+        except Exception as e:
+            CACHE_LOOKUPS.inc(self.name, "error")
+            logger.warning(f"Shared cache write failed for {self.name}: {e}")
+
+    def get(self, key: str) -> bytes | None:
+        """Look a key up in process, then in the shared backend.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss in both tiers
+        """
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        backend = self.backend()
+        return self._get_shared(backend, key) if backend is not None else None
+
+    async def aget(self, key: str) -> bytes | None:
+        """Like ``get``, reading the shared backend from a worker thread.
+
+        Args:
+            key: Cache key
+
+        Returns:
+            The cached value, or None on a miss in both tiers
+        """
+        value = self._get_local(key)
+        if value is not None:
+            return value
+        backend = self.backend()
+        return await run_in_threadpool(self._get_shared, backend, key) if backend is not None else None
+
+    def set(self, key: str, value: bytes) -> None:
+        """Store a value in process, and in the shared backend if one is configured.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._remember(key, value)
+        backend = self.backend()
+        if backend is not None:
+            self._set_shared(backend, key, value)
+
+    async def aset(self, key: str, value: bytes) -> None:
+        """Like ``set``, writing to the shared backend from a worker thread.
+
+        Args:
+            key: Cache key
+            value: Value to store
+        """
+        self._remember(key, value)
+        backend = self.backend()
+        if backend is not None:
+            await run_in_threadpool(self._set_shared, backend, key, value)
+
+    def get_or_build(self, key: str, build: Callable[[], bytes]) -> bytes:
+        """Return the cached value for a key, building and storing it on a miss.
+
+        Args:
+            key: Cache key
+            build: Produces the value
+
+        Returns:
+            The cached or newly built value
+        """
+        value = self.get(key)
+        if value is None:
+            value = build()
+            self.set(key, value)
+        return value
+
+    def clear(self) -> None:
+        """Forget the in-process entries; the shared backend is left alone."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,456 @@
+"""Response compression with content negotiation and a compressed-body cache.
+
+Responses are compressed with the best encoding the client accepts among
+brotli (``br``), zstd and gzip. Brotli and zstd are optional dependencies
+(``pip install personal-website[compression]``); without them only gzip is
+offered. Compression levels can be tuned per content type.
+
+Complete responses are keyed by their ETag (a content hash is computed and
+added when the app did not set one), and compressed bodies are remembered per
+ETag and encoding, so identical pages, feeds and sitemaps are compressed once
+per content generation rather than once per request. Complete HTML pages are
+minified (see ``minify``) the first time their ETag is seen, and the minified
+body is what gets sent and compressed. Those one-time minify and compress
+steps run in a worker thread, so building a large body at a high level does
+not hold up the event loop; cache hits are answered on the loop. Streamed responses are compressed
+incrementally and flushed chunk by chunk.
+"""
+
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from collections.abc import Callable
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .content import content_generation
+from .metrics import RESPONSE_BYTES, counter
+from .minify import minify_and_record
+from .timing import current_timings, phase
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - depends on installed extras
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on installed extras
+    zstandard = None
+
+COMPRESSION_CACHE = counter("http_compression_cache_total", "Compressed body cache lookups by result.", ("result",))
+
+DEFAULT_LEVELS = {"br": 5, "zstd": 3, "gzip": 6}
+
+# Cached types are compressed once per generation, so they can afford higher levels
+CONTENT_TYPE_LEVELS = {
+    "text/html": {"br": 9, "zstd": 12, "gzip": 9},
+    "application/xml": {"br": 11, "zstd": 19, "gzip": 9},
+    "application/rss+xml": {"br": 11, "zstd": 19, "gzip": 9},
+    "application/atom+xml": {"br": 11, "zstd": 19, "gzip": 9},
+    "application/feed+json": {"br": 11, "zstd": 19, "gzip": 9},
+}
+
+COMPRESSIBLE_TYPES = (
+    "text/",
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "+xml",
+    "+json",
+    "image/svg",
+)
+
+
+class _GzipStream:
+    def __init__(self, level: int):
+        self._compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush(zlib.Z_FINISH)
+
+
+class _BrotliStream:
+    def __init__(self, level: int):
+        self._compressor = brotli.Compressor(quality=level)
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.process(chunk) + self._compressor.flush()
+
+    def finish(self) -> bytes:
+        return self._compressor.finish()
+
+
+class _ZstdStream:
+    def __init__(self, level: int):
+        self._compressor = zstandard.ZstdCompressor(level=level).compressobj()
+
+    def compress(self, chunk: bytes) -> bytes:
+        return self._compressor.compress(chunk) + self._compressor.flush(zstandard.COMPRESSOBJ_FLUSH_BLOCK)
+
+    def finish(self) -> bytes:
+        return self._compressor.flush()
+
+
+_COMPRESSORS: dict[str, Callable[[bytes, int], bytes]] = {
+    "gzip": lambda body, level: gzip.compress(body, compresslevel=level, mtime=0)
+}
+_STREAMS: dict[str, Callable[[int], object]] = {"gzip": _GzipStream}
+if brotli is not None:
+    _COMPRESSORS["br"] = lambda body, level: brotli.compress(body, quality=level)
+    _STREAMS["br"] = _BrotliStream
+if zstandard is not None:
+    _COMPRESSORS["zstd"] = lambda body, level: zstandard.ZstdCompressor(level=level).compress(body)
+    _STREAMS["zstd"] = _ZstdStream
+
+# Server preference when the client accepts several encodings equally
+AVAILABLE_ENCODINGS = tuple(encoding for encoding in ("br", "zstd", "gzip") if encoding in _COMPRESSORS)
+
+
+def negotiate(accept_encoding: str, available: tuple[str, ...] = AVAILABLE_ENCODINGS) -> str | None:
+    """Choose a content encoding from an ``Accept-Encoding`` header.
+
+    Args:
+        accept_encoding: Header value, e.g. ``gzip, br;q=0.9``
+        available: Encodings the server can produce, in order of preference
+
+    Returns:
+        The chosen encoding, or None to send the body uncompressed
+    """
+    weights: dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        weights[coding] = quality
+
+    best, best_quality = None, 0.0
+    for encoding in available:
+        quality = weights.get(encoding, weights.get("*", 0.0))
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compression_level(encoding: str, content_type: str, levels: dict[str, dict[str, int]] | None = None) -> int:
+    """Compression level for an encoding and content type.
+
+    Args:
+        encoding: Content encoding
+        content_type: Response Content-Type (parameters are ignored)
+        levels: Per content type levels (defaults to ``CONTENT_TYPE_LEVELS``)
+
+    Returns:
+        Level passed to the compressor
+    """
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    overrides = (CONTENT_TYPE_LEVELS if levels is None else levels).get(media_type, {})
+    return overrides.get(encoding, DEFAULT_LEVELS[encoding])
+
+
+def compress(body: bytes, encoding: str, level: int) -> bytes:
+    """Compress a complete body.
+
+    Args:
+        body: Uncompressed bytes
+        encoding: One of ``AVAILABLE_ENCODINGS``
+        level: Compression level
+
+    Returns:
+        Compressed bytes
+    """
+    return _COMPRESSORS[encoding](body, level)
+
+
+def is_compressible(content_type: str) -> bool:
+    """Whether responses of a content type benefit from compression."""
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return any(marker in media_type for marker in COMPRESSIBLE_TYPES)
+
+
+class CompressedBodyCache:
+    """LRU of compressed (and minified) bodies keyed by ETag and encoding.
+
+    The cache empties itself whenever the content generation changes, so it
+    only ever holds bodies for the content currently being served.
+    """
+
+    def __init__(self, max_entries: int = 512, generation: Callable[[], int] = content_generation):
+        """Create an empty cache.
+
+        Args:
+            max_entries: Number of compressed bodies kept
+            generation: Returns the current content generation
+        """
+        self.max_entries = max_entries
+        self.generation = generation
+        self._generation = generation()
+        self._entries: OrderedDict[tuple[str, str, int], bytes] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _lookup(self, key: tuple[str, str, int], counted: bool) -> bytes | None:
+        generation = self.generation()
+        with self._lock:
+            if generation != self._generation:
+                self._entries.clear()
+                self._generation = generation
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+        if counted:
+            COMPRESSION_CACHE.inc("hit" if cached is not None else "miss")
+        return cached
+
+    def _store(self, key: tuple[str, str, int], built: bytes) -> bytes:
+        with self._lock:
+            self._entries[key] = built
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return built
+
+    def _get_or_build(self, key: tuple[str, str, int], build: Callable[[], bytes], counted: bool = True) -> bytes:
+        cached = self._lookup(key, counted)
+        return cached if cached is not None else self._store(key, build())
+
+    async def _aget_or_build(
+        self, key: tuple[str, str, int], build: Callable[[], bytes], counted: bool = True
+    ) -> bytes:
+        cached = self._lookup(key, counted)
+        return cached if cached is not None else self._store(key, await run_in_threadpool(build))
+
+    @staticmethod
+    def _minifier(body: bytes, page: str) -> Callable[[], bytes]:
+        def build() -> bytes:
+            try:
+                html = body.decode("utf-8")
+            except UnicodeDecodeError:
+                return body
+            return minify_and_record(html, page).encode("utf-8")
+
+        return build
+
+    def get_or_compress(self, etag: str, encoding: str, level: int, body: bytes) -> bytes:
+        """Return the compressed body for an ETag, compressing it on a miss.
+
+        Args:
+            etag: Strong ETag identifying ``body``
+            encoding: Content encoding
+            level: Compression level
+            body: Uncompressed body
+
+        Returns:
+            Compressed body
+        """
+        return self._get_or_build((etag, encoding, level), lambda: compress(body, encoding, level))
+
+    async def aget_or_compress(self, etag: str, encoding: str, level: int, body: bytes) -> bytes:
+        """Like ``get_or_compress``, compressing a miss in a worker thread.
+
+        Cached types are compressed at high levels, which takes long enough
+        on a large page or feed to stall every other request on the event loop.
+
+        Args:
+            etag: Strong ETag identifying ``body``
+            encoding: Content encoding
+            level: Compression level
+            body: Uncompressed body
+
+        Returns:
+            Compressed body
+        """
+        return await self._aget_or_build((etag, encoding, level), lambda: compress(body, encoding, level))
+
+    def get_or_minify(self, etag: str, body: bytes, page: str) -> bytes:
+        """Return the minified HTML body for an ETag, minifying it on a miss.
+
+        Args:
+            etag: Strong ETag identifying ``body``
+            body: UTF-8 HTML body
+            page: Request path the savings are reported under
+
+        Returns:
+            Minified body (unchanged if it is not valid UTF-8)
+        """
+        return self._get_or_build((etag, "minified", 0), self._minifier(body, page), counted=False)
+
+    async def aget_or_minify(self, etag: str, body: bytes, page: str) -> bytes:
+        """Like ``get_or_minify``, minifying a miss in a worker thread.
+
+        Args:
+            etag: Strong ETag identifying ``body``
+            body: UTF-8 HTML body
+            page: Request path the savings are reported under
+
+        Returns:
+            Minified body (unchanged if it is not valid UTF-8)
+        """
+        return await self._aget_or_build((etag, "minified", 0), self._minifier(body, page), counted=False)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+def body_etag(body: bytes) -> str:
+    """Strong ETag derived from a response body."""
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+class _Responder:
+    """Handle one response: buffer its start, then compress or pass it through."""
+
+    def __init__(self, middleware: "CompressionMiddleware", scope: Scope, encoding: str | None, send: Send):
+        self.middleware = middleware
+        self.method = scope["method"]
+        self.path = scope["path"]
+        self.encoding = encoding
+        self.send = send
+        self.start: Message | None = None
+        self.stream = None
+
+    async def __call__(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            timings = current_timings()
+            if timings is not None:
+                timings.unwind()
+            self.start = message
+            return
+        if message["type"] != "http.response.body":
+            if self.start is not None:
+                await self.send(self.start)
+                self.start = None
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        RESPONSE_BYTES.inc("before_compression", amount=len(body))
+        if self.start is not None:
+            start, self.start = self.start, None
+            if message.get("more_body", False):
+                await self._begin_stream(start, message)
+            else:
+                await self._complete(start, message)
+            return
+
+        if self.stream is not None:
+            with phase("compress"):
+                body = self.stream.compress(body)
+                if not message.get("more_body", False):
+                    body += self.stream.finish()
+            message["body"] = body
+        await self._send_body(message)
+
+    async def _send_body(self, message: Message) -> None:
+        RESPONSE_BYTES.inc("after_compression", amount=len(message.get("body", b"")))
+        await self.send(message)
+
+    def _eligible(self, headers: MutableHeaders) -> bool:
+        return "content-encoding" not in headers and is_compressible(headers.get("content-type", ""))
+
+    async def _complete(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        body = message.get("body", b"")
+        etag = headers.get("etag")
+        if etag is None and start["status"] == 200 and self.method in ("GET", "HEAD"):
+            etag = headers["ETag"] = body_etag(body)
+
+        if (
+            self.middleware.minify
+            and start["status"] == 200
+            and etag is not None
+            and not etag.startswith("W/")
+            and headers.get("content-type", "").startswith("text/html")
+        ):
+            with phase("compress"):
+                body = message["body"] = await self.middleware.cache.aget_or_minify(etag, body, self.path)
+            headers["Content-Length"] = str(len(body))
+
+        if len(body) >= self.middleware.minimum_size and self._eligible(headers):
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding is not None:
+                level = compression_level(self.encoding, headers.get("content-type", ""), self.middleware.levels)
+                with phase("compress"):
+                    if etag is not None and not etag.startswith("W/"):
+                        body = await self.middleware.cache.aget_or_compress(etag, self.encoding, level, body)
+                    else:
+                        body = compress(body, self.encoding, level)
+                headers["Content-Encoding"] = self.encoding
+                headers["Content-Length"] = str(len(body))
+                if etag is not None:
+                    headers["ETag"] = f'{etag[:-1]}-{self.encoding}"'
+                message["body"] = body
+
+        await self.send(start)
+        await self._send_body(message)
+
+    async def _begin_stream(self, start: Message, message: Message) -> None:
+        headers = MutableHeaders(raw=start["headers"])
+        if self._eligible(headers):
+            headers.add_vary_header("Accept-Encoding")
+            if self.encoding is not None:
+                level = compression_level(self.encoding, headers.get("content-type", ""), self.middleware.levels)
+                self.stream = _STREAMS[self.encoding](level)
+                headers["Content-Encoding"] = self.encoding
+                del headers["Content-Length"]
+                with phase("compress"):
+                    message["body"] = self.stream.compress(message.get("body", b""))
+
+        await self.send(start)
+        await self._send_body(message)
+
+
+class CompressionMiddleware:
+    """Compress responses with brotli, zstd or gzip, caching bodies by ETag.
+
+    Body sizes before and after compression feed the
+    ``http_response_body_bytes_total`` metric. When Server-Timing is active,
+    the response start closes the ``render`` phase and compression (including
+    cache lookups) is charged to ``compress``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1000,
+        levels: dict[str, dict[str, int]] | None = None,
+        cache_entries: int = 512,
+        minify: bool = True,
+    ):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app whose responses are compressed
+            minimum_size: Smallest complete body that gets compressed
+            levels: Compression levels per content type and encoding (defaults to ``CONTENT_TYPE_LEVELS``)
+            cache_entries: Number of compressed bodies remembered
+            minify: Minify complete HTML pages, once per ETag, before sending or compressing them
+        """
+        self.app = app
+        self.minimum_size = minimum_size
+        self.levels = levels
+        self.minify = minify
+        self.cache = CompressedBodyCache(cache_entries)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Compress the response with the best encoding the client accepts."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = negotiate(Headers(scope=scope).get("Accept-Encoding", "")) if scope["method"] != "HEAD" else None
+        await self.app(scope, receive, _Responder(self, scope, encoding, send))
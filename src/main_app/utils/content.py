@@ -1,151 +1,626 @@
-"""Content management utilities for blog posts."""
-
+"""Content management utilities for blog posts.
+
+Posts are markdown files anywhere below one or more content roots
+(``POSTS_DIR``), flat or sharded into subdirectories. The roots are walked
+once into a slug to file index; listings and post lookups go through the
+index and never walk the directory tree themselves.
+
+Posts are published by a publication-time index over the scanned corpus:
+drafts are never listed, and posts dated in the future are held back until
+their date passes. The time of the next scheduled post is kept as a single
+timestamp, checked whenever the content generation or the post listing is
+read; the first request after a publication boundary advances the index and
+starts a new content generation, so every cache keyed on the generation
+(listings, tag and date indexes, feeds, sitemap, pages) is invalidated at
+that moment, without polling, restarting or rescanning the posts directory.
+
+``markdown``, ``frontmatter`` and the Pygments formatters are imported on
+first use, inside the functions that render markdown. A worker serving
+compiled content (``COMPILED_DIR``) never renders, so it never imports them,
+which keeps worker start-up short; ``tools.startup`` measures it.
+"""
+
+import bisect
+import hashlib
+import json
 import logging
-from datetime import date, datetime
+import math
+import os
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import datetime, timezone
 from functools import lru_cache
 from pathlib import Path
 from typing import Any
 
-import frontmatter
-import markdown
-from pygments.formatters import HtmlFormatter
+from .cache import TieredCache, code_version
+from .metrics import counter, histogram, register_collector
+from .minify import minify_and_record, minify_html
+from .pagination import PageIndex
+from .schema import UNDATED, Post, PostError, PostMeta, count_words, read_header, validate_metadata
+from .timing import timed
 
 logger = logging.getLogger(__name__)
 
+# Threads overlap file reads and directory listings on cold or network storage;
+# YAML parsing holds the GIL, so small corpora and single-CPU hosts scan serially
+SCAN_WORKERS = int(os.environ.get("SCAN_WORKERS", min(8, os.cpu_count() or 1)))
+PARALLEL_SCAN_THRESHOLD = 256
+
+# Style sheet for highlighted code, written next to the compiled manifest
+PYGMENTS_CSS_FILE = "pygments.css"
+
+# Headings listed in a post's table of contents (h1 repeats the post title)
+TOC_DEPTH = "2-4"
+
+COMPILE_SECONDS = histogram("content_compile_seconds", "Time to parse and render one markdown post.")
+CACHE_EVICTIONS = counter("content_cache_evictions_total", "Entries evicted from bounded content caches.", ("cache",))
+
+# Rendered markdown posts shared between workers; ``_load_post`` is the in-process tier
+RENDERED_POSTS = TieredCache("posts", max_entries=0)
+
 
 def _get_posts_directory() -> Path:
     """Get the path to the posts directory.
 
+    The ``POSTS_DIR`` environment variable overrides the bundled directory.
+
     Returns:
-        Path object pointing to the posts directory
+        Path object pointing to the posts directory (the first one when
+        ``POSTS_DIR`` lists several)
     """
+    posts_dir = os.environ.get("POSTS_DIR")
+    if posts_dir:
+        return Path(posts_dir.split(os.pathsep)[0])
     return Path(__file__).parent.parent / "posts"
 
 
-def _parse_post_file(file_path: Path) -> dict[str, Any] | None:
-    """Parse a single markdown post file.
+def _get_posts_directories() -> list[Path]:
+    """Get every content root posts are read from.
+
+    ``POSTS_DIR`` may list several roots separated by ``os.pathsep``; when a
+    slug exists in more than one root, the earlier root wins.
+
+    Returns:
+        Content roots in priority order
+    """
+    posts_dirs = os.environ.get("POSTS_DIR", "")
+    if os.pathsep in posts_dirs:
+        return [Path(posts_dir) for posts_dir in posts_dirs.split(os.pathsep) if posts_dir]
+    return [_get_posts_directory()]
+
+
+def _scan_directory(directory: str) -> tuple[list[str], list[str]]:
+    """List the markdown files and subdirectories of one directory.
+
+    Hidden entries are skipped and symlinked directories are not followed,
+    so the walk cannot loop.
+    """
+    files, subdirectories = [], []
+    try:
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.name.startswith("."):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    subdirectories.append(entry.path)
+                elif entry.name.endswith(".md") and entry.is_file():
+                    files.append(entry.path)
+    except OSError as e:
+        logger.error(f"Failed to list posts directory {directory}: {e}")
+    return files, subdirectories
+
+
+def discover_posts(roots: list[Path]) -> dict[str, Path]:
+    """Find the markdown files of every post below the given content roots.
+
+    Roots are walked recursively, so posts can be nested or sharded (for
+    example ``posts/2025/08/slug.md``). The walk proceeds one directory level
+    at a time, listing the directories of a level in parallel. A post's slug
+    is its file name without ``.md``; slugs must be unique, and a duplicate
+    is logged and skipped in favour of the earlier root, or within a root the
+    path that sorts first.
 
     Args:
-        file_path: Path to the markdown file to parse
+        roots: Content roots in priority order
+
+    Returns:
+        Mapping of slug to markdown file, ordered by slug
+    """
+    index: dict[str, Path] = {}
+    with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="post-walk") as executor:
+        for root in roots:
+            files: list[str] = []
+            level = [str(root)] if root.is_dir() else []
+            while level:
+                listings = executor.map(_scan_directory, level) if len(level) > 1 else map(_scan_directory, level)
+                level = []
+                for level_files, subdirectories in listings:
+                    files += level_files
+                    level += subdirectories
+
+            for path in sorted(files):
+                slug = os.path.basename(path)[:-3]
+                if slug in index:
+                    logger.warning(f"Duplicate post slug {slug!r}: ignoring {path}, using {index[slug]}")
+                    continue
+                index[slug] = Path(path)
+    return dict(sorted(index.items()))
+
+
+@lru_cache(maxsize=1)
+@timed("content")
+def _get_source_index() -> dict[str, Path]:
+    """Slug to markdown file index over every content root, built once per cache lifetime."""
+    return discover_posts(_get_posts_directories())
+
+
+def compile_post_file(file_path: Path, *, strict: bool = False) -> Post:
+    """Parse a markdown post file and render its HTML.
+
+    Args:
+        file_path: Path to the markdown file to compile
+        strict: Reject frontmatter that violates the schema instead of coercing it
 
     Returns:
-        Dictionary containing post data and metadata, or None if parsing fails
+        The compiled post
+
+    Raises:
+        PostError: If the file cannot be read or fails validation
     """
+    import frontmatter
+    import markdown
+
+    started = time.perf_counter()
     try:
         with open(file_path, "r", encoding="utf-8") as f:
             post = frontmatter.load(f)
+    except Exception as e:
+        raise PostError(f"Invalid frontmatter: {e}") from e
 
-        md = markdown.Markdown(
-            extensions=["codehilite", "fenced_code", "tables"],
-            extension_configs={
-                "codehilite": {
-                    "css_class": "highlight",
-                    "use_pygments": True,
-                }
+    fields = validate_metadata(post.metadata, strict=strict)
+
+    md = markdown.Markdown(
+        extensions=["codehilite", "fenced_code", "tables", "toc"],
+        extension_configs={
+            "codehilite": {
+                "css_class": "highlight",
+                "use_pygments": True,
             },
-        )
+            "toc": {"toc_depth": TOC_DEPTH},
+        },
+    )
 
-        html_content = md.convert(post.content)
+    html_content = minify_and_record(md.convert(post.content), f"post:{file_path.stem}", "post")
 
-        tags = post.metadata.get("tags", [])
-        normalized_tags = [tag.lower().strip() for tag in tags] if tags else []
+    post_data = Post(
+        slug=file_path.stem,
+        content=html_content,
+        raw_content=post.content,
+        word_count=count_words(post.content),
+        toc=minify_html(md.toc) if _count_toc_entries(md.toc_tokens) >= 2 else "",
+        **fields,
+    )
 
-        post_data = {
-            "slug": file_path.stem,
-            "title": post.metadata.get("title", "Untitled"),
-            "date": post.metadata.get("date"),
-            "tags": normalized_tags,
-            "excerpt": post.metadata.get("excerpt", ""),
-            "content": html_content,
-            "raw_content": post.content,
-        }
+    COMPILE_SECONDS.observe(time.perf_counter() - started)
+    return post_data
 
-        if isinstance(post_data["date"], str):
-            try:
-                post_data["date"] = datetime.fromisoformat(post_data["date"])
-            except ValueError:
-                post_data["date"] = datetime.now()
-        elif isinstance(post_data["date"], date):
-            post_data["date"] = datetime.combine(post_data["date"], datetime.min.time())
-        elif post_data["date"] is None:
-            post_data["date"] = datetime.now()
-        elif not isinstance(post_data["date"], datetime):
-            post_data["date"] = datetime.now()
-
-        return post_data
 
+def _count_toc_entries(tokens: list[dict[str, Any]]) -> int:
+    """Count headings in a nested ``toc_tokens`` tree."""
+    return sum(1 + _count_toc_entries(token["children"]) for token in tokens)
+
+
+def _parse_post_file(file_path: Path) -> Post | None:
+    """Parse a single markdown post file.
+
+    Args:
+        file_path: Path to the markdown file to parse
+
+    Returns:
+        The parsed post, or None if parsing fails
+    """
+    try:
+        return compile_post_file(file_path)
     except Exception as e:
         logger.error(f"Failed to parse post file {file_path}: {e}")
         return None
 
 
-@lru_cache(maxsize=None)
-def load_all_posts() -> list[dict[str, Any]]:
-    """Load all blog posts from the posts directory.
+def serialize_post(post: Post) -> dict[str, Any]:
+    """Convert a post to JSON-compatible data for compiled artifacts.
+
+    Args:
+        post: Post as returned by ``compile_post_file``
+
+    Returns:
+        Post data with the date as an ISO 8601 string
+    """
+    return {**post.to_dict(), "date": post.date.isoformat()}
+
+
+def deserialize_post(data: dict[str, Any]) -> Post:
+    """Restore a post from compiled artifact data.
+
+    Args:
+        data: Data produced by ``serialize_post``
+
+    Returns:
+        The post
+    """
+    return Post(**{**data, "date": datetime.fromisoformat(data["date"])})
+
+
+def _get_compiled_directory() -> Path | None:
+    """Get the directory of compiled posts, if compiled content is in use.
+
+    ``COMPILED_DIR`` points at the output of ``tools.compile``; it is only used
+    when it contains a manifest.
+
+    Returns:
+        Path to the compiled content directory, or None to parse markdown
+    """
+    compiled_dir = os.environ.get("COMPILED_DIR")
+    if not compiled_dir:
+        return None
+    path = Path(compiled_dir)
+    if not (path / "manifest.json").exists():
+        logger.warning(f"COMPILED_DIR {path} has no manifest.json, parsing markdown instead")
+        return None
+    return path
+
+
+def _load_compiled_post(path: Path) -> Post | None:
+    """Load one compiled post artifact.
+
+    Args:
+        path: Path to a compiled post JSON file
 
     Returns:
-        List of post dictionaries sorted by date in reverse chronological order
+        The post, or None if the artifact is missing or unreadable
     """
-    posts_dir = _get_posts_directory()
-    posts = []
+    try:
+        return deserialize_post(json.loads(path.read_text(encoding="utf-8")))
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Failed to load compiled post {path}: {e}")
+        return None
+
+
+def _read_post_meta(file_path: Path) -> PostMeta | None:
+    """Read the listing metadata of a post from its frontmatter and body word count.
+
+    Args:
+        file_path: Path to the markdown file
+
+    Returns:
+        The post metadata, or None if the frontmatter cannot be read
+    """
+    try:
+        metadata, word_count = read_header(file_path)
+        return PostMeta(slug=file_path.stem, word_count=word_count, **validate_metadata(metadata))
+    except Exception as e:
+        logger.error(f"Failed to read post header {file_path}: {e}")
+        return None
+
+
+def _scan_headers(paths: list[Path]) -> list[PostMeta]:
+    """Read post metadata from many files, in parallel for large corpora.
+
+    Args:
+        paths: Markdown files to scan
+
+    Returns:
+        Metadata of every readable post
+    """
+    if SCAN_WORKERS <= 1 or len(paths) < PARALLEL_SCAN_THRESHOLD:
+        results = map(_read_post_meta, paths)
+    else:
+        with ThreadPoolExecutor(max_workers=SCAN_WORKERS, thread_name_prefix="post-scan") as executor:
+            results = list(executor.map(_read_post_meta, paths))
+    return [meta for meta in results if meta is not None]
+
+
+def _load_compiled_index(compiled_dir: Path) -> list[PostMeta]:
+    """Read post metadata from a compiled manifest.
+
+    Args:
+        compiled_dir: Directory produced by ``tools.compile``
+
+    Returns:
+        Metadata of every compiled post
+    """
+    try:
+        manifest = json.loads((compiled_dir / "manifest.json").read_text(encoding="utf-8"))
+        return [
+            PostMeta(slug=slug, **{**entry["meta"], "date": datetime.fromisoformat(entry["meta"]["date"])})
+            for slug, entry in manifest["posts"].items()
+        ]
+    except Exception as e:
+        logger.error(f"Failed to load compiled manifest in {compiled_dir}: {e}")
+        return []
+
 
-    if not posts_dir.exists():
-        return posts
+@lru_cache(maxsize=None)
+@timed("content")
+def _load_corpus() -> list[PostMeta]:
+    """Scan the listing metadata of every post that is not a draft.
 
-    for file_path in posts_dir.glob("*.md"):
-        post_data = _parse_post_file(file_path)
-        if post_data:
-            posts.append(post_data)
+    Only frontmatter is parsed and body words counted (or, with
+    ``COMPILED_DIR``, the compiled manifest is read); bodies are rendered on
+    demand by ``load_post``.
 
-    posts.sort(key=lambda x: x["date"], reverse=True)
+    Returns:
+        List of post metadata sorted by date in reverse chronological order,
+        including posts scheduled for the future
+    """
+    compiled_dir = _get_compiled_directory()
+    if compiled_dir is not None:
+        posts = _load_compiled_index(compiled_dir)
+    else:
+        posts = _scan_headers(list(_get_source_index().values()))
+    posts = [post for post in posts if not post.draft]
+
+    # Newest first; posts sharing a date keep a stable order by slug
+    posts.sort(key=lambda post: post.slug)
+    posts.sort(key=lambda post: post.date, reverse=True)
     logger.info(f"Loaded {len(posts)} blog posts")
     return posts
 
 
-def load_recent_posts(limit: int = 3) -> list[dict[str, Any]]:
+# Time source of the publication schedule, in epoch seconds
+_clock = time.time
+
+
+def _now() -> datetime:
+    """Current time as a naive UTC datetime, comparable with post dates."""
+    return datetime.fromtimestamp(_clock(), timezone.utc).replace(tzinfo=None)
+
+
+@dataclass(frozen=True, slots=True)
+class PublicationIndex:
+    """Split of the corpus into published and scheduled posts at one moment.
+
+    Attributes:
+        published: Posts dated at or before the moment, newest first
+        scheduled: Posts dated after the moment, newest first
+        slugs: Slugs of the published posts
+    """
+
+    published: list[PostMeta]
+    scheduled: list[PostMeta]
+    slugs: frozenset[str]
+
+    @property
+    def next_publication(self) -> datetime | None:
+        """Date of the next scheduled post, or None if nothing is scheduled."""
+        return self.scheduled[-1].date if self.scheduled else None
+
+
+# Epoch time of the next scheduled post; requests after it advance the index
+_next_publication = math.inf
+_publication_lock = threading.Lock()
+
+
+@lru_cache(maxsize=1)
+@timed("content")
+def _build_publication_index() -> PublicationIndex:
+    """Split the scanned corpus at the current time.
+
+    Also arms the check for the next publication boundary.
+
+    Returns:
+        The publication index
+    """
+    global _next_publication
+    corpus = _load_corpus()
+    now = _now()
+    # The corpus is sorted by descending date, so published posts are a suffix
+    split = bisect.bisect_left(corpus, True, key=lambda post: post.date <= now)
+    index = PublicationIndex(corpus[split:], corpus[:split], frozenset(post.slug for post in corpus[split:]))
+    upcoming = index.next_publication
+    _next_publication = upcoming.replace(tzinfo=timezone.utc).timestamp() if upcoming else math.inf
+    return index
+
+
+def _check_schedule():
+    """Publish scheduled posts whose date has passed, starting a new content generation."""
+    if _clock() < _next_publication:
+        return
+    with _publication_lock:
+        if _clock() < _next_publication:
+            return
+        _clear_publication_caches()
+        index = _build_publication_index()
+        logger.info(f"Published scheduled posts; {len(index.scheduled)} still scheduled")
+
+
+def get_publication_index() -> PublicationIndex:
+    """Get the publication index, advancing it if a scheduled post is due.
+
+    Returns:
+        The current publication index
+    """
+    _check_schedule()
+    return _build_publication_index()
+
+
+def load_all_posts() -> list[PostMeta]:
+    """Load the listing metadata of all published blog posts.
+
+    Drafts and posts scheduled for the future are left out.
+
+    Returns:
+        List of post metadata sorted by date in reverse chronological order
+    """
+    return get_publication_index().published
+
+
+def load_recent_posts(limit: int = 3) -> list[PostMeta]:
     """Load the most recent blog posts for navigation.
 
     Args:
         limit: Maximum number of recent posts to return
 
     Returns:
-        List of post dictionaries with metadata
+        List of the most recent posts
     """
     all_posts = load_all_posts()
     return all_posts[:limit]
 
 
+def load_post(slug: str) -> Post | None:
+    """Load a specific published blog post by its slug.
+
+    Args:
+        slug: The filename (without .md extension) of the post to load
+
+    Returns:
+        The post, or None if not found, a draft or not yet published
+    """
+    if slug not in get_publication_index().slugs:
+        return None
+    before = _load_post.cache_info()
+    post = _load_post(slug)
+    # A miss in a full cache evicts its least recently used entry
+    if before.currsize == before.maxsize and _load_post.cache_info().misses > before.misses:
+        CACHE_EVICTIONS.inc("load_post")
+    return post
+
+
 @lru_cache(maxsize=128)
-def load_post(slug: str) -> dict[str, Any] | None:
-    """Load a specific blog post by its slug.
+@timed("content")
+def _load_post(slug: str) -> Post | None:
+    """Load and render a post by its slug, whether or not it is published.
 
     Args:
         slug: The filename (without .md extension) of the post to load
 
     Returns:
-        Dictionary containing post data and metadata, or None if not found
+        The post, or None if not found
     """
-    posts_dir = _get_posts_directory()
-    file_path = posts_dir / f"{slug}.md"
+    compiled_dir = _get_compiled_directory()
+    if compiled_dir is not None:
+        return _load_compiled_post(compiled_dir / "posts" / f"{slug}.json")
 
-    if not file_path.exists():
+    file_path = _get_source_index().get(slug)
+    if file_path is None or not file_path.exists():
         return None
 
+    if RENDERED_POSTS.enabled():
+        return _render_shared(file_path)
     return _parse_post_file(file_path)
 
 
-def load_posts_by_tag(tag: str) -> list[dict[str, Any]]:
+def _render_shared(file_path: Path) -> Post | None:
+    """Parse a post, reusing a rendering another worker stored in the shared cache.
+
+    Entries are keyed by the file's path, size and modification time, so an
+    edited post is rendered again.
+
+    Args:
+        file_path: Path to the markdown file
+
+    Returns:
+        The post, or None if parsing fails
+    """
+    try:
+        stat = file_path.stat()
+    except OSError:
+        return None
+    key = f"post:{code_version()}:{file_path}:{stat.st_size}:{stat.st_mtime_ns}"
+    cached = RENDERED_POSTS.get(key)
+    if cached is not None:
+        return deserialize_post(json.loads(cached))
+
+    post = _parse_post_file(file_path)
+    if post is not None:
+        RENDERED_POSTS.set(key, json.dumps(serialize_post(post)).encode("utf-8"))
+    return post
+
+
+def source_signature(slug: str) -> str | None:
+    """Identify the file a post is served from by its path, size and modification time.
+
+    Args:
+        slug: The filename (without .md extension) of the post
+
+    Returns:
+        Signature that changes whenever the file does, or None if the post
+        has no readable file
+    """
+    compiled_dir = _get_compiled_directory()
+    path = compiled_dir / "posts" / f"{slug}.json" if compiled_dir is not None else _get_source_index().get(slug)
+    if path is None:
+        return None
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    return f"{path}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def load_raw_content(slug: str) -> str | None:
+    """Load the markdown body of a post without rendering it.
+
+    Args:
+        slug: The filename (without .md extension) of the post
+
+    Returns:
+        Markdown body without frontmatter, or None if not found
+    """
+    compiled_dir = _get_compiled_directory()
+    if compiled_dir is not None:
+        post = _load_compiled_post(compiled_dir / "posts" / f"{slug}.json")
+        return post.raw_content if post else None
+
+    import frontmatter
+
+    file_path = _get_source_index().get(slug)
+    if file_path is None:
+        return None
+    try:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return frontmatter.load(f).content
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Failed to read post body {slug}: {e}")
+        return None
+
+
+@lru_cache(maxsize=1)
+@timed("content")
+def _build_tag_index() -> dict[str, list[PostMeta]]:
+    """Group all posts by tag, preserving reverse chronological order.
+
+    Returns:
+        Dictionary mapping each tag to the posts carrying it
+    """
+    tag_index: dict[str, list[PostMeta]] = {}
+
+    for post in load_all_posts():
+        for tag in post.tags:
+            tag_index.setdefault(tag, []).append(post)
+
+    return tag_index
+
+
+def load_posts_by_tag(tag: str) -> list[PostMeta]:
     """Load all posts that contain a specific tag.
 
     Args:
         tag: The tag to filter posts by
 
     Returns:
-        List of post dictionaries that contain the specified tag
+        List of posts that contain the specified tag
     """
-    all_posts = load_all_posts()
     normalized_tag = tag.lower().strip()
-    return [post for post in all_posts if normalized_tag in post["tags"]]
+    return _build_tag_index().get(normalized_tag, [])
 
 
 def get_all_tags() -> list[str]:
@@ -154,32 +629,276 @@ def get_all_tags() -> list[str]:
     Returns:
         Sorted list of unique tag names
     """
-    all_posts = load_all_posts()
-    tags = set()
+    return sorted(_build_tag_index())
+
+
+def index_by_date(posts: list[PostMeta]) -> dict[tuple[int, int | None], list[PostMeta]]:
+    """Group posts by publication year and by year and month.
+
+    Undated posts are left out, since they have no meaningful place in an archive.
+
+    Args:
+        posts: Posts in reverse chronological order
+
+    Returns:
+        Dictionary mapping ``(year, None)`` and ``(year, month)`` to their posts, in the same order
+    """
+    date_index: dict[tuple[int, int | None], list[PostMeta]] = {}
+
+    for post in posts:
+        if post.date == UNDATED:
+            continue
+        date_index.setdefault((post.date.year, None), []).append(post)
+        date_index.setdefault((post.date.year, post.date.month), []).append(post)
+
+    return date_index
+
+
+@lru_cache(maxsize=1)
+@timed("content")
+def _build_date_index() -> dict[tuple[int, int | None], list[PostMeta]]:
+    """Group all posts by year and month, preserving reverse chronological order.
+
+    Returns:
+        Dictionary mapping ``(year, None)`` and ``(year, month)`` to their posts
+    """
+    return index_by_date(load_all_posts())
+
+
+def load_posts_by_date(year: int, month: int | None = None) -> list[PostMeta]:
+    """Load all posts published in a year or month.
+
+    Args:
+        year: Publication year
+        month: Publication month (1-12), or None for the whole year
+
+    Returns:
+        List of posts published in the period, newest first
+    """
+    return _build_date_index().get((year, month), [])
+
+
+def get_archive_months() -> list[tuple[int, int, int]]:
+    """Get every month that has posts.
+
+    Returns:
+        List of ``(year, month, post count)`` tuples, newest first
+    """
+    return sorted(
+        ((year, month, len(posts)) for (year, month), posts in _build_date_index().items() if month is not None),
+        reverse=True,
+    )
+
+
+_EMPTY_PAGE_INDEX = PageIndex([])
 
-    for post in all_posts:
-        tags.update(post["tags"])
 
-    return sorted(list(tags))
+def get_page_index(tag: str | None = None) -> PageIndex:
+    """Get the precomputed page index for the home listing or a tag listing.
+
+    Indexes are only cached for tags that exist, so arbitrary tag names in
+    URLs cannot grow the cache.
+
+    Args:
+        tag: Tag whose listing to index, or None for the home listing
+
+    Returns:
+        Page index for the requested listing
+    """
+    if tag is None:
+        return _get_page_index(None)
+
+    normalized_tag = tag.lower().strip()
+    if normalized_tag not in _build_tag_index():
+        return _EMPTY_PAGE_INDEX
+    return _get_page_index(normalized_tag)
+
+
+@lru_cache(maxsize=None)
+@timed("content")
+def _get_page_index(tag: str | None) -> PageIndex:
+    """Build and cache the page index for a listing.
+
+    Args:
+        tag: Normalized tag, or None for the home listing
+
+    Returns:
+        Page index over the listing
+    """
+    posts = load_all_posts() if tag is None else load_posts_by_tag(tag)
+    return PageIndex(posts)
 
 
 @lru_cache(maxsize=1)
+@timed("content")
 def get_pygments_css() -> str:
-    """Generate CSS for Pygments syntax highlighting.
+    """Get the CSS for Pygments syntax highlighting.
+
+    With compiled content the style sheet written by ``tools.compile`` is
+    read, so Pygments' formatters are not imported; otherwise it is generated.
 
     Returns:
         CSS string for syntax highlighting
     """
-    formatter = HtmlFormatter(style="default", cssclass="highlight")
-    return formatter.get_style_defs()
+    compiled_dir = _get_compiled_directory()
+    if compiled_dir is not None:
+        try:
+            return (compiled_dir / PYGMENTS_CSS_FILE).read_text(encoding="utf-8")
+        except FileNotFoundError:
+            pass
+    return render_pygments_css()
+
+
+def render_pygments_css() -> str:
+    """Generate the CSS for Pygments syntax highlighting.
+
+    Returns:
+        CSS string for the ``highlight`` class used by rendered code blocks
+    """
+    from pygments.formatters import HtmlFormatter
+
+    return HtmlFormatter(style="default", cssclass="highlight").get_style_defs()
+
+
+_CONTENT_CACHES = {
+    "load_corpus": _load_corpus,
+    "load_post": _load_post,
+    "source_index": _get_source_index,
+    "publication_index": _build_publication_index,
+    "tag_index": _build_tag_index,
+    "date_index": _build_date_index,
+    "page_index": _get_page_index,
+    "pygments_css": get_pygments_css,
+}
+
+# Hits and misses counted before each cache's last clear, so exported totals never decrease
+_cleared_hits: Counter[str] = Counter()
+_cleared_misses: Counter[str] = Counter()
+
+
+def _clear_caches(*names: str):
+    """Clear content caches, keeping their hit and miss counts."""
+    for name in names:
+        cache = _CONTENT_CACHES[name]
+        info = cache.cache_info()
+        _cleared_hits[name] += info.hits
+        _cleared_misses[name] += info.misses
+        cache.cache_clear()
+
+
+def get_cache_stats() -> dict[str, Any]:
+    """Get ``lru_cache`` statistics for every content cache.
+
+    Hits and misses restart at zero when a cache is cleared; the exported
+    metrics add the counts from before each clear.
+
+    Returns:
+        Dictionary mapping cache name to its ``cache_info()``
+    """
+    return {name: cache.cache_info() for name, cache in _CONTENT_CACHES.items()}
+
+
+@register_collector
+def _collect_content_metrics():
+    """Expose content cache statistics and corpus size at scrape time."""
+    stats = get_cache_stats()
+    families = (
+        (
+            "content_cache_hits_total",
+            "counter",
+            "Content cache hits.",
+            lambda name, info: _cleared_hits[name] + info.hits,
+        ),
+        (
+            "content_cache_misses_total",
+            "counter",
+            "Content cache misses.",
+            lambda name, info: _cleared_misses[name] + info.misses,
+        ),
+        ("content_cache_entries", "gauge", "Entries held by each content cache.", lambda name, info: info.currsize),
+    )
+    for name, metric_type, documentation, value in families:
+        samples = [(name, {"cache": cache}, value(cache, info)) for cache, info in stats.items()]
+        yield name, metric_type, documentation, samples
+
+    loaded = stats["load_corpus"].currsize > 0
+    yield (
+        "content_posts",
+        "gauge",
+        "Posts in the loaded corpus.",
+        [("content_posts", {}, len(load_all_posts()) if loaded else 0)],
+    )
+
+
+_generation = 0
+
+
+def content_generation() -> int:
+    """Number identifying the current state of the loaded content.
+
+    The value changes whenever cached content is discarded or a scheduled
+    post is published, so artifacts built from posts (feeds, sitemaps,
+    rendered pages) can be cached against it.
+
+    Returns:
+        Current content generation
+    """
+    _check_schedule()
+    return _generation
+
+
+def content_fingerprint() -> str:
+    """Digest of the content being served, the same in every worker serving the same files.
+
+    Unlike ``content_generation``, which counts changes within one process,
+    the fingerprint identifies the content itself: the published posts and
+    the files they are served from (the compiled manifest, or each markdown
+    file's size and modification time). Artifacts shared between workers are
+    keyed by it.
+
+    Returns:
+        Hex digest
+    """
+    _check_schedule()
+    return _content_fingerprint()
+
+
+@lru_cache(maxsize=1)
+def _content_fingerprint() -> str:
+    """Hash the published posts and their sources, once per content generation."""
+    published = _build_publication_index().published
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update("\0".join(post.slug for post in published).encode("utf-8"))
+    compiled_dir = _get_compiled_directory()
+    if compiled_dir is not None:
+        digest.update((compiled_dir / "manifest.json").read_bytes())
+    else:
+        sources = _get_source_index()
+        for post in published:
+            try:
+                stat = sources[post.slug].stat()
+                digest.update(f"{sources[post.slug]}:{stat.st_size}:{stat.st_mtime_ns}".encode("utf-8"))
+            except (KeyError, OSError):
+                digest.update(f"{post.slug}:missing".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def _clear_publication_caches():
+    """Discard everything derived from the set of published posts and start a new content generation."""
+    global _generation
+    _generation += 1
+    _clear_caches("publication_index", "tag_index", "date_index", "page_index")
+    _content_fingerprint.cache_clear()
 
 
 def clear_content_cache():
     """Clear cached content for testing purposes.
 
     This function clears the LRU cache for content loading functions
-    to ensure tests can run with fresh data.
+    to ensure tests can run with fresh data, and starts a new content
+    generation.
     """
-    load_all_posts.cache_clear()
-    load_post.cache_clear()
-    get_pygments_css.cache_clear()
+    global _next_publication
+    _next_publication = math.inf
+    _clear_publication_caches()
+    _clear_caches("source_index", "load_corpus", "load_post", "pygments_css")
@@ -0,0 +1,258 @@
+"""Raw ASGI fast path for hot, read-only endpoints.
+
+Health checks, robots.txt, the feed and the sitemap are requested far more
+often than they change, yet every request used to pass through each
+``BaseHTTPMiddleware`` layer, the router and FastHTML's response handling.
+``FastPathMiddleware`` answers ``GET`` and ``HEAD`` requests for a fixed table
+of paths straight from byte buffers built once per content generation (with
+compressed variants built on first use for each encoding, or up front for
+precompressed routes), and passes everything else through untouched. Paths
+with parameters, such as per-tag feeds, are matched by an optional resolver
+that only returns routes for content that exists.
+
+With a shared cache configured (see ``cache``), bodies that depend on the
+content, and their compressed variants, are also looked up in the shared tier
+under the content fingerprint, so a feed serialized and compressed by one
+worker is reused by the others and after a restart.
+
+Requests for a body and encoding already built are answered on the event
+loop. Building, compressing and shared-cache lookups run in a worker thread
+instead, since feeds and sitemaps of a large corpus take a while and shared
+backends block on I/O; concurrent requests for a path being built wait for
+that build.
+
+The middleware sits inside the metrics and timing layers, so fast-path
+requests are still counted, and outside the navigation, cache-control and
+security-header layers, whose headers it adds to the prebuilt responses itself.
+"""
+
+import asyncio
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .cache import TieredCache, code_version
+from .compression import AVAILABLE_ENCODINGS, compress, compression_level, negotiate
+from .content import content_fingerprint, content_generation
+from .metrics import RESPONSE_BYTES
+
+RawHeaders = list[tuple[bytes, bytes]]
+Variant = tuple[RawHeaders, bytes]
+
+
+@dataclass(frozen=True, slots=True)
+class FastRoute:
+    """A path answered from prebuilt bytes.
+
+    Attributes:
+        build: Produces the response body
+        media_type: Content-Type of the body
+        cache_control: Cache-Control header value
+        per_generation: Whether the body is rebuilt when content changes
+        route_path: Route template reported to metrics (defaults to the path)
+        precompress: Whether every available encoding is built with the body
+    """
+
+    build: Callable[[], str | bytes]
+    media_type: str
+    cache_control: str
+    per_generation: bool = True
+    route_path: str | None = None
+    precompress: bool = False
+
+
+@dataclass(frozen=True, slots=True)
+class _Prebuilt:
+    generation: int
+    headers: dict[str, str]
+    body: bytes
+    compressible: bool
+    variants: dict[str | None, Variant]
+    shared_key: str | None = None
+
+
+def _raw_headers(headers: dict[str, str]) -> RawHeaders:
+    return [(name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in headers.items()]
+
+
+class FastPathMiddleware:
+    """Serve a fixed table of read-only paths from prebuilt byte buffers."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        routes: dict[str, FastRoute],
+        headers: dict[str, str] | None = None,
+        minimum_size: int = 1000,
+        generation: Callable[[], int] = content_generation,
+        resolve: Callable[[str], FastRoute | None] | None = None,
+        shared: TieredCache | None = None,
+        fingerprint: Callable[[], str] = content_fingerprint,
+    ):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app handling every other request
+            routes: Fast routes keyed by exact path
+            headers: Headers added to every fast-path response (e.g. security headers)
+            minimum_size: Smallest body that gets compressed variants
+            generation: Returns the current content generation
+            resolve: Returns the fast route for a path outside the table, or None to pass it through
+            shared: Cache sharing per-generation bodies and variants between workers
+                (defaults to one without an in-process tier, which the prebuilt buffers replace)
+            fingerprint: Returns the digest of the content shared bodies are keyed by
+        """
+        self.app = app
+        self.routes = routes
+        self.headers = dict(headers or {})
+        self.minimum_size = minimum_size
+        self.generation = generation
+        self.resolve = resolve
+        self.shared = shared if shared is not None else TieredCache("fastpath", max_entries=0)
+        self.fingerprint = fingerprint
+        self._prebuilt: dict[str, _Prebuilt] = {}
+        self._resolved: dict[str, FastRoute] = {}
+        self._resolved_generation: int | None = None
+        self._building: dict[str, asyncio.Event] = {}
+
+    def _build(self, path: str, route: FastRoute, generation: int) -> _Prebuilt:
+        def build() -> bytes:
+            body = route.build()
+            return body.encode("utf-8") if isinstance(body, str) else body
+
+        shared_key = None
+        if route.per_generation and self.shared.enabled():
+            shared_key = f"fast:{code_version()}:{self.fingerprint()}:{path}"
+            body = self.shared.get_or_build(shared_key, build)
+        else:
+            body = build()
+
+        headers = {**self.headers, "Content-Type": route.media_type, "Cache-Control": route.cache_control}
+        compressible = len(body) >= self.minimum_size
+        if compressible:
+            headers["Vary"] = "Accept-Encoding"
+        identity = _raw_headers({**headers, "Content-Length": str(len(body))})
+        prebuilt = _Prebuilt(generation, headers, body, compressible, {None: (identity, body)}, shared_key)
+        if route.precompress:
+            for encoding in AVAILABLE_ENCODINGS:
+                self.variant(prebuilt, encoding)
+        return prebuilt
+
+    def route(self, path: str) -> FastRoute | None:
+        """Find the fast route for a path.
+
+        Resolved routes and their buffers are forgotten when the content
+        generation changes, so paths for removed content stop being served
+        and cannot accumulate.
+
+        Args:
+            path: Request path
+
+        Returns:
+            The fast route, or None if the request should pass through
+        """
+        route = self.routes.get(path)
+        if route is not None or self.resolve is None:
+            return route
+
+        generation = self.generation()
+        if generation != self._resolved_generation:
+            for stale in self._resolved:
+                self._prebuilt.pop(stale, None)
+            self._resolved = {}
+            self._resolved_generation = generation
+        route = self._resolved.get(path)
+        if route is None:
+            route = self.resolve(path)
+            if route is not None:
+                self._resolved[path] = route
+        return route
+
+    def prebuilt(self, path: str, route: FastRoute | None = None) -> _Prebuilt:
+        """Return the current buffers for a fast path, rebuilding them if content changed.
+
+        Args:
+            path: A path from the route table or accepted by the resolver
+            route: The path's fast route, if already looked up
+
+        Returns:
+            Prebuilt response with its uncompressed and compressed variants
+        """
+        route = route or self.route(path)
+        generation = self.generation() if route.per_generation else 0
+        prebuilt = self._prebuilt.get(path)
+        if prebuilt is None or prebuilt.generation != generation:
+            prebuilt = self._prebuilt[path] = self._build(path, route, generation)
+        return prebuilt
+
+    def _ready(self, path: str, route: FastRoute, encoding: str | None) -> tuple[_Prebuilt, Variant] | None:
+        """Current buffers and variant for a request, or None if either must be built first.
+
+        Runs on the event loop for every request, so it only compares content
+        generations; the fingerprint and code version are read by ``_build``
+        in a worker thread.
+        """
+        prebuilt = self._prebuilt.get(path)
+        if prebuilt is None or prebuilt.generation != (self.generation() if route.per_generation else 0):
+            return None
+        variant = prebuilt.variants.get(encoding if prebuilt.compressible else None)
+        return (prebuilt, variant) if variant is not None else None
+
+    def _prepare(self, path: str, route: FastRoute, encoding: str | None) -> tuple[_Prebuilt, Variant]:
+        prebuilt = self.prebuilt(path, route)
+        return prebuilt, self.variant(prebuilt, encoding)
+
+    def variant(self, prebuilt: _Prebuilt, encoding: str | None) -> Variant:
+        """Return the headers and body of a prebuilt response in an encoding, compressing it once.
+
+        Args:
+            prebuilt: Buffers returned by ``prebuilt``
+            encoding: Negotiated content encoding, or None
+
+        Returns:
+            Raw headers and body
+        """
+        if not prebuilt.compressible:
+            encoding = None
+        variant = prebuilt.variants.get(encoding)
+        if variant is None:
+            level = compression_level(encoding, prebuilt.headers["Content-Type"])
+            if prebuilt.shared_key is not None:
+                key = f"{prebuilt.shared_key}:{encoding}:{level}"
+                body = self.shared.get_or_build(key, lambda: compress(prebuilt.body, encoding, level))
+            else:
+                body = compress(prebuilt.body, encoding, level)
+            headers = {**prebuilt.headers, "Content-Length": str(len(body)), "Content-Encoding": encoding}
+            variant = prebuilt.variants[encoding] = (_raw_headers(headers), body)
+        return variant
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer fast-path requests directly and pass the rest through."""
+        route = self.route(scope["path"]) if scope["type"] == "http" and scope["method"] in ("GET", "HEAD") else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        path = scope["path"]
+        scope["route_path"] = route.route_path or path
+        encoding = negotiate(Headers(scope=scope).get("Accept-Encoding", "")) if scope["method"] == "GET" else None
+        ready = self._ready(path, route, encoding)
+        while ready is None and path in self._building:
+            await self._building[path].wait()
+            ready = self._ready(path, route, encoding)
+        if ready is None:
+            building = self._building[path] = asyncio.Event()
+            try:
+                ready = await run_in_threadpool(self._prepare, path, route, encoding)
+            finally:
+                del self._building[path]
+                building.set()
+        prebuilt, (headers, body) = ready
+
+        RESPONSE_BYTES.inc("before_compression", amount=len(prebuilt.body))
+        RESPONSE_BYTES.inc("after_compression", amount=len(body))
+        await send({"type": "http.response.start", "status": 200, "headers": headers})
+        await send({"type": "http.response.body", "body": body if scope["method"] == "GET" else b""})
@@ -0,0 +1,452 @@
+"""Feed model and builders for the RSS, Atom and JSON feeds, sitemap and robots.txt.
+
+Every feed format is serialized from one ``Feed`` model: the site feed covers
+the latest posts and each tag has its own feed of the latest posts with that
+tag. Entries carry plain-text summaries (the excerpt, or the start of the
+rendered body with markup and code blocks stripped, cut at a word boundary),
+so no format ever contains HTML sliced mid-tag.
+
+Models are built at most once per content generation by ``get_feed``; the
+fast path serializes each feed once per generation and serves it from
+precompressed bytes.
+"""
+
+import json
+import re
+import threading
+from collections.abc import Callable
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from html.parser import HTMLParser
+from xml.sax.saxutils import escape, quoteattr
+
+from .content import content_generation, index_by_date, load_all_posts, load_post, load_posts_by_tag
+from .schema import UNDATED, Post, PostMeta
+
+SITE_URL = "https://yoursite.com"
+SITE_TITLE = "Jack McPherson's Blog"
+SITE_DESCRIPTION = "Technical blog posts about software development"
+AUTHOR = "Jack McPherson"
+
+FEED_LIMIT = 10
+SUMMARY_LENGTH = 200
+
+RSS_MEDIA_TYPE = "application/rss+xml"
+ATOM_MEDIA_TYPE = "application/atom+xml"
+JSON_FEED_MEDIA_TYPE = "application/feed+json"
+
+
+@dataclass(frozen=True, slots=True)
+class FeedEntry:
+    """One post in a feed.
+
+    Attributes:
+        url: Absolute post URL, also used as the entry id
+        title: Post title
+        summary: Plain-text summary
+        published: Publication date (naive UTC)
+        tags: Post tags
+    """
+
+    url: str
+    title: str
+    summary: str
+    published: datetime
+    tags: tuple[str, ...]
+
+
+@dataclass(frozen=True, slots=True)
+class Feed:
+    """Format-independent feed of the latest posts.
+
+    Attributes:
+        title: Feed title
+        description: Feed description
+        home_url: Absolute URL of the listing the feed follows
+        prefix: Site path the feed files live under (empty for the site feeds)
+        updated: Publication date of the newest entry
+        entries: Entries, newest first
+    """
+
+    title: str
+    description: str
+    home_url: str
+    prefix: str
+    updated: datetime
+    entries: tuple[FeedEntry, ...]
+
+
+_BLOCK_TAGS = frozenset(
+    {"address", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "figure", "h1", "h2", "h3", "h4", "h5"}
+    | {"h6", "hr", "li", "ol", "p", "section", "table", "td", "th", "tr", "ul"}
+)
+
+
+class _TextExtractor(HTMLParser):
+    """Collect the text of an HTML fragment, skipping code blocks."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.parts: list[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "pre":
+            self._skip += 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_endtag(self, tag):
+        if tag == "pre" and self._skip:
+            self._skip -= 1
+        elif tag in _BLOCK_TAGS:
+            self.parts.append(" ")
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def plain_text(html: str) -> str:
+    """Convert rendered HTML to whitespace-normalized plain text without code blocks.
+
+    Args:
+        html: HTML fragment
+
+    Returns:
+        The fragment's text
+    """
+    extractor = _TextExtractor()
+    extractor.feed(html)
+    extractor.close()
+    return " ".join("".join(extractor.parts).split())
+
+
+def summarize(text: str, length: int = SUMMARY_LENGTH) -> str:
+    """Shorten plain text to at most ``length`` characters at a word boundary.
+
+    Args:
+        text: Plain text
+        length: Maximum summary length, including the ellipsis
+
+    Returns:
+        The text itself if short enough, otherwise its start followed by an ellipsis
+    """
+    text = " ".join(text.split())
+    if len(text) <= length:
+        return text
+    cut = text[: length - 1]
+    if not text[length - 1].isspace() and " " in cut:
+        cut = cut.rsplit(" ", 1)[0]
+    return re.sub(r"[\s,;:.-]+$", "", cut) + "…"
+
+
+def feed_entry(post: PostMeta) -> FeedEntry:
+    """Build the feed entry of a post, rendering its body only when it has no excerpt.
+
+    Args:
+        post: Post metadata or full post
+
+    Returns:
+        The feed entry
+    """
+    if post.excerpt:
+        summary = " ".join(post.excerpt.split())
+    else:
+        full = post if isinstance(post, Post) else load_post(post.slug)
+        summary = summarize(plain_text(full.content)) if full else ""
+    url = f"{SITE_URL}/posts/{post.slug}"
+    return FeedEntry(url, post.title, summary, post.date, tuple(post.tags))
+
+
+def build_feed(
+    posts: list[PostMeta],
+    *,
+    title: str = SITE_TITLE,
+    description: str = SITE_DESCRIPTION,
+    home_path: str = "/",
+    prefix: str = "",
+    limit: int = FEED_LIMIT,
+) -> Feed:
+    """Build a feed model from the latest posts.
+
+    Args:
+        posts: Posts in reverse chronological order
+        title: Feed title
+        description: Feed description
+        home_path: Site path of the listing the feed follows
+        prefix: Site path the feed files live under
+        limit: Maximum number of entries
+
+    Returns:
+        The feed model
+    """
+    entries = tuple(feed_entry(post) for post in posts[:limit])
+    updated = max((entry.published for entry in entries), default=UNDATED)
+    return Feed(title, description, f"{SITE_URL}{home_path}", prefix, updated, entries)
+
+
+_feeds: dict[str | None, Feed] = {}
+_feeds_generation: int | None = None
+_feeds_lock = threading.Lock()
+
+
+def get_feed(tag: str | None = None) -> Feed | None:
+    """Get the feed model of the site or of a tag for the current content generation.
+
+    Models are cached until the content generation changes, and only for
+    tags that exist, so arbitrary tag names in URLs cannot grow the cache.
+
+    Args:
+        tag: Tag whose feed to build, or None for the site feed
+
+    Returns:
+        The feed model, or None if the tag has no posts
+    """
+    global _feeds_generation
+    key = tag.lower().strip() if tag is not None else None
+    generation = content_generation()
+    with _feeds_lock:
+        if generation != _feeds_generation:
+            _feeds.clear()
+            _feeds_generation = generation
+        feed = _feeds.get(key)
+    if feed is not None:
+        return feed
+
+    if key is None:
+        feed = build_feed(load_all_posts())
+    else:
+        posts = load_posts_by_tag(key)
+        if not posts:
+            return None
+        feed = build_feed(
+            posts,
+            title=f"{SITE_TITLE}: {key}",
+            description=f"Posts tagged with '{key}'",
+            home_path=f"/tags/{key}",
+            prefix=f"/tags/{key}",
+        )
+    with _feeds_lock:
+        if generation == _feeds_generation:
+            _feeds[key] = feed
+    return feed
+
+
+def _rfc822(value: datetime) -> str:
+    return value.strftime("%a, %d %b %Y %H:%M:%S +0000")
+
+
+def _rfc3339(value: datetime) -> str:
+    return value.replace(tzinfo=timezone.utc).isoformat().replace("+00:00", "Z")
+
+
+def render_rss(feed: Feed) -> str:
+    """Serialize a feed as RSS 2.0.
+
+    Args:
+        feed: Feed model
+
+    Returns:
+        RSS XML document
+    """
+    items = "".join(
+        f"""
+        <item>
+            <title>{escape(entry.title)}</title>
+            <link>{escape(entry.url)}</link>
+            <description>{escape(entry.summary)}</description>
+            <pubDate>{_rfc822(entry.published)}</pubDate>
+            <guid>{escape(entry.url)}</guid>{"".join(f"<category>{escape(tag)}</category>" for tag in entry.tags)}
+        </item>"""
+        for entry in feed.entries
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:atom="http://www.w3.org/2005/Atom">
+    <channel>
+        <title>{escape(feed.title)}</title>
+        <link>{escape(feed.home_url)}</link>
+        <description>{escape(feed.description)}</description>
+        <language>en-US</language>
+        <lastBuildDate>{_rfc822(feed.updated)}</lastBuildDate>
+        <atom:link href={quoteattr(f"{SITE_URL}{feed.prefix}/feed.xml")} rel="self" type="{RSS_MEDIA_TYPE}"/>{items}
+    </channel>
+</rss>"""
+
+
+def _atom_categories(tags: tuple[str, ...]) -> str:
+    return "".join(f"<category term={quoteattr(tag)}/>" for tag in tags)
+
+
+def render_atom(feed: Feed) -> str:
+    """Serialize a feed as Atom 1.0.
+
+    Args:
+        feed: Feed model
+
+    Returns:
+        Atom XML document
+    """
+    entries = "".join(
+        f"""
+    <entry>
+        <title>{escape(entry.title)}</title>
+        <id>{escape(entry.url)}</id>
+        <link rel="alternate" href={quoteattr(entry.url)}/>
+        <published>{_rfc3339(entry.published)}</published>
+        <updated>{_rfc3339(entry.published)}</updated>
+        <summary type="text">{escape(entry.summary)}</summary>{_atom_categories(entry.tags)}
+    </entry>"""
+        for entry in feed.entries
+    )
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+    <title>{escape(feed.title)}</title>
+    <subtitle>{escape(feed.description)}</subtitle>
+    <id>{escape(feed.home_url)}</id>
+    <link rel="alternate" href={quoteattr(feed.home_url)}/>
+    <link rel="self" href={quoteattr(f"{SITE_URL}{feed.prefix}/atom.xml")} type="{ATOM_MEDIA_TYPE}"/>
+    <updated>{_rfc3339(feed.updated)}</updated>
+    <author><name>{escape(AUTHOR)}</name></author>{entries}
+</feed>"""
+
+
+def render_json_feed(feed: Feed) -> str:
+    """Serialize a feed as JSON Feed 1.1.
+
+    Args:
+        feed: Feed model
+
+    Returns:
+        JSON Feed document
+    """
+    document = {
+        "version": "https://jsonfeed.org/version/1.1",
+        "title": feed.title,
+        "home_page_url": feed.home_url,
+        "feed_url": f"{SITE_URL}{feed.prefix}/feed.json",
+        "description": feed.description,
+        "language": "en-US",
+        "authors": [{"name": AUTHOR}],
+        "items": [
+            {
+                "id": entry.url,
+                "url": entry.url,
+                "title": entry.title,
+                "summary": entry.summary,
+                "content_text": entry.summary,
+                "date_published": _rfc3339(entry.published),
+                "tags": list(entry.tags),
+            }
+            for entry in feed.entries
+        ],
+    }
+    return json.dumps(document, ensure_ascii=False, separators=(",", ":"))
+
+
+FEED_FORMATS: dict[str, tuple[Callable[[Feed], str], str]] = {
+    "feed.xml": (render_rss, RSS_MEDIA_TYPE),
+    "atom.xml": (render_atom, ATOM_MEDIA_TYPE),
+    "feed.json": (render_json_feed, JSON_FEED_MEDIA_TYPE),
+}
+
+
+def serialize_feed(name: str, tag: str | None = None) -> str | None:
+    """Serialize the site or tag feed in the format served under a file name.
+
+    Args:
+        name: Feed file name, a key of ``FEED_FORMATS``
+        tag: Tag whose feed to serialize, or None for the site feed
+
+    Returns:
+        The feed document, or None if the tag has no posts
+    """
+    feed = get_feed(tag)
+    return None if feed is None else FEED_FORMATS[name][0](feed)
+
+
+def build_rss_feed(posts: list[PostMeta], limit: int = FEED_LIMIT) -> str:
+    """Build the RSS feed document.
+
+    Args:
+        posts: Posts in reverse chronological order
+        limit: Maximum number of items in the feed
+
+    Returns:
+        RSS 2.0 XML document
+    """
+    return render_rss(build_feed(posts, limit=limit))
+
+
+def build_sitemap(posts: list[PostMeta]) -> str:
+    """Build the XML sitemap.
+
+    Args:
+        posts: All published posts
+
+    Returns:
+        Sitemap XML document
+    """
+    urls = [
+        f"""
+            <url>
+                <loc>{SITE_URL}/</loc>
+                <changefreq>weekly</changefreq>
+                <priority>1.0</priority>
+            </url>""",
+        f"""
+            <url>
+                <loc>{SITE_URL}/about</loc>
+                <changefreq>monthly</changefreq>
+                <priority>0.8</priority>
+            </url>""",
+        f"""
+            <url>
+                <loc>{SITE_URL}/tags</loc>
+                <changefreq>weekly</changefreq>
+                <priority>0.7</priority>
+            </url>""",
+        f"""
+            <url>
+                <loc>{SITE_URL}/archive</loc>
+                <changefreq>weekly</changefreq>
+                <priority>0.6</priority>
+            </url>""",
+    ]
+
+    for year, month in sorted(index_by_date(posts), key=lambda key: (-key[0], key[1] or 0)):
+        path = f"/archive/{year}" if month is None else f"/archive/{year}/{month:02d}"
+        urls.append(f"""
+            <url>
+                <loc>{SITE_URL}{path}</loc>
+                <changefreq>monthly</changefreq>
+                <priority>0.5</priority>
+            </url>""")
+
+    for post in posts:
+        last_mod = post.date.strftime("%Y-%m-%d")
+        urls.append(f"""
+            <url>
+                <loc>{SITE_URL}/posts/{post.slug}</loc>
+                <lastmod>{last_mod}</lastmod>
+                <changefreq>monthly</changefreq>
+                <priority>0.9</priority>
+            </url>""")
+
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">
+    {"".join(urls)}
+</urlset>"""
+
+
+def build_robots_txt() -> str:
+    """Build robots.txt directives for search engine crawlers.
+
+    Returns:
+        robots.txt content
+    """
+    return f"""User-agent: *
+Allow: /
+
+Sitemap: {SITE_URL}/sitemap.xml
+"""
@@ -0,0 +1,294 @@
+"""Prometheus-style metrics collected in-process.
+
+Metrics are plain counters and histograms guarded by a lock per metric, so
+recording costs a dictionary lookup and a few additions. Values that already
+live elsewhere (such as ``lru_cache`` statistics) are not tracked on the hot
+path at all; modules register collectors that are only called when
+``/metrics`` is scraped.
+"""
+
+import bisect
+import os
+import resource
+import sys
+import threading
+import time
+from collections.abc import Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+Sample = tuple[str, dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class Counter:
+    """A monotonically increasing counter with optional labels."""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        """Create a counter.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels each sample carries
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self._values: dict[tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues: str, amount: float = 1):
+        """Increase the counter for one label combination.
+
+        Args:
+            *labelvalues: Label values, in ``labelnames`` order
+            amount: Amount to add
+        """
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def value(self, *labelvalues: str) -> float:
+        """Current value for one label combination."""
+        return self._values.get(labelvalues, 0)
+
+    def samples(self) -> Iterable[Sample]:
+        """Yield the exposition samples of this counter."""
+        with self._lock:
+            items = list(self._values.items())
+        for labelvalues, value in items:
+            yield self.name, dict(zip(self.labelnames, labelvalues)), value
+
+    def type(self) -> str:
+        """Prometheus metric type."""
+        return "counter"
+
+
+class Histogram:
+    """A cumulative histogram with optional labels."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ):
+        """Create a histogram.
+
+        Args:
+            name: Metric name
+            documentation: Help text
+            labelnames: Names of the labels each sample carries
+            buckets: Upper bounds of the buckets, in increasing order
+        """
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        self._values: dict[tuple[str, ...], list[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labelvalues: str):
+        """Record one observation.
+
+        Args:
+            value: Observed value
+            *labelvalues: Label values, in ``labelnames`` order
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(labelvalues)
+            if state is None:
+                # One slot per bucket, one for +Inf, then sum and count
+                state = self._values[labelvalues] = [0.0] * (len(self.buckets) + 3)
+            state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    def count(self, *labelvalues: str) -> float:
+        """Number of observations for one label combination."""
+        state = self._values.get(labelvalues)
+        return state[-1] if state else 0
+
+    def samples(self) -> Iterable[Sample]:
+        """Yield the exposition samples of this histogram."""
+        with self._lock:
+            items = [(labelvalues, list(state)) for labelvalues, state in self._values.items()]
+        for labelvalues, state in items:
+            labels = dict(zip(self.labelnames, labelvalues))
+            cumulative = 0.0
+            for bound, count in zip((*self.buckets, float("inf")), state):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, state[-2]
+            yield f"{self.name}_count", labels, state[-1]
+
+    def type(self) -> str:
+        """Prometheus metric type."""
+        return "histogram"
+
+
+class Registry:
+    """Metrics and scrape-time collectors exposed by ``/metrics``."""
+
+    def __init__(self):
+        """Create an empty registry."""
+        self._metrics: list[Counter | Histogram] = []
+        self._collectors: list[Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]] = []
+
+    def register(self, metric):
+        """Register a metric and return it."""
+        self._metrics.append(metric)
+        return metric
+
+    def register_collector(self, collector: Callable[[], Iterable[tuple[str, str, str, list[Sample]]]]):
+        """Register a callable producing metric families at scrape time.
+
+        Args:
+            collector: Callable yielding ``(name, type, help, samples)`` tuples
+        """
+        self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        """Render every metric in the text exposition format."""
+        families = [(metric.name, metric.type(), metric.documentation, metric.samples()) for metric in self._metrics]
+        for collector in self._collectors:
+            families.extend(collector())
+
+        lines = []
+        for name, metric_type, documentation, samples in families:
+            lines.append(f"# HELP {name} {documentation}")
+            lines.append(f"# TYPE {name} {metric_type}")
+            for sample_name, labels, value in samples:
+                lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: tuple[str, ...] = ()) -> Counter:
+    """Create and register a counter in the default registry."""
+    return REGISTRY.register(Counter(name, documentation, labelnames))
+
+
+def histogram(
+    name: str, documentation: str, labelnames: tuple[str, ...] = (), buckets: tuple[float, ...] = LATENCY_BUCKETS
+) -> Histogram:
+    """Create and register a histogram in the default registry."""
+    return REGISTRY.register(Histogram(name, documentation, labelnames, buckets))
+
+
+def register_collector(collector):
+    """Register a scrape-time collector in the default registry."""
+    return REGISTRY.register_collector(collector)
+
+
+HTTP_REQUESTS = counter("http_requests_total", "HTTP requests by route template.", ("method", "route", "status"))
+HTTP_LATENCY = histogram("http_request_duration_seconds", "HTTP request latency by route template.", ("route",))
+RESPONSE_BYTES = counter(
+    "http_response_body_bytes_total", "Response body bytes before and after compression.", ("stage",)
+)
+
+
+def render_metrics() -> str:
+    """Render the default registry in the text exposition format."""
+    return REGISTRY.render()
+
+
+def _resident_memory_bytes() -> float:
+    try:
+        with open("/proc/self/statm", encoding="ascii") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError):
+        maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+@register_collector
+def _process_metrics():
+    yield (
+        "process_resident_memory_bytes",
+        "gauge",
+        "Resident memory size in bytes.",
+        [("process_resident_memory_bytes", {}, _resident_memory_bytes())],
+    )
+    yield (
+        "process_cpu_seconds_total",
+        "counter",
+        "Total user and system CPU time in seconds.",
+        [("process_cpu_seconds_total", {}, time.process_time())],
+    )
+
+
+class MetricsMiddleware:
+    """Record request counts and latency per route template."""
+
+    def __init__(self, app: ASGIApp):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app to measure
+        """
+        self.app = app
+        self._templates: dict[int, str] = {}
+
+    def _route_template(self, scope: Scope) -> str:
+        if "route_path" in scope:
+            return scope["route_path"]
+
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+
+        template = self._templates.get(id(endpoint))
+        if template is None:
+            for route in scope["app"].router.routes:
+                target = getattr(route, "endpoint", None) or getattr(route, "app", None)
+                self._templates[id(target)] = route.path
+            template = self._templates.setdefault(id(endpoint), "unmatched")
+        return template
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Measure one request."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = [500]
+
+        async def send_with_metrics(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_metrics)
+        finally:
+            route = self._route_template(scope)
+            HTTP_REQUESTS.inc(scope["method"], route, str(status[0]))
+            HTTP_LATENCY.observe(time.perf_counter() - started, route)
@@ -0,0 +1,190 @@
+"""HTML minification applied once, when HTML enters a cache.
+
+FastHTML serializes pages with indentation, and markdown output separates
+blocks with newlines; both cost bytes on the wire and work for the
+compressor. ``minify_html`` collapses that whitespace without changing how
+the page renders:
+
+* whitespace runs in text collapse to a single space;
+* whitespace next to block-level tags, where browsers ignore it, is dropped;
+* inline ``<style>`` sheets lose comments and the whitespace around braces,
+  semicolons and commas;
+* ``<pre>`` (including codehilite blocks), ``<textarea>`` and ``<script>``
+  elements, HTML comments and the inside of tags are kept verbatim.
+
+Minification is not done per request: rendered post bodies are minified when
+they are compiled (and so enter the post cache or a compiled artifact), and
+complete pages when the compression layer first sees their ETag. The bytes
+saved are recorded per page in ``SAVINGS`` and in the
+``html_minify_bytes_total`` metric.
+"""
+
+import re
+import threading
+from collections import OrderedDict
+
+from .metrics import counter
+
+HTML_MINIFY_BYTES = counter(
+    "html_minify_bytes_total", "HTML bytes before and after minification by kind.", ("kind", "stage")
+)
+
+_PRESERVED = re.compile(r"<(pre|textarea|script|style)\b[^>]*>.*?</\1\s*>", re.IGNORECASE | re.DOTALL)
+_TOKEN = re.compile(r"<!--.*?-->|<![^>]*>|<[^>]*>", re.DOTALL)
+_TAG_NAME = re.compile(r"</?([a-zA-Z][\w-]*)")
+_WHITESPACE = re.compile(r"\s+")
+_STYLE = re.compile(r"(<style\b[^>]*>)(.*?)(</style\s*>)", re.IGNORECASE | re.DOTALL)
+_CSS_COMMENT = re.compile(r"/\*.*?\*/", re.DOTALL)
+_CSS_PUNCTUATION = re.compile(r"\s*([{};,])\s*")
+
+# Elements around which whitespace is not rendered
+BLOCK_TAGS = frozenset(
+    (
+        "address article aside blockquote body br dd details div dl dt fieldset figcaption figure footer form h1 h2 "
+        "h3 h4 h5 h6 head header hr html li link main meta nav noscript ol p pre script section style summary table "
+        "tbody td tfoot th thead title tr ul"
+    ).split()
+)
+
+
+def _is_block(token: str) -> bool:
+    if token.startswith("<!"):
+        return True
+    match = _TAG_NAME.match(token)
+    return match is not None and match.group(1).lower() in BLOCK_TAGS
+
+
+def minify_css(css: str) -> str:
+    """Remove comments and insignificant whitespace from a style sheet.
+
+    Args:
+        css: CSS text
+
+    Returns:
+        Minified CSS
+    """
+    css = _WHITESPACE.sub(" ", _CSS_COMMENT.sub("", css))
+    return _CSS_PUNCTUATION.sub(r"\1", css).replace(";}", "}").strip()
+
+
+def _preserved(element: str) -> str:
+    style = _STYLE.fullmatch(element)
+    return f"{style.group(1)}{minify_css(style.group(2))}{style.group(3)}" if style else element
+
+
+def _squeeze(fragment: str) -> list[str]:
+    """Tokens of an HTML fragment without preserved elements, with text whitespace collapsed."""
+    tokens: list[str] = []
+    position = 0
+    for match in _TOKEN.finditer(fragment):
+        if match.start() > position:
+            tokens.append(_WHITESPACE.sub(" ", fragment[position : match.start()]))
+        tokens.append(match.group(0))
+        position = match.end()
+    if position < len(fragment):
+        tokens.append(_WHITESPACE.sub(" ", fragment[position:]))
+    return tokens
+
+
+def minify_html(html: str) -> str:
+    """Remove whitespace that does not affect rendering from an HTML document or fragment.
+
+    Args:
+        html: HTML text
+
+    Returns:
+        Minified HTML
+    """
+    tokens: list[str] = []
+    position = 0
+    for match in _PRESERVED.finditer(html):
+        tokens.extend(_squeeze(html[position : match.start()]))
+        tokens.append(_preserved(match.group(0)))
+        position = match.end()
+    tokens.extend(_squeeze(html[position:]))
+
+    out = []
+    count = len(tokens)
+    for i, token in enumerate(tokens):
+        if token.startswith("<"):
+            out.append(token)
+            continue
+        # Text: trim spaces next to block-level tags and the ends of the document
+        if token.startswith(" ") and (i == 0 or _is_block(tokens[i - 1])):
+            token = token[1:]
+        if token.endswith(" ") and (i == count - 1 or _is_block(tokens[i + 1])):
+            token = token[:-1]
+        if token:
+            out.append(token)
+    return "".join(out)
+
+
+class SavingsReport:
+    """Bytes saved by minification for the most recently minified pages."""
+
+    def __init__(self, max_entries: int = 1024):
+        """Create an empty report.
+
+        Args:
+            max_entries: Number of pages remembered
+        """
+        self.max_entries = max_entries
+        self._entries: OrderedDict[str, tuple[str, int, int]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, page: str, kind: str, before: int, after: int):
+        """Record the sizes of one minified page.
+
+        Args:
+            page: Page path, or ``post:<slug>`` for a rendered post body
+            kind: ``page`` or ``post``
+            before: Size in bytes before minification
+            after: Size in bytes after minification
+        """
+        HTML_MINIFY_BYTES.inc(kind, "before", amount=before)
+        HTML_MINIFY_BYTES.inc(kind, "after", amount=after)
+        with self._lock:
+            self._entries[page] = (kind, before, after)
+            self._entries.move_to_end(page)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def report(self) -> list[dict]:
+        """Savings per page, largest first.
+
+        Returns:
+            One dictionary per page with its sizes, bytes saved and percentage saved
+        """
+        with self._lock:
+            entries = list(self._entries.items())
+        rows = [
+            {
+                "page": page,
+                "kind": kind,
+                "before": before,
+                "after": after,
+                "saved": before - after,
+                "saved_percent": round(100 * (before - after) / before, 1) if before else 0.0,
+            }
+            for page, (kind, before, after) in entries
+        ]
+        return sorted(rows, key=lambda row: row["saved"], reverse=True)
+
+
+SAVINGS = SavingsReport()
+
+
+def minify_and_record(html: str, page: str, kind: str = "page") -> str:
+    """Minify HTML and record the savings for a page.
+
+    Args:
+        html: HTML text
+        page: Page path, or ``post:<slug>`` for a rendered post body
+        kind: ``page`` or ``post``
+
+    Returns:
+        Minified HTML
+    """
+    minified = minify_html(html)
+    SAVINGS.record(page, kind, len(html.encode("utf-8")), len(minified.encode("utf-8")))
+    return minified
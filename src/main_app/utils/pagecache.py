@@ -0,0 +1,227 @@
+"""Rendered page cache shared between workers.
+
+``PageCacheMiddleware`` wraps the router and stores complete ``200`` HTML
+responses in a ``TieredCache``: the worker's own LRU first, then the shared
+backend. A page rendered by one worker is served by every other worker, and
+after a restart, without running its route handler again. Without a shared
+backend each worker still serves repeated pages from its own LRU.
+
+Keys combine the code version, the content fingerprint, the path, the query
+parameters routes read (sorted), and the request headers the page varies on
+(the htmx headers that select partial pages), so publishing a post or
+deploying new code moves every page to new keys instead of invalidating old
+ones. URLs carrying any other query parameter are rendered uncached, so
+arbitrary parameters cannot fill the cache with copies of one page. Streamed
+responses,
+responses setting cookies and anything other than HTML pass through uncached.
+Concurrent misses for one page in a worker render it once: later requests wait
+for the first and are answered from the cache. As soon as the first response
+turns out not to be storable (its status and headers, or a streamed body),
+the waiting requests render the page themselves, so a slow client of an
+uncacheable page does not hold up anyone else.
+
+The middleware is the innermost layer, so cached pages still get the
+navigation, cache-control and security headers, minification and compression
+of the outer layers.
+"""
+
+import asyncio
+import hashlib
+import json
+from collections.abc import Callable
+from urllib.parse import parse_qsl, urlencode
+
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from .cache import TieredCache, code_version
+from .content import content_fingerprint, content_generation
+
+# Paths whose responses are never cached
+UNCACHED_PREFIXES = ("/admin/", "/static/", "/metrics", "/health")
+
+# Query parameters pages are rendered from (pagination); URLs with others are not cached
+CACHED_QUERY_PARAMS = ("page", "before")
+
+# Rendered pages: a 256-page LRU in each worker over the shared backend, if any
+RENDERED_PAGES = TieredCache("pages")
+
+
+def encode_page(status: int, headers: list[tuple[bytes, bytes]], body: bytes, route_path: str | None) -> bytes:
+    """Serialize a response for the cache.
+
+    Args:
+        status: HTTP status code
+        headers: Raw response headers
+        body: Response body
+        route_path: Route template the response was produced by
+
+    Returns:
+        A JSON header line followed by the body
+    """
+    head = {
+        "status": status,
+        "headers": [[name.decode("latin-1"), value.decode("latin-1")] for name, value in headers],
+        "route_path": route_path,
+    }
+    return json.dumps(head, separators=(",", ":")).encode("utf-8") + b"\n" + body
+
+
+def decode_page(entry: bytes) -> tuple[int, list[tuple[bytes, bytes]], bytes, str | None]:
+    """Restore a response serialized by ``encode_page``.
+
+    Args:
+        entry: Cached bytes
+
+    Returns:
+        Status code, raw headers, body and route template
+    """
+    head, _, body = entry.partition(b"\n")
+    data = json.loads(head)
+    headers = [(name.encode("latin-1"), value.encode("latin-1")) for name, value in data["headers"]]
+    return data["status"], headers, body, data["route_path"]
+
+
+def _route_template(scope: Scope) -> str | None:
+    endpoint = scope.get("endpoint")
+    if endpoint is None or "app" not in scope:
+        return None
+    for route in scope["app"].router.routes:
+        if getattr(route, "endpoint", None) is endpoint:
+            return route.path
+    return None
+
+
+class PageCacheMiddleware:
+    """Serve rendered HTML pages from a two-tier cache, filling it on a miss."""
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        cache: TieredCache | None = None,
+        vary: tuple[str, ...] = (),
+        params: tuple[str, ...] = CACHED_QUERY_PARAMS,
+        fingerprint: Callable[[], str] = content_fingerprint,
+        generation: Callable[[], int] = content_generation,
+    ):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app rendering pages
+            cache: Cache holding the pages (defaults to ``RENDERED_PAGES``)
+            vary: Request headers that select between different pages for one URL
+            params: Query parameters that select between different pages for one path
+            fingerprint: Returns the digest of the content being served
+            generation: Returns the current content generation, which the fingerprint is kept for
+        """
+        self.app = app
+        self.cache = cache if cache is not None else RENDERED_PAGES
+        self.vary = tuple(name.lower() for name in vary)
+        self.params = frozenset(params)
+        self.fingerprint = fingerprint
+        self.generation = generation
+        self._fingerprint: tuple[int, str] | None = None
+        self._rendering: dict[str, asyncio.Event] = {}
+
+    async def current_fingerprint(self) -> str:
+        """Content fingerprint, computed in a worker thread once per content generation.
+
+        Hashing the content stats every source file, so it is kept off the
+        event loop and reused until the generation changes.
+
+        Returns:
+            Hex digest
+        """
+        generation = self.generation()
+        if self._fingerprint is None or self._fingerprint[0] != generation:
+            self._fingerprint = (generation, await run_in_threadpool(self.fingerprint))
+        return self._fingerprint[1]
+
+    def key(self, scope: Scope, fingerprint: str) -> str | None:
+        """Cache key of the page a request asks for.
+
+        Args:
+            scope: ASGI scope of a ``GET`` request
+            fingerprint: Digest of the content being served
+
+        Returns:
+            Cache key, or None if the URL has a query parameter pages are not
+            rendered from, or one of them more than once
+        """
+        query = parse_qsl(scope.get("query_string", b"").decode("latin-1"), keep_blank_values=True)
+        names = [name for name, _ in query]
+        if not self.params.issuperset(names) or len(set(names)) != len(names):
+            return None
+        headers = Headers(scope=scope)
+        parts = [code_version(), fingerprint, scope["path"], urlencode(sorted(query))]
+        parts += [headers.get(name, "") for name in self.vary]
+        return "page:" + hashlib.blake2b("\0".join(parts).encode("utf-8"), digest_size=20).hexdigest()
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Answer from the cache, or render and store the page."""
+        key = None
+        if (
+            scope["type"] == "http"
+            and scope["method"] == "GET"
+            and not scope["path"].startswith(UNCACHED_PREFIXES)
+            and self.cache.enabled()
+        ):
+            key = self.key(scope, await self.current_fingerprint())
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+
+        # Reading the shared tier yields to the event loop, so check again for a render started meanwhile
+        while True:
+            rendering = self._rendering.get(key)
+            if rendering is not None:
+                await rendering.wait()
+            cached = await self.cache.aget(key)
+            if cached is not None:
+                status, headers, body, route_path = decode_page(cached)
+                if route_path is not None:
+                    scope["route_path"] = route_path
+                await send({"type": "http.response.start", "status": status, "headers": headers})
+                await send({"type": "http.response.body", "body": body})
+                return
+            if key not in self._rendering:
+                break
+
+        start: Message | None = None
+
+        def release() -> None:
+            # Waiters render the page themselves instead of waiting for a response that will not be stored
+            if self._rendering.get(key) is rendering:
+                del self._rendering[key]
+            rendering.set()
+
+        async def send_and_store(message: Message) -> None:
+            nonlocal start
+            entry = None
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if (
+                    message["status"] == 200
+                    and headers.get("content-type", "").startswith("text/html")
+                    and "set-cookie" not in headers
+                ):
+                    start = message
+                else:
+                    release()
+            elif message["type"] == "http.response.body" and start is not None:
+                response, start = start, None
+                if message.get("more_body", False):
+                    release()
+                else:
+                    entry = encode_page(200, response["headers"], message.get("body", b""), _route_template(scope))
+            await send(message)
+            # Stored after sending, so the client does not wait for the shared backend
+            if entry is not None:
+                await self.cache.aset(key, entry)
+
+        rendering = self._rendering[key] = asyncio.Event()
+        try:
+            await self.app(scope, receive, send_and_store)
+        finally:
+            release()
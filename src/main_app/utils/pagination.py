@@ -0,0 +1,110 @@
+"""Precomputed pagination indexes for post listings."""
+
+from dataclasses import dataclass
+from typing import Any
+
+POSTS_PER_PAGE = 10
+
+
+@dataclass(frozen=True, slots=True)
+class Page:
+    """A single page of an ordered post listing.
+
+    Attributes:
+        number: 1-based page number the first post on this page falls on
+        total_pages: Number of pages in the listing (always at least 1)
+        start: Offset of the first post on this page within the listing
+        posts: Posts shown on this page
+        prev_number: Number of the page holding the post just before this one, if any
+        next_cursor: Slug to pass as ``before`` to fetch the following page, if any
+        cursor: Whether the page was addressed with a ``before`` cursor
+    """
+
+    number: int
+    total_pages: int
+    start: int
+    posts: list[Any]
+    prev_number: int | None
+    next_cursor: str | None
+    cursor: bool = False
+
+    @property
+    def has_prev(self) -> bool:
+        """Whether there are posts before this page."""
+        return self.prev_number is not None
+
+    @property
+    def has_next(self) -> bool:
+        """Whether there are posts after this page."""
+        return self.next_cursor is not None
+
+
+class PageIndex:
+    """Page boundaries for one ordered listing of posts.
+
+    The index keeps a reference to the (already cached) listing and resolves
+    any page, or any ``before`` cursor, with a slice of at most ``per_page``
+    posts. Slug positions for cursors are built lazily, once per index.
+    """
+
+    __slots__ = ("_posts", "_positions", "per_page", "total_posts", "total_pages")
+
+    def __init__(self, posts: list[Any], per_page: int = POSTS_PER_PAGE):
+        """Build the index for a listing.
+
+        Args:
+            posts: Listing in display order (not copied)
+            per_page: Number of posts per page
+        """
+        self._posts = posts
+        self._positions: dict[str, int] | None = None
+        self.per_page = per_page
+        self.total_posts = len(posts)
+        self.total_pages = max(1, (self.total_posts + per_page - 1) // per_page)
+
+    def page(self, number: int) -> Page | None:
+        """Look up a page by number.
+
+        Args:
+            number: 1-based page number
+
+        Returns:
+            The requested page, or None if the number is out of range
+        """
+        if number < 1 or number > self.total_pages:
+            return None
+        return self._slice((number - 1) * self.per_page, number, cursor=False)
+
+    def page_before(self, slug: str) -> Page | None:
+        """Look up the page of posts listed after the post with ``slug``.
+
+        Args:
+            slug: Slug of the last post the client has already seen
+
+        Returns:
+            The following page, or None if the cursor is unknown or at the end
+        """
+        if self._positions is None:
+            self._positions = {post["slug"]: position for position, post in enumerate(self._posts)}
+
+        position = self._positions.get(slug)
+        if position is None or position + 1 >= self.total_posts:
+            return None
+
+        start = position + 1
+        return self._slice(start, start // self.per_page + 1, cursor=True)
+
+    def _slice(self, start: int, number: int, cursor: bool) -> Page:
+        end = start + self.per_page
+        posts = self._posts[start:end]
+        prev_number = (start - 1) // self.per_page + 1 if start > 0 else None
+        next_cursor = posts[-1]["slug"] if end < self.total_posts else None
+        return Page(
+            number=number,
+            total_pages=self.total_pages,
+            start=start,
+            posts=posts,
+            prev_number=prev_number,
+            next_cursor=next_cursor,
+            cursor=cursor,
+        )
@@ -0,0 +1,340 @@
+"""Opt-in sampling profiler for request handling hot paths.
+
+A background thread samples the stacks of every other thread at a fixed
+interval. Samples are aggregated in one of two modes:
+
+- ``window``: everything sampled during a time window, for a flame graph of
+  where the process spends CPU under real traffic
+- ``slowest``: samples taken while each request was in flight, keeping only the
+  N slowest requests (samples are attributed to every request in flight when
+  they are taken, so concurrent requests share samples)
+
+Profiles are exported as collapsed stacks (for ``flamegraph.pl``, speedscope
+and similar tools) or as a pstats file built from the samples, which loads with
+``pstats.Stats`` and snakeviz. Sampling is off unless ``PROFILE_MODE`` is set
+or a capture is started through the admin routes.
+"""
+
+import heapq
+import itertools
+import logging
+import marshal
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from types import FrameType
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_INTERVAL = 0.005
+DEFAULT_WINDOW = 60.0
+DEFAULT_SLOWEST = 10
+MAX_DEPTH = 128
+
+FrameKey = tuple[str, int, str]
+Stack = tuple[FrameKey, ...]
+
+# Leaf frames of threads that are waiting for work rather than running it
+_IDLE_LEAVES = {("selectors.py", "select"), ("threading.py", "wait"), ("queue.py", "get")}
+
+
+def _stack_of(frame: FrameType | None) -> Stack:
+    frames = []
+    while frame is not None and len(frames) < MAX_DEPTH:
+        code = frame.f_code
+        frames.append((code.co_filename, code.co_firstlineno, code.co_name))
+        frame = frame.f_back
+    frames.reverse()
+    return tuple(frames)
+
+
+def _is_idle(stack: Stack) -> bool:
+    if not stack:
+        return True
+    filename, _, name = stack[-1]
+    return (os.path.basename(filename), name) in _IDLE_LEAVES
+
+
+def _frame_label(key: FrameKey) -> str:
+    filename, lineno, name = key
+    short = "/".join(filename.replace("\\", "/").split("/")[-2:])
+    return f"{name} ({short}:{lineno})".replace(";", ":")
+
+
+def to_collapsed(samples: Counter) -> str:
+    """Format samples as collapsed stacks, one ``frame;frame;frame count`` line each.
+
+    Args:
+        samples: Sample counts keyed by root-to-leaf stack
+
+    Returns:
+        Collapsed stack text
+    """
+    lines = []
+    for stack, count in samples.most_common():
+        labels = [key if isinstance(key, str) else _frame_label(key) for key in stack]
+        lines.append(f"{';'.join(labels)} {count}")
+    return "\n".join(lines) + ("\n" if lines else "")
+
+
+def to_pstats(samples: Counter, interval: float) -> bytes:
+    """Build a marshalled pstats table from stack samples.
+
+    Each sample contributes ``interval`` seconds of total time to its leaf
+    frame and of cumulative time to every distinct frame on its stack.
+
+    Args:
+        samples: Sample counts keyed by root-to-leaf stack
+        interval: Seconds represented by one sample
+
+    Returns:
+        Bytes loadable with ``pstats.Stats`` once written to a file
+    """
+    stats: dict[FrameKey, list] = {}
+    for stack, count in samples.items():
+        frames = [key for key in stack if not isinstance(key, str)]
+        seen = set()
+        for depth, key in enumerate(frames):
+            entry = stats.setdefault(key, [0, 0, 0.0, 0.0, {}])
+            if key not in seen:
+                seen.add(key)
+                entry[0] += count
+                entry[1] += count
+                entry[3] += count * interval
+            if depth == len(frames) - 1:
+                entry[2] += count * interval
+            if depth:
+                caller = entry[4].setdefault(frames[depth - 1], [0, 0, 0.0, 0.0])
+                caller[0] += count
+                caller[1] += count
+                caller[3] += count * interval
+                if depth == len(frames) - 1:
+                    caller[2] += count * interval
+
+    table = {
+        key: (cc, nc, tt, ct, {caller: tuple(values) for caller, values in callers.items()})
+        for key, (cc, nc, tt, ct, callers) in stats.items()
+    }
+    return marshal.dumps(table)
+
+
+class _RequestSamples:
+    __slots__ = ("label", "started", "samples")
+
+    def __init__(self, label: str):
+        self.label = label
+        self.started = time.perf_counter()
+        self.samples: Counter = Counter()
+
+
+class Profiler:
+    """Sampling profiler with a window mode and a slowest-requests mode."""
+
+    def __init__(self):
+        """Create an idle profiler."""
+        self.mode: str | None = None
+        self.interval = DEFAULT_INTERVAL
+        self.slowest = DEFAULT_SLOWEST
+        self.started_at: float | None = None
+        self.deadline: float | None = None
+        self._samples: Counter = Counter()
+        self._active: dict[int, _RequestSamples] = {}
+        self._slowest: list[tuple[float, int, _RequestSamples]] = []
+        self._sequence = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def running(self) -> bool:
+        """Whether a capture is in progress."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(
+        self,
+        mode: str,
+        *,
+        interval: float = DEFAULT_INTERVAL,
+        window: float | None = None,
+        slowest: int = DEFAULT_SLOWEST,
+    ):
+        """Start a capture, discarding the previous profile.
+
+        Args:
+            mode: ``window`` or ``slowest``
+            interval: Seconds between samples
+            window: Seconds after which the capture stops by itself (None to run until stopped)
+            slowest: Number of requests kept in ``slowest`` mode
+
+        Raises:
+            ValueError: If the mode or parameters are invalid
+        """
+        if mode not in ("window", "slowest"):
+            raise ValueError(f"Unknown profile mode: {mode}")
+        if interval <= 0 or slowest < 1 or (window is not None and window <= 0):
+            raise ValueError("Profile interval, window and slowest count must be positive")
+
+        self.stop()
+        with self._lock:
+            self.mode = mode
+            self.interval = interval
+            self.slowest = slowest
+            self.started_at = time.time()
+            self.deadline = time.perf_counter() + window if window else None
+            self._samples = Counter()
+            self._active = {}
+            self._slowest = []
+
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+        logger.info(f"Started {mode} profile (interval {interval * 1000:.1f} ms)")
+
+    def stop(self):
+        """Stop the capture in progress, keeping its profile for download."""
+        thread = self._thread
+        if thread is not None:
+            self._stop.set()
+            if thread is not threading.current_thread():
+                thread.join()
+            self._thread = None
+
+    def _run(self):
+        own_ident = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                break
+            stacks = [
+                stack
+                for ident, frame in sys._current_frames().items()
+                if ident != own_ident and not _is_idle(stack := _stack_of(frame))
+            ]
+            with self._lock:
+                if self.mode == "window":
+                    self._samples.update(stacks)
+                else:
+                    for request in self._active.values():
+                        request.samples.update(stacks)
+
+    def request_started(self, label: str) -> int | None:
+        """Register an in-flight request in ``slowest`` mode.
+
+        Args:
+            label: Request description, e.g. ``GET /posts/slug``
+
+        Returns:
+            Token for ``request_finished``, or None if not capturing requests
+        """
+        if self.mode != "slowest" or not self.running:
+            return None
+        token = next(self._sequence)
+        with self._lock:
+            self._active[token] = _RequestSamples(label)
+        return token
+
+    def request_finished(self, token: int):
+        """Finish an in-flight request and keep it if it is among the slowest.
+
+        Args:
+            token: Value returned by ``request_started``
+        """
+        with self._lock:
+            request = self._active.pop(token, None)
+            if request is None:
+                return
+            duration = time.perf_counter() - request.started
+            entry = (duration, token, request)
+            if len(self._slowest) < self.slowest:
+                heapq.heappush(self._slowest, entry)
+            elif duration > self._slowest[0][0]:
+                heapq.heapreplace(self._slowest, entry)
+
+    def samples(self) -> Counter:
+        """Samples of the current or last capture.
+
+        In ``slowest`` mode every stack is prefixed with a frame naming its
+        request and duration, so each request becomes its own tower in a flame
+        graph.
+        """
+        with self._lock:
+            if self.mode != "slowest":
+                return Counter(self._samples)
+            combined: Counter = Counter()
+            for duration, _, request in sorted(self._slowest, reverse=True):
+                root = f"{request.label} [{duration * 1000:.1f} ms]"
+                for stack, count in request.samples.items():
+                    combined[(root, *stack)] += count
+            return combined
+
+    def status(self) -> dict:
+        """Describe the profiler state for the admin routes."""
+        with self._lock:
+            slowest = [
+                {"request": request.label, "duration_ms": round(duration * 1000, 3)}
+                for duration, _, request in sorted(self._slowest, reverse=True)
+            ]
+            sample_count = sum(self._samples.values())
+        return {
+            "mode": self.mode,
+            "running": self.running,
+            "interval_ms": self.interval * 1000,
+            "started_at": self.started_at,
+            "samples": sample_count,
+            "slowest": slowest,
+        }
+
+
+PROFILER = Profiler()
+
+
+def configure_from_env(profiler: Profiler = PROFILER):
+    """Start a capture if ``PROFILE_MODE`` is set.
+
+    ``PROFILE_INTERVAL_MS``, ``PROFILE_WINDOW_SECONDS`` and ``PROFILE_SLOWEST``
+    tune the capture; window mode defaults to a 60 second window.
+
+    Args:
+        profiler: Profiler to configure
+    """
+    mode = os.environ.get("PROFILE_MODE", "").lower()
+    if not mode:
+        return
+
+    try:
+        interval = float(os.environ.get("PROFILE_INTERVAL_MS", DEFAULT_INTERVAL * 1000)) / 1000
+        window = os.environ.get("PROFILE_WINDOW_SECONDS")
+        window = float(window) if window else (DEFAULT_WINDOW if mode == "window" else None)
+        slowest = int(os.environ.get("PROFILE_SLOWEST", DEFAULT_SLOWEST))
+        profiler.start(mode, interval=interval, window=window, slowest=slowest)
+    except ValueError as e:
+        logger.error(f"Invalid profiling configuration: {e}")
+
+
+class ProfilingMiddleware:
+    """Track in-flight requests for the ``slowest`` profile mode."""
+
+    def __init__(self, app: ASGIApp, profiler: Profiler = PROFILER):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app to profile
+            profiler: Profiler receiving request boundaries
+        """
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Register the request with the profiler while it is handled."""
+        token = self.profiler.request_started(f"{scope['method']} {scope['path']}") if scope["type"] == "http" else None
+        if token is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.profiler.request_finished(token)
@@ -0,0 +1,346 @@
+"""Per-client token-bucket rate limiting in front of the application.
+
+Listings such as ``/?page=N`` and ``/tags/{tag}?page=N`` are rendered per
+request, and crawlers walking every combination of them can take the worker
+away from human readers. ``RateLimitMiddleware`` sits outside every other
+middleware and answers requests over budget with ``429 Too Many Requests``
+and a ``Retry-After`` header before any rendering, routing or metrics work
+is done.
+
+Requests are classified twice:
+
+* by route, into ``listing`` (home, tag and archive pages), ``feed`` (feeds,
+  sitemap and robots.txt) or ``default`` (posts and everything else); static
+  files, ``/health`` and ``/metrics`` are never limited;
+* by client, into ``human`` or ``crawler`` from the ``User-Agent`` header.
+
+Human clients get a bucket per IP address. Crawlers get a bucket per crawler
+name (so a crawler spread over many addresses still shares one budget), and
+every crawler request also draws from a bucket shared by all crawlers, which
+caps their combined load whatever user agents they send.
+
+The limiter is off unless ``RATE_LIMIT`` is set (see ``limiter_from_env``).
+It runs on the event loop only, so buckets need no locking. Buckets live in
+each worker process and are not shared, so the configured budgets are for
+the whole site and each worker enforces its share of them.
+"""
+
+import logging
+import math
+import os
+import re
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
+
+from starlette.datastructures import Headers
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from .metrics import counter, register_collector
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT_DECISIONS = counter(
+    "http_rate_limit_total",
+    "Rate limiter decisions by route class, client class and result.",
+    ("route", "client", "result"),
+)
+
+EXEMPT_PREFIXES = ("/static/",)
+EXEMPT_PATHS = frozenset({"/health", "/metrics"})
+FEED_NAMES = ("feed.xml", "atom.xml", "feed.json")
+MAX_BUCKETS = 10_000
+
+_CRAWLER = re.compile(
+    r"bot\b|crawl|spider|slurp|scrape|fetch|archiver|curl/|wget/|python-requests|python-httpx|aiohttp|"
+    r"go-http-client|java/|okhttp|headless",
+    re.IGNORECASE,
+)
+_CRAWLER_NAME = re.compile(r"[\w.-]*(?:bot|crawler|spider|slurp)[\w.-]*", re.IGNORECASE)
+_PRODUCT = re.compile(r"^[\w.-]+")
+
+
+@dataclass(frozen=True, slots=True)
+class Budget:
+    """Sustained request rate and burst size of one bucket.
+
+    Attributes:
+        rate: Tokens added per second
+        burst: Bucket capacity, the number of requests allowed at once
+    """
+
+    rate: float
+    burst: float
+
+
+# Budgets per route class and client class. "crawlers" is the bucket shared by all crawlers.
+DEFAULT_BUDGETS: dict[str, dict[str, Budget]] = {
+    "listing": {"human": Budget(5, 40), "crawler": Budget(0.5, 5), "crawlers": Budget(2, 10)},
+    "feed": {"human": Budget(2, 20), "crawler": Budget(1, 10), "crawlers": Budget(5, 20)},
+    "default": {"human": Budget(10, 60), "crawler": Budget(2, 20), "crawlers": Budget(8, 40)},
+}
+
+
+def route_class(path: str) -> str | None:
+    """Classify a request path for budgeting.
+
+    Args:
+        path: Request path
+
+    Returns:
+        ``listing``, ``feed`` or ``default``, or None if the path is never limited
+    """
+    if path in EXEMPT_PATHS or path.startswith(EXEMPT_PREFIXES):
+        return None
+    name = path.rpartition("/")[2]
+    if name in FEED_NAMES or path in ("/sitemap.xml", "/robots.txt"):
+        return "feed"
+    if path == "/" or path.startswith(("/tags", "/archive")):
+        return "listing"
+    return "default"
+
+
+def client_class(user_agent: str) -> tuple[str, str]:
+    """Classify a client by its ``User-Agent`` header.
+
+    Args:
+        user_agent: Header value (empty if missing)
+
+    Returns:
+        ``("human", "")`` or ``("crawler", name)`` with the crawler's lowercased product name
+    """
+    if user_agent and not _CRAWLER.search(user_agent):
+        return "human", ""
+    match = _CRAWLER_NAME.search(user_agent) or _PRODUCT.search(user_agent)
+    return "crawler", match.group(0).lower() if match else "anonymous"
+
+
+def parse_budgets(spec: str, base: dict[str, dict[str, Budget]] | None = None) -> dict[str, dict[str, Budget]]:
+    """Parse budget overrides such as ``listing=5/40,listing.crawler=0.5/5``.
+
+    Each item is ``route[.client]=rate/burst``; without a client class the
+    human budget is set. Unlisted budgets keep their base values.
+
+    Args:
+        spec: Comma-separated overrides
+        base: Budgets to override (defaults to ``DEFAULT_BUDGETS``)
+
+    Returns:
+        Budgets per route class and client class
+
+    Raises:
+        ValueError: If an item is malformed or names an unknown class
+    """
+    budgets = {route: dict(clients) for route, clients in (DEFAULT_BUDGETS if base is None else base).items()}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        name, _, value = item.partition("=")
+        route, _, client = name.strip().partition(".")
+        client = client or "human"
+        if route not in budgets or client not in budgets[route]:
+            raise ValueError(f"Unknown rate limit budget: {name.strip()!r}")
+        rate, _, burst = value.partition("/")
+        try:
+            budget = Budget(float(rate), float(burst or rate))
+        except ValueError:
+            raise ValueError(f"Invalid rate limit budget: {item!r}") from None
+        if budget.rate <= 0 or budget.burst < 1:
+            raise ValueError(f"Rate limit budgets need a positive rate and a burst of at least 1: {item!r}")
+        budgets[route][client] = budget
+    return budgets
+
+
+class RateLimiter:
+    """Token buckets per client and route class."""
+
+    def __init__(
+        self,
+        budgets: dict[str, dict[str, Budget]] | None = None,
+        trusted_hops: int = 0,
+        max_buckets: int = MAX_BUCKETS,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """Create a limiter.
+
+        Args:
+            budgets: Budgets per route class and client class (defaults to ``DEFAULT_BUDGETS``)
+            trusted_hops: Reverse proxies in front of the app; the client address is taken
+                from ``X-Forwarded-For`` this many entries from the right
+            max_buckets: Buckets kept before the least recently used are dropped
+            clock: Monotonic time source in seconds
+        """
+        self.budgets = budgets or DEFAULT_BUDGETS
+        self.trusted_hops = trusted_hops
+        self.max_buckets = max_buckets
+        self.clock = clock
+        self._buckets: OrderedDict[tuple[str, ...], list[float]] = OrderedDict()
+
+    def client_address(self, scope: Scope, headers: Headers) -> str:
+        """Address of the client, honouring trusted proxies.
+
+        Args:
+            scope: ASGI connection scope
+            headers: Request headers
+
+        Returns:
+            Client IP address, or ``unknown``
+        """
+        if self.trusted_hops:
+            forwarded = [hop.strip() for hop in headers.get("x-forwarded-for", "").split(",") if hop.strip()]
+            if len(forwarded) >= self.trusted_hops:
+                return forwarded[-self.trusted_hops]
+        client = scope.get("client")
+        return client[0] if client else "unknown"
+
+    def _bucket(self, key: tuple[str, ...], budget: Budget, now: float) -> list[float]:
+        """Refill a bucket to ``now``, creating it full on first use; returns ``[tokens, updated]``."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = self._buckets[key] = [budget.burst, now]
+            if len(self._buckets) > self.max_buckets:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            bucket[0] = min(budget.burst, bucket[0] + (now - bucket[1]) * budget.rate)
+            bucket[1] = now
+        return bucket
+
+    def check(self, route: str, keys: list[tuple[str, str]]) -> float:
+        """Take a token from every bucket a request draws from.
+
+        A request is only charged when all of its buckets have a token, so
+        rejected requests do not drain the buckets that had room.
+
+        Args:
+            route: Route class
+            keys: ``(budget name, bucket id)`` pairs, e.g. ``("crawler", "googlebot")``
+
+        Returns:
+            0 if the request is allowed, otherwise seconds until it would be
+        """
+        now = self.clock()
+        budgets = self.budgets[route]
+        buckets = [
+            (self._bucket((route, name, bucket_id), budgets[name], now), budgets[name]) for name, bucket_id in keys
+        ]
+        wait = max(((1 - bucket[0]) / budget.rate for bucket, budget in buckets if bucket[0] < 1), default=0.0)
+        if not wait:
+            for bucket, _ in buckets:
+                bucket[0] -= 1
+        return wait
+
+    def __len__(self) -> int:
+        """Number of buckets currently tracked."""
+        return len(self._buckets)
+
+
+def per_worker(budgets: dict[str, dict[str, Budget]], workers: int) -> dict[str, dict[str, Budget]]:
+    """Split site-wide budgets between worker processes.
+
+    Args:
+        budgets: Budgets per route class and client class for the whole site
+        workers: Number of worker processes, each with its own buckets
+
+    Returns:
+        Budgets one worker enforces (bursts are kept at one request at least)
+    """
+    return {
+        route: {
+            client: Budget(budget.rate / workers, max(1.0, budget.burst / workers))
+            for client, budget in clients.items()
+        }
+        for route, clients in budgets.items()
+    }
+
+
+def limiter_from_env() -> RateLimiter | None:
+    """Create the limiter configured by the environment.
+
+    ``RATE_LIMIT`` enables limiting (``1``, ``true`` or ``on``);
+    ``RATE_LIMIT_BUDGETS`` overrides budgets (see ``parse_budgets``) and
+    ``RATE_LIMIT_TRUSTED_HOPS`` is the number of proxies in front of the app.
+
+    Buckets are per worker process. Budgets are for the whole site and are
+    divided by ``WEB_CONCURRENCY`` (set by the production launcher to the
+    number of workers it runs), so with clients spread over the workers by
+    the kernel the site as a whole admits about the configured rate.
+
+    Returns:
+        The limiter, or None if limiting is off or misconfigured
+    """
+    if os.environ.get("RATE_LIMIT", "").lower() not in ("1", "true", "on", "yes"):
+        return None
+    try:
+        budgets = parse_budgets(os.environ.get("RATE_LIMIT_BUDGETS", ""))
+        trusted_hops = int(os.environ.get("RATE_LIMIT_TRUSTED_HOPS", "0"))
+        workers = max(int(os.environ.get("WEB_CONCURRENCY") or 1), 1)
+    except ValueError as e:
+        logger.error(f"Invalid rate limit configuration, limiting disabled: {e}")
+        return None
+    return RateLimiter(per_worker(budgets, workers), trusted_hops=trusted_hops)
+
+
+class RateLimitMiddleware:
+    """Reject requests over their client's budget with ``429 Too Many Requests``."""
+
+    def __init__(self, app: ASGIApp, limiter: RateLimiter | None = None, headers: dict[str, str] | None = None):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app to protect
+            limiter: Limiter deciding each request, or None to pass everything through
+            headers: Headers added to every ``429`` response (e.g. security headers), which
+                bypasses the layers that add them to other responses
+        """
+        self.app = app
+        self.limiter = limiter
+        self.headers = [
+            (name.lower().encode("latin-1"), value.encode("latin-1")) for name, value in (headers or {}).items()
+        ]
+        if limiter is not None:
+            register_collector(self._collect)
+
+    def _collect(self):
+        yield (
+            "http_rate_limit_buckets",
+            "gauge",
+            "Token buckets tracked by the rate limiter.",
+            [("http_rate_limit_buckets", {}, len(self.limiter))],
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Admit or reject one request."""
+        route = route_class(scope["path"]) if scope["type"] == "http" and self.limiter is not None else None
+        if route is None:
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        client, crawler = client_class(headers.get("user-agent", ""))
+        if client == "human":
+            keys = [("human", self.limiter.client_address(scope, headers))]
+        else:
+            keys = [("crawler", crawler), ("crawlers", "")]
+
+        wait = self.limiter.check(route, keys)
+        if not wait:
+            RATE_LIMIT_DECISIONS.inc(route, client, "allowed")
+            await self.app(scope, receive, send)
+            return
+
+        RATE_LIMIT_DECISIONS.inc(route, client, "limited")
+        body = b"Too Many Requests"
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 429,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode("latin-1")),
+                    (b"retry-after", str(max(1, math.ceil(wait))).encode("latin-1")),
+                    (b"cache-control", b"no-store"),
+                    *self.headers,
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body if scope["method"] != "HEAD" else b""})
@@ -0,0 +1,309 @@
+"""Related posts from tag overlap and TF-IDF similarity.
+
+Each post is scored against every other post as a weighted sum of the Jaccard
+overlap of their tags and the cosine similarity of their TF-IDF vectors over
+the title and markdown body. Vectors are truncated to each post's strongest
+terms, which keeps them sparse and drops noise from long posts.
+
+The top-k neighbours of every post are computed once per content generation
+and cached, so rendering a "Related posts" section is a dictionary lookup.
+Rebuilds are incremental: term counts are cached by the signature of each
+post's source file (path, size and modification time), so only posts whose
+file changed are read and tokenized again (scores are recomputed, since IDF
+weights depend on the whole corpus).
+
+Posts are scored one at a time from posting lists of terms and tags, keeping
+only each post's top k, so memory grows with the number of posts rather than
+with posts times vocabulary. NumPy accumulates the scores when it is
+installed (``pip install personal-website[similarity]``); otherwise the same
+ranking is produced in pure Python.
+"""
+
+import hashlib
+import heapq
+import logging
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from collections.abc import Callable
+from operator import itemgetter
+
+from .content import content_generation, load_all_posts, load_raw_content, source_signature
+from .schema import PostMeta
+from .timing import timed
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - depends on installed extras
+    np = None
+
+logger = logging.getLogger(__name__)
+
+TOP_K = 5
+TERMS_PER_POST = 48
+TAG_WEIGHT = 0.4
+TEXT_WEIGHT = 0.6
+SCORE_DIGITS = 9
+
+_TOKEN = re.compile(r"[a-z][a-z0-9_+#]{2,}")
+_STOPWORDS = frozenset(
+    """
+    about above after again against all also and any are because been before being below between both but can
+    could did does doing down during each few for from further had has have having her here hers him his how
+    into its itself just more most not now off once only other our ours out over own same she should some such
+    than that the their theirs them then there these they this those through too under until very was were what
+    when where which while who whom why will with would you your yours
+    """.split()
+)
+
+Neighbors = list[tuple[int, float]]
+
+
+def tokenize(text: str) -> Counter:
+    """Count the terms of a text for TF-IDF.
+
+    Args:
+        text: Title and markdown body
+
+    Returns:
+        Term counts, excluding stopwords and terms shorter than three characters
+    """
+    return Counter(term for term in _TOKEN.findall(text.lower()) if term not in _STOPWORDS)
+
+
+def _signatures(term_counts: list[Counter]) -> list[dict[str, float]]:
+    """L2-normalized TF-IDF vectors truncated to each post's strongest terms."""
+    document_frequency: Counter = Counter()
+    for counts in term_counts:
+        document_frequency.update(counts.keys())
+
+    n = len(term_counts)
+    idf = {term: math.log((1 + n) / (1 + df)) + 1 for term, df in document_frequency.items()}
+    signatures = []
+    for counts in term_counts:
+        weights = [
+            (term, (1 + math.log(count)) * idf[term] if count > 1 else idf[term]) for term, count in counts.items()
+        ]
+        top = heapq.nlargest(TERMS_PER_POST, weights, key=itemgetter(1))
+        norm = math.sqrt(sum(weight * weight for _, weight in top)) or 1.0
+        signatures.append({term: weight / norm for term, weight in top})
+    return signatures
+
+
+def _top(scores: dict[int, float], k: int) -> Neighbors:
+    """Highest scoring candidates, ties going to the earlier (newer) post.
+
+    Scores are compared after rounding so both scoring paths break ties the
+    same way despite summing in a different order.
+    """
+    ranked = ((j, round(score, SCORE_DIGITS)) for j, score in scores.items() if score > 0)
+    return heapq.nlargest(k, ranked, key=lambda item: (item[1], -item[0]))
+
+
+def _neighbors_python(signatures: list[dict[str, float]], tags: list[list[str]], k: int) -> list[Neighbors]:
+    """Score every pair through inverted indexes of terms and tags."""
+    term_postings: dict[str, list[tuple[int, float]]] = defaultdict(list)
+    for j, signature in enumerate(signatures):
+        for term, weight in signature.items():
+            term_postings[term].append((j, weight))
+    tag_postings: dict[str, list[int]] = defaultdict(list)
+    tag_sets = [set(post_tags) for post_tags in tags]
+    for j, post_tags in enumerate(tag_sets):
+        for tag in post_tags:
+            tag_postings[tag].append(j)
+
+    neighbors = []
+    for i, signature in enumerate(signatures):
+        scores: dict[int, float] = defaultdict(float)
+        for term, weight in signature.items():
+            for j, other in term_postings[term]:
+                scores[j] += TEXT_WEIGHT * weight * other
+        shared: Counter = Counter()
+        for tag in tag_sets[i]:
+            shared.update(tag_postings[tag])
+        for j, count in shared.items():
+            scores[j] += TAG_WEIGHT * count / (len(tag_sets[i]) + len(tag_sets[j]) - count)
+        scores.pop(i, None)
+        neighbors.append(_top(scores, k))
+    return neighbors
+
+
+def _neighbors_numpy(signatures: list[dict[str, float]], tags: list[list[str]], k: int) -> list[Neighbors]:
+    """Score one post at a time by accumulating posting lists with ``bincount``."""
+    n = len(signatures)
+    term_rows: dict[str, list[int]] = defaultdict(list)
+    term_weights: dict[str, list[float]] = defaultdict(list)
+    for j, signature in enumerate(signatures):
+        for term, weight in signature.items():
+            term_rows[term].append(j)
+            term_weights[term].append(weight)
+    postings = {term: (np.array(rows, dtype=np.intp), np.array(term_weights[term])) for term, rows in term_rows.items()}
+    tag_rows: dict[str, list[int]] = defaultdict(list)
+    tag_sets = [set(post_tags) for post_tags in tags]
+    for j, post_tags in enumerate(tag_sets):
+        for tag in post_tags:
+            tag_rows[tag].append(j)
+    tag_postings = {tag: np.array(rows, dtype=np.intp) for tag, rows in tag_rows.items()}
+    tag_counts = np.array([len(post_tags) for post_tags in tag_sets], dtype=np.float64)
+
+    neighbors = []
+    for i, signature in enumerate(signatures):
+        scores = np.zeros(n)
+        if signature:
+            rows = np.concatenate([postings[term][0] for term in signature])
+            weights = np.concatenate([postings[term][1] * weight for term, weight in signature.items()])
+            scores += TEXT_WEIGHT * np.bincount(rows, weights=weights, minlength=n)
+        if tag_sets[i]:
+            shared = np.bincount(np.concatenate([tag_postings[tag] for tag in tag_sets[i]]), minlength=n)
+            union = tag_counts[i] + tag_counts - shared
+            scores += TAG_WEIGHT * np.divide(shared, union, out=np.zeros(n), where=shared > 0)
+        scores[i] = 0.0
+        scores = scores.round(SCORE_DIGITS)
+
+        # Keep every candidate tied with the k-th best score so _top breaks ties by position
+        kth = np.partition(scores, n - k)[n - k] if n > k else 0.0
+        columns = np.flatnonzero((scores >= kth) & (scores > 0))
+        neighbors.append(_top(dict(zip(columns.tolist(), scores[columns].tolist())), k))
+    return neighbors
+
+
+class RelatedIndex:
+    """Precomputed top-k related posts for one content generation."""
+
+    __slots__ = ("generation", "posts", "neighbors", "terms", "tokenized")
+
+    def __init__(
+        self,
+        generation: int,
+        posts: dict[str, PostMeta],
+        neighbors: dict[str, tuple[str, ...]],
+        terms: dict[str, tuple[str, Counter]],
+        tokenized: int,
+    ):
+        """Create an index.
+
+        Args:
+            generation: Content generation the index was built for
+            posts: Post metadata by slug
+            neighbors: Related slugs by slug, best first
+            terms: Source signature (or body hash) and term counts by slug, reused by the next build
+            tokenized: Number of posts tokenized for this build
+        """
+        self.generation = generation
+        self.posts = posts
+        self.neighbors = neighbors
+        self.terms = terms
+        self.tokenized = tokenized
+
+    def related(self, slug: str, k: int = TOP_K) -> list[PostMeta]:
+        """Related posts for a slug, best first.
+
+        Args:
+            slug: Post slug
+            k: Maximum number of posts
+
+        Returns:
+            Related post metadata (empty for unknown slugs)
+        """
+        return [self.posts[other] for other in self.neighbors.get(slug, ())[:k]]
+
+
+@timed("content")
+def build_index(
+    posts: list[PostMeta],
+    *,
+    load_body: Callable[[str], str | None] = load_raw_content,
+    source: Callable[[str], str | None] | None = None,
+    previous: RelatedIndex | None = None,
+    generation: int = 0,
+    k: int = TOP_K,
+) -> RelatedIndex:
+    """Compute the related-posts index.
+
+    Args:
+        posts: Posts in listing order (ties between equal scores favour earlier posts)
+        load_body: Returns the markdown body of a post by slug
+        source: Returns the signature of a post's source file, so unchanged
+            posts are not read again; without it bodies are read and hashed
+        previous: Index whose term counts are reused for unchanged posts
+        generation: Content generation being indexed
+        k: Neighbours kept per post
+
+    Returns:
+        The new index
+    """
+    terms: dict[str, tuple[str, Counter]] = {}
+    tokenized = 0
+    for post in posts:
+        cached = previous.terms.get(post.slug) if previous is not None else None
+        signature = source(post.slug) if source is not None else None
+        if signature is not None:
+            key = f"{signature}\0{post.title}"
+            if cached is None or cached[0] != key:
+                cached = (key, tokenize(f"{post.title}\n{load_body(post.slug) or ''}"))
+                tokenized += 1
+        else:
+            text = f"{post.title}\n{load_body(post.slug) or ''}"
+            digest = hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+            if cached is None or cached[0] != digest:
+                cached = (digest, tokenize(text))
+                tokenized += 1
+        terms[post.slug] = cached
+
+    signatures = _signatures([terms[post.slug][1] for post in posts])
+    tags = [post.tags for post in posts]
+    if np is not None:
+        neighbors = _neighbors_numpy(signatures, tags, k)
+    else:
+        neighbors = _neighbors_python(signatures, tags, k)
+
+    logger.info(f"Built related-posts index for {len(posts)} posts ({tokenized} tokenized)")
+    return RelatedIndex(
+        generation,
+        {post.slug: post for post in posts},
+        {post.slug: tuple(posts[j].slug for j, _ in ranked) for post, ranked in zip(posts, neighbors)},
+        terms,
+        tokenized,
+    )
+
+
+_index: RelatedIndex | None = None
+_index_lock = threading.Lock()
+
+
+def get_related_index() -> RelatedIndex:
+    """Get the index for the current content generation, rebuilding it if content changed.
+
+    Returns:
+        The current related-posts index
+    """
+    global _index
+    generation = content_generation()
+    index = _index
+    if index is not None and index.generation == generation:
+        return index
+
+    with _index_lock:
+        if _index is None or _index.generation != generation:
+            _index = build_index(
+                load_all_posts(),
+                load_body=load_raw_content,
+                source=source_signature,
+                previous=_index,
+                generation=generation,
+            )
+        return _index
+
+
+def get_related_posts(slug: str, k: int = TOP_K) -> list[PostMeta]:
+    """Related posts for a post, best first.
+
+    Args:
+        slug: Post slug
+        k: Maximum number of posts
+
+    Returns:
+        Related post metadata
+    """
+    return get_related_index().related(slug, k)
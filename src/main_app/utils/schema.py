@@ -0,0 +1,256 @@
+"""Typed post records and frontmatter schema validation.
+
+Posts are slotted dataclasses rather than dicts, so listings sort and filter
+on compact typed attributes. Listings only need ``PostMeta``, which can be
+built from the frontmatter block and a word count of the body, without
+parsing or rendering the body; ``Post`` adds the rendered HTML.
+
+Records carry the body's word count, counted once when the post is compiled
+or its header scanned, so reading times cost nothing to render in listings.
+
+Frontmatter is validated against a small schema:
+
+- ``title``: non-empty string
+- ``date``: ISO 8601 date or datetime; timezone-aware values are converted to
+  naive UTC so every post compares against every other
+- ``tags``: list of strings (a single string is accepted as one tag)
+- ``excerpt``: string
+- ``draft``: boolean; drafts are never published
+
+In strict mode (used by the compiler) any violation raises ``PostError``. In
+lenient mode (used at request time) values are coerced, and a missing or
+invalid date becomes ``UNDATED`` so broken posts sort last, the same way in
+every worker, instead of taking the current time.
+"""
+
+import math
+from dataclasses import dataclass, field, fields
+from datetime import date, datetime, timezone
+from functools import cache
+from pathlib import Path
+from typing import Any
+
+UNDATED = datetime(1970, 1, 1)
+
+HEADER_MAX_BYTES = 64 * 1024
+
+WORDS_PER_MINUTE = 200
+
+
+class PostError(ValueError):
+    """Raised when a post file cannot be compiled."""
+
+
+@dataclass(frozen=True, slots=True)
+class PostMeta:
+    """Listing metadata of a blog post, read from its frontmatter alone.
+
+    Mapping-style access (``post["title"]``) is supported for templates and
+    older callers; new code should use attributes.
+
+    Attributes:
+        slug: File name without the ``.md`` extension
+        title: Post title
+        date: Publication date (naive UTC)
+        tags: Lowercased tags in frontmatter order
+        excerpt: Short summary, possibly empty
+        word_count: Number of words in the markdown body
+        draft: Whether the post is a draft, hidden until the flag is removed
+    """
+
+    slug: str
+    title: str
+    date: datetime
+    tags: list[str]
+    excerpt: str
+    word_count: int = field(default=0, kw_only=True)
+    draft: bool = field(default=False, kw_only=True)
+
+    @property
+    def reading_minutes(self) -> int:
+        """Estimated reading time in whole minutes (at least one)."""
+        return max(1, math.ceil(self.word_count / WORDS_PER_MINUTE))
+
+    def __getitem__(self, key: str) -> Any:
+        try:
+            return getattr(self, key)
+        except AttributeError:
+            raise KeyError(key) from None
+
+    def to_dict(self) -> dict[str, Any]:
+        """Convert the record to a plain dictionary."""
+        return {field.name: getattr(self, field.name) for field in fields(self)}
+
+
+@dataclass(frozen=True, slots=True)
+class Post(PostMeta):
+    """A blog post with its rendered body.
+
+    Attributes:
+        content: Rendered HTML, with ``id`` anchors on headings
+        raw_content: Markdown body
+        toc: Rendered table of contents linking the heading anchors, empty
+            when the post has fewer than two section headings
+    """
+
+    content: str
+    raw_content: str
+    toc: str = field(default="", kw_only=True)
+
+
+def parse_date(value: Any, *, strict: bool = False) -> datetime:
+    """Normalize a frontmatter date to a naive UTC datetime.
+
+    Args:
+        value: Raw ``date`` value from the frontmatter
+        strict: Raise instead of falling back to ``UNDATED``
+
+    Returns:
+        Parsed datetime
+
+    Raises:
+        PostError: If ``strict`` and the date is missing or invalid
+    """
+    parsed: datetime | None = None
+    if isinstance(value, datetime):
+        parsed = value
+    elif isinstance(value, date):
+        parsed = datetime.combine(value, datetime.min.time())
+    elif isinstance(value, str):
+        try:
+            parsed = datetime.fromisoformat(value)
+        except ValueError:
+            pass
+
+    if parsed is None:
+        if strict:
+            raise PostError("Missing date" if value is None else f"Invalid date: {value!r}")
+        return UNDATED
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+def validate_metadata(metadata: dict[str, Any], *, strict: bool = False) -> dict[str, Any]:
+    """Validate frontmatter and normalize it to typed post fields.
+
+    Args:
+        metadata: Parsed YAML frontmatter
+        strict: Raise on schema violations instead of coercing values
+
+    Returns:
+        Dictionary with ``title``, ``date``, ``tags``, ``excerpt`` and ``draft``
+
+    Raises:
+        PostError: If ``strict`` and the frontmatter violates the schema
+    """
+    title = metadata.get("title")
+    if not isinstance(title, str) or not title.strip():
+        if strict:
+            raise PostError("Missing title")
+        title = str(title) if title not in (None, "") else "Untitled"
+
+    tags = metadata.get("tags") or []
+    if isinstance(tags, str):
+        tags = [tags]
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        if strict:
+            raise PostError(f"Tags must be a list of strings: {tags!r}")
+        tags = [str(tag) for tag in tags] if isinstance(tags, list) else []
+
+    excerpt = metadata.get("excerpt") or ""
+    if not isinstance(excerpt, str):
+        if strict:
+            raise PostError(f"Excerpt must be a string: {excerpt!r}")
+        excerpt = str(excerpt)
+
+    draft = metadata.get("draft", False)
+    if not isinstance(draft, bool):
+        if strict:
+            raise PostError(f"Draft must be true or false: {draft!r}")
+        draft = str(draft).strip().lower() in ("true", "yes", "on", "1")
+
+    return {
+        "title": title,
+        "date": parse_date(metadata.get("date"), strict=strict),
+        "tags": [tag.lower().strip() for tag in tags],
+        "excerpt": excerpt,
+        "draft": draft,
+    }
+
+
+def count_words(text: str) -> int:
+    """Count the whitespace-separated words of a markdown body.
+
+    Markdown markers such as ``#`` or ``-`` count as words too; that is close
+    enough for reading times and several times faster than matching words
+    with a regular expression.
+
+    Args:
+        text: Markdown body
+
+    Returns:
+        Number of words
+    """
+    return len(text.split())
+
+
+@cache
+def _yaml():
+    """Import PyYAML on first use and pick its fastest safe loader."""
+    import yaml
+
+    return yaml, getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+
+def read_header(file_path: Path, max_bytes: int = HEADER_MAX_BYTES) -> tuple[dict[str, Any], int]:
+    """Read the YAML frontmatter block of a markdown file and count the words of its body.
+
+    The frontmatter is read up to the closing ``---`` line. The body is then
+    streamed line by line to count its words; it is neither parsed nor kept
+    in memory.
+
+    Args:
+        file_path: Path to the markdown file
+        max_bytes: Largest frontmatter block accepted
+
+    Returns:
+        Parsed frontmatter (empty if the file has none) and the body's word count
+
+    Raises:
+        PostError: If the block is unterminated, too large or not a YAML mapping
+    """
+    with open(file_path, "r", encoding="utf-8") as f:
+        first = f.readline(max_bytes)
+        lines = []
+        if first.rstrip("\r\n") == "---":
+            size = 0
+            while True:
+                line = f.readline(max_bytes - size + 1)
+                if not line:
+                    raise PostError("Unterminated frontmatter")
+                if line.rstrip("\r\n") == "---":
+                    break
+                size += len(line)
+                if size > max_bytes:
+                    raise PostError(f"Frontmatter larger than {max_bytes} bytes")
+                lines.append(line)
+            word_count = 0
+        else:
+            # No frontmatter: the first line is part of the body
+            word_count = count_words(first)
+        for line in f:
+            word_count += count_words(line)
+
+    if not lines:
+        return {}, word_count
+    yaml, loader = _yaml()
+    try:
+        metadata = yaml.load("".join(lines), Loader=loader)
+    except yaml.YAMLError as e:
+        raise PostError(f"Invalid frontmatter: {e}") from e
+    if metadata is None:
+        return {}, word_count
+    if not isinstance(metadata, dict):
+        raise PostError("Frontmatter must be a mapping")
+    return metadata, word_count
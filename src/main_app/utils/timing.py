@@ -0,0 +1,225 @@
+"""Per-request phase timing reported through Server-Timing headers.
+
+Timing is off unless ``SERVER_TIMING`` is set to a truthy value. When it is
+on, ``ServerTimingMiddleware`` tracks one ``RequestTimings`` per request in a
+context variable, and each layer charges its own work to a named phase:
+
+- ``content``: content-layer loading (``utils/content``)
+- ``layout``: the route handler building ``Layout`` and the FT tree
+- ``render``: FastHTML serializing the FT tree to HTML
+- ``compress``: response minification and compression (``utils/compression``)
+- ``middleware``: everything else, mostly the ``BaseHTTPMiddleware`` layers
+
+Phases are exclusive: time spent in a nested phase is not counted again in
+the phase that encloses it, so the durations add up to the total.
+"""
+
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+_current: ContextVar["RequestTimings | None"] = ContextVar("request_timings", default=None)
+
+
+def timing_enabled() -> bool:
+    """Check whether Server-Timing instrumentation is switched on.
+
+    Returns:
+        True if the ``SERVER_TIMING`` environment variable is truthy
+    """
+    return os.environ.get("SERVER_TIMING", "").lower() in ("1", "true", "yes", "on")
+
+
+class RequestTimings:
+    """Exclusive time spent in each phase of a single request."""
+
+    __slots__ = ("started", "durations", "_stack", "_mark")
+
+    def __init__(self):
+        """Start timing a request."""
+        self.started = time.perf_counter()
+        self.durations: dict[str, float] = {}
+        self._stack: list[str] = []
+        self._mark = self.started
+
+    def _charge(self, now: float):
+        if self._stack:
+            name = self._stack[-1]
+            self.durations[name] = self.durations.get(name, 0.0) + now - self._mark
+        self._mark = now
+
+    def push(self, name: str):
+        """Enter a phase, pausing the enclosing one.
+
+        Args:
+            name: Phase name
+        """
+        self._charge(time.perf_counter())
+        self._stack.append(name)
+
+    def pop(self, name: str):
+        """Leave a phase if it is the innermost open one.
+
+        Args:
+            name: Phase name
+        """
+        if self._stack and self._stack[-1] == name:
+            self._charge(time.perf_counter())
+            self._stack.pop()
+
+    def unwind(self):
+        """Close every open phase, e.g. once the response has been produced."""
+        self._charge(time.perf_counter())
+        self._stack.clear()
+
+    def total(self) -> float:
+        """Seconds elapsed since the request started."""
+        return time.perf_counter() - self.started
+
+    def phases(self) -> dict[str, float]:
+        """Phase durations in milliseconds, including ``middleware`` and ``total``.
+
+        Returns:
+            Dictionary of phase name to milliseconds
+        """
+        total = self.total()
+        phases = {name: duration * 1000 for name, duration in self.durations.items()}
+        phases["middleware"] = max(total - sum(self.durations.values()), 0.0) * 1000
+        phases["total"] = total * 1000
+        return phases
+
+    def header(self) -> str:
+        """Format the phases as a Server-Timing header value."""
+        return ", ".join(f"{name};dur={duration:.3f}" for name, duration in self.phases().items())
+
+
+def current_timings() -> RequestTimings | None:
+    """Get the timings of the request being handled, if timing is active."""
+    return _current.get()
+
+
+@contextmanager
+def phase(name: str):
+    """Charge the enclosed block to a phase of the current request.
+
+    Args:
+        name: Phase name
+    """
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+
+    timings.push(name)
+    try:
+        yield
+    finally:
+        timings.pop(name)
+
+
+def timed(name: str) -> Callable:
+    """Decorate a function so its calls are charged to a phase.
+
+    Args:
+        name: Phase name
+
+    Returns:
+        Decorator applying the phase to every call
+    """
+
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            timings = _current.get()
+            if timings is None:
+                return func(*args, **kwargs)
+
+            timings.push(name)
+            try:
+                return func(*args, **kwargs)
+            finally:
+                timings.pop(name)
+
+        return wrapper
+
+    return decorator
+
+
+async def begin_handler_phase():
+    """FastHTML ``before`` hook charging the route handler to ``layout``."""
+    timings = _current.get()
+    if timings is not None:
+        timings.push("layout")
+
+
+def end_handler_phase(resp):
+    """FastHTML ``after`` hook switching from ``layout`` to ``render``.
+
+    Args:
+        resp: The handler's return value (left unchanged)
+    """
+    timings = _current.get()
+    if timings is not None:
+        timings.pop("layout")
+        timings.push("render")
+
+
+class ServerTimingMiddleware:
+    """Outermost middleware that emits Server-Timing headers and request log lines."""
+
+    def __init__(self, app: ASGIApp, enabled: bool | None = None):
+        """Wrap an ASGI app.
+
+        Args:
+            app: The ASGI app to time
+            enabled: Force timing on or off (defaults to ``SERVER_TIMING``)
+        """
+        self.app = app
+        self.enabled = timing_enabled() if enabled is None else enabled
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Time one request and attach the results to its response."""
+        if scope["type"] != "http" or not self.enabled or _current.get() is not None:
+            await self.app(scope, receive, send)
+            return
+
+        timings = RequestTimings()
+        token = _current.set(timings)
+        response = {"status": 500, "bytes": 0}
+
+        async def send_with_timing(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                timings.unwind()
+                response["status"] = message["status"]
+                MutableHeaders(scope=message).append("Server-Timing", timings.header())
+            elif message["type"] == "http.response.body":
+                response["bytes"] += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _current.reset(token)
+            timings.unwind()
+            logger.info(
+                json.dumps(
+                    {
+                        "event": "request",
+                        "method": scope["method"],
+                        "path": scope["path"],
+                        "status": response["status"],
+                        "bytes": response["bytes"],
+                        "phases_ms": {name: round(value, 3) for name, value in timings.phases().items()},
+                    }
+                )
+            )
@@ -77,6 +77,25 @@ class TestRoutes:
         assert "https://fonts.googleapis.com" in csp
         assert "https://fonts.gstatic.com" in csp
 
+    def test_home_out_of_range_page_returns_404(self):
+        """Test that page numbers outside the listing return 404."""
+        assert self.client.get("/?page=999999").status_code == 404
+        assert self.client.get("/?page=0").status_code == 404
+        assert self.client.get("/?page=-1").status_code == 404
+
+    def test_home_before_cursor(self):
+        """Test cursor navigation on the home listing."""
+        response = self.client.get("/?before=welcome-to-my-blog")
+        assert response.status_code == 200
+        assert "Getting Started with FastHTML" in response.text
+
+        assert self.client.get("/?before=nonexistent-post").status_code == 404
+
+    def test_tag_out_of_range_page_returns_404(self):
+        """Test that tag listings validate page bounds."""
+        assert self.client.get("/tags/python?page=1").status_code == 200
+        assert self.client.get("/tags/python?page=50").status_code == 404
+
     def test_static_css_accessible(self):
         """Test that static CSS file returns 200."""
         response = self.client.get("/static/css/custom.css")
@@ -0,0 +1,81 @@
+"""Tests for the date-based archive routes."""
+
+import tempfile
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils.content import clear_content_cache
+
+POSTS = {
+    "new-year": "2025-01-02",
+    "summer": "2025-08-08",
+    "winter": "2024-12-24",
+}
+
+
+def _main(response) -> str:
+    """Page content without the sidebar, whose recent posts link every post here."""
+    return response.text.split('id="main-content"', 1)[1]
+
+
+@pytest.fixture
+def client(monkeypatch):
+    """Create a test client serving a temporary posts directory."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        posts_dir = Path(temp_dir)
+        for slug, date in POSTS.items():
+            (posts_dir / f"{slug}.md").write_text(f"---\ntitle: {slug.title()}\ndate: {date}\n---\n\nBody\n")
+
+        clear_content_cache()
+        monkeypatch.setattr("src.main_app.utils.content._get_posts_directory", lambda: posts_dir)
+        yield TestClient(app)
+        clear_content_cache()
+
+
+class TestArchiveRoutes:
+    """Test archive listings and their inclusion in the sitemap."""
+
+    def test_archive_lists_years_and_months(self, client):
+        """The archive index links every year and month with posts, newest first."""
+        response = client.get("/archive")
+
+        assert response.status_code == 200
+        assert "Browse 3 posts by date." in response.text
+        assert response.text.index("/archive/2025/08") < response.text.index("/archive/2025/01")
+        assert response.text.index("/archive/2025/01") < response.text.index("/archive/2024/12")
+        assert response.headers["Cache-Control"] == "public, max-age=300"
+
+    def test_year_groups_posts_by_month(self, client):
+        """A year page lists its posts under each month."""
+        response = client.get("/archive/2025")
+        main = _main(response)
+
+        assert response.status_code == 200
+        assert "Found 2 posts from 2025." in main
+        assert main.index("August") < main.index("/posts/summer") < main.index("January")
+        assert main.index("January") < main.index("/posts/new-year")
+        assert "/posts/winter" not in main
+
+    def test_month_lists_posts(self, client):
+        """A month page lists only that month's posts."""
+        response = client.get("/archive/2024/12")
+
+        assert response.status_code == 200
+        assert "Posts from December 2024" in response.text
+        assert "/posts/winter" in _main(response)
+        assert "/posts/summer" not in _main(response)
+
+    @pytest.mark.parametrize("path", ["/archive/2023", "/archive/2025/07", "/archive/2025/13", "/archive/abc"])
+    def test_empty_periods_return_404(self, client, path):
+        """Periods without posts are not found."""
+        assert client.get(path).status_code == 404
+
+    def test_sitemap_includes_archive(self, client):
+        """The sitemap lists the archive index, every year and every month."""
+        sitemap = client.get("/sitemap.xml").text
+
+        for path in ("/archive<", "/archive/2025<", "/archive/2025/01<", "/archive/2025/08<", "/archive/2024/12<"):
+            assert path in sitemap
@@ -0,0 +1,65 @@
+"""Tests for the synthetic corpus generator and benchmark suite."""
+
+import os
+
+from src.main_app.tools.bench import compare, percentile, run, summarize
+from src.main_app.tools.corpus import generate_corpus
+from src.main_app.utils.content import _parse_post_file
+
+
+class TestStatistics:
+    """Test latency summary helpers."""
+
+    def test_percentile_interpolates(self):
+        """Test percentile interpolation between ranks."""
+        values = [1.0, 2.0, 3.0, 4.0]
+        assert percentile(values, 0) == 1.0
+        assert percentile(values, 50) == 2.5
+        assert percentile(values, 100) == 4.0
+        assert percentile([], 50) == 0.0
+
+    def test_summarize_reports_milliseconds(self):
+        """Test that summaries are expressed in milliseconds."""
+        summary = summarize([0.001, 0.002, 0.003])
+        assert summary["count"] == 3
+        assert summary["p50_ms"] == 2.0
+        assert summary["max_ms"] == 3.0
+
+
+class TestCorpus:
+    """Test synthetic corpus generation."""
+
+    def test_generated_posts_parse(self, tmp_path):
+        """Test that generated posts have code, tables and tags."""
+        paths = generate_corpus(tmp_path, 3, tags=20)
+        assert len(paths) == 3
+
+        post = _parse_post_file(paths[0])
+        assert post is not None
+        assert len(post["tags"]) >= 3
+        assert 'class="highlight"' in post["content"]
+        assert "<table>" in post["content"]
+
+    def test_generation_is_reproducible(self, tmp_path):
+        """Test that the same seed produces the same corpus."""
+        first = generate_corpus(tmp_path / "a", 2, seed=7)
+        second = generate_corpus(tmp_path / "b", 2, seed=7)
+        assert [p.read_text() for p in first] == [p.read_text() for p in second]
+
+
+class TestBenchmarkRun:
+    """Test an end-to-end benchmark run on a tiny corpus."""
+
+    def test_run_produces_machine_readable_results(self):
+        """Test that results cover every measurement and route."""
+        results = run([3], requests=2, repeat=1, parse_sample=3)
+
+        assert "POSTS_DIR" not in os.environ
+        corpus = results["corpora"][0]
+        assert corpus["posts"] == 3
+        assert corpus["parse_post_file"]["files"] == 3
+        assert set(corpus["layout"]) == {"build", "render"}
+        assert set(corpus["routes"]) == {"/", "/posts/{slug}", "/tags/{tag}", "/feed.xml", "/sitemap.xml"}
+        assert all(route["status"] == {"200": 2} for route in corpus["routes"].values())
+
+        assert any(line.startswith("3.routes./.p50_ms") for line in compare(results, results))
@@ -0,0 +1,439 @@
+"""Tests for the two-tier cache shared between workers."""
+
+import asyncio
+import gzip
+import sys
+import threading
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils import content
+from src.main_app.utils.cache import (
+    MemoryBackend,
+    SQLiteBackend,
+    TieredCache,
+    backend_from_url,
+    get_backend,
+    set_backend,
+)
+from src.main_app.utils.content import RENDERED_POSTS, clear_content_cache, content_fingerprint, load_post
+from src.main_app.utils.fastpath import FastPathMiddleware, FastRoute
+from src.main_app.utils.pagecache import PageCacheMiddleware, decode_page, encode_page
+
+POST = """---
+title: "Cached"
+date: "2024-01-01"
+tags: ["python"]
+---
+
+Body {version}.
+"""
+
+
+@pytest.fixture
+def shared():
+    """Use an in-memory stand-in as the shared backend."""
+    backend = MemoryBackend()
+    set_backend(backend)
+    yield backend
+    set_backend(None)
+
+
+def _call(middleware, path, headers=(), query=b""):
+    """Run one GET request through a middleware and collect the sent messages."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": "GET", "path": path, "query_string": query, "headers": list(headers)}
+    asyncio.run(middleware(scope, None, send))
+    return messages
+
+
+def _page_app(renders, status=200, content_type=b"text/html; charset=utf-8", chunks=(b"<p>page</p>",), cookie=False):
+    """ASGI app rendering a page, counting renders."""
+
+    async def render(scope, receive, send):
+        renders.append(scope["path"])
+        headers = [(b"content-type", content_type)] + ([(b"set-cookie", b"a=b")] if cookie else [])
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        for i, chunk in enumerate(chunks):
+            await send({"type": "http.response.body", "body": chunk, "more_body": i < len(chunks) - 1})
+
+    return render
+
+
+class TestBackends:
+    """Test the shared backends and their selection."""
+
+    def test_memory_backend_expiry(self):
+        """Entries expire after ``ex`` seconds and can be deleted."""
+        now = [0.0]
+        backend = MemoryBackend(clock=lambda: now[0])
+        backend.set("a", b"1", ex=10)
+        backend.set("b", b"2")
+
+        assert backend.get("a") == b"1"
+        now[0] = 10.0
+        assert backend.get("a") is None
+        assert backend.delete("b") == 1
+        assert backend.get("b") is None
+
+    def test_sqlite_backend_shared_between_connections(self, tmp_path):
+        """Two backends on one file, like two workers, see each other's entries."""
+        first, second = SQLiteBackend(tmp_path / "cache.db"), SQLiteBackend(tmp_path / "cache.db")
+        first.set("a", b"\x00bytes")
+        first.set("gone", b"x", ex=0)
+
+        assert second.get("a") == b"\x00bytes"
+        assert second.get("gone") is None
+        assert second.delete("a") == 1
+        assert first.get("a") is None
+
+    def test_sqlite_prune_keeps_newest(self, tmp_path):
+        """Pruning removes expired entries and the oldest beyond the limit."""
+        backend = SQLiteBackend(tmp_path / "cache.db", max_entries=2, prune_every=1000)
+        backend.set("expired", b"x", ex=0)
+        for i in range(4):
+            backend.set(f"k{i}", b"x", ex=100 + i)
+
+        assert backend.prune() == 3
+        assert len(backend) == 2
+        assert backend.get("k3") == b"x" and backend.get("k0") is None
+
+    def test_backend_from_url(self, tmp_path, monkeypatch):
+        """Cache URLs select the backend; Redis needs the optional package."""
+        assert isinstance(backend_from_url("memory://"), MemoryBackend)
+        assert isinstance(backend_from_url(f"sqlite://{tmp_path / 'cache.db'}"), SQLiteBackend)
+        with pytest.raises(ValueError):
+            backend_from_url("ftp://cache")
+
+        monkeypatch.setitem(sys.modules, "redis", None)
+        with pytest.raises(ValueError, match="redis package"):
+            backend_from_url("redis://localhost:6379/0")
+
+
+class TestTieredCache:
+    """Test lookups through both tiers."""
+
+    def test_in_process_tier_without_backend(self):
+        """Without a shared backend values are still kept in process."""
+        cache = TieredCache("test", backend=lambda: None)
+        builds = []
+
+        cache.get_or_build("k", lambda: builds.append(1) or b"v")
+        cache.get_or_build("k", lambda: builds.append(1) or b"v")
+        assert cache.enabled()
+        assert len(builds) == 1 and len(cache) == 1
+
+    def test_disabled_without_either_tier(self):
+        """A cache without an in-process tier is off until a shared backend is configured."""
+        assert not TieredCache("test", max_entries=0, backend=lambda: None).enabled()
+        assert TieredCache("test", max_entries=0, backend=MemoryBackend).enabled()
+
+    def test_second_worker_reads_shared_tier(self):
+        """A value built by one worker is read from the shared tier by another, then kept in process."""
+        backend = MemoryBackend()
+        worker_a = TieredCache("test", backend=lambda: backend)
+        worker_b = TieredCache("test", backend=lambda: backend)
+
+        assert worker_a.get_or_build("k", lambda: b"v") == b"v"
+        assert worker_b.get_or_build("k", lambda: pytest.fail("rebuilt")) == b"v"
+        backend.delete("k")
+        assert worker_b.get("k") == b"v"
+
+    def test_l1_is_bounded(self):
+        """The in-process tier evicts the least recently used entries."""
+        backend = MemoryBackend()
+        cache = TieredCache("test", max_entries=2, backend=lambda: backend)
+        for key in ("a", "b", "c"):
+            cache.set(key, key.encode())
+
+        assert len(cache) == 2
+        assert len(backend) == 3
+
+    def test_backend_errors_are_misses(self):
+        """An unavailable backend falls back to building."""
+
+        class Broken:
+            def get(self, key):
+                raise ConnectionError("down")
+
+            def set(self, key, value, ex=None):
+                raise ConnectionError("down")
+
+            def delete(self, key):
+                raise ConnectionError("down")
+
+        cache = TieredCache("test", max_entries=0, backend=Broken)
+        assert cache.get_or_build("k", lambda: b"v") == b"v"
+
+
+class TestPageCache:
+    """Test rendered pages shared between workers."""
+
+    def _middleware(self, renders, backend, **page):
+        cache = TieredCache("pages", backend=lambda: backend)
+        return PageCacheMiddleware(_page_app(renders, **page), cache, vary=("HX-Request",), fingerprint=lambda: "c1")
+
+    def test_page_rendered_once_across_workers(self):
+        """A page rendered by one worker is served by another without rendering."""
+        backend, renders = MemoryBackend(), []
+        worker_a, worker_b = self._middleware(renders, backend), self._middleware(renders, backend)
+
+        first = _call(worker_a, "/posts/a")
+        second = _call(worker_b, "/posts/a")
+        assert renders == ["/posts/a"]
+        assert second[0]["status"] == 200
+        assert second[1]["body"] == first[1]["body"] == b"<p>page</p>"
+        assert (b"content-type", b"text/html; charset=utf-8") in second[0]["headers"]
+
+    def test_concurrent_misses_render_once(self):
+        """Requests arriving while a page renders wait for it instead of rendering again."""
+        backend, renders = MemoryBackend(), []
+        page = _page_app(renders)
+
+        async def slow(scope, receive, send):
+            await asyncio.sleep(0.01)
+            await page(scope, receive, send)
+
+        cache = TieredCache("pages", backend=lambda: backend)
+        middleware = PageCacheMiddleware(slow, cache, fingerprint=lambda: "c1")
+        scope = {"type": "http", "method": "GET", "path": "/", "query_string": b"", "headers": []}
+        bodies = []
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                bodies.append(message["body"])
+
+        async def requests():
+            await asyncio.gather(*(middleware(dict(scope), None, send) for _ in range(3)))
+
+        asyncio.run(requests())
+        assert renders == ["/"]
+        assert bodies == [b"<p>page</p>"] * 3
+
+    @pytest.mark.parametrize("page", [{"status": 404}, {"chunks": (b"<p>", b"streamed</p>")}])
+    def test_stalled_client_does_not_block_uncacheable_pages(self, page):
+        """Requests waiting on an uncacheable render go ahead once it cannot be stored, even if its client stalls."""
+        backend, renders = MemoryBackend(), []
+        middleware = self._middleware(renders, backend, **page)
+        scope = {"type": "http", "method": "GET", "path": "/x", "query_string": b"", "headers": []}
+        stalled, messages = asyncio.Event(), []
+
+        async def stalled_send(message):
+            if message["type"] == "http.response.body":
+                await stalled.wait()
+
+        async def send(message):
+            messages.append(message)
+
+        async def requests():
+            first = asyncio.create_task(middleware(dict(scope), None, stalled_send))
+            await asyncio.sleep(0)
+            await asyncio.wait_for(middleware(dict(scope), None, send), timeout=1)
+            first.cancel()
+
+        asyncio.run(requests())
+        assert renders == ["/x", "/x"]
+        assert messages[0]["status"] == page.get("status", 200)
+        assert not middleware._rendering
+
+    def test_backend_accessed_off_event_loop(self):
+        """Shared backend reads and writes run in worker threads, not on the event loop."""
+
+        class Recording(MemoryBackend):
+            def __init__(self):
+                super().__init__()
+                self.threads = []
+
+            def get(self, key):
+                self.threads.append(threading.get_ident())
+                return super().get(key)
+
+            def set(self, key, value, ex=None):
+                self.threads.append(threading.get_ident())
+                return super().set(key, value, ex)
+
+        backend, renders = Recording(), []
+        middleware = self._middleware(renders, backend)
+        loop_thread = threading.get_ident()
+
+        _call(middleware, "/a")
+        assert len(backend.threads) == 2 and loop_thread not in backend.threads
+
+    def test_fingerprint_computed_once_per_generation_off_event_loop(self):
+        """The content fingerprint is hashed in a worker thread and reused until the generation changes."""
+        renders, threads, generation = [], [], [1]
+
+        def fingerprint():
+            threads.append(threading.get_ident())
+            return f"c{generation[0]}"
+
+        cache = TieredCache("pages", backend=lambda: None)
+        middleware = PageCacheMiddleware(
+            _page_app(renders), cache, fingerprint=fingerprint, generation=lambda: generation[0]
+        )
+
+        for _ in range(3):
+            _call(middleware, "/")
+        assert len(threads) == 1 and threading.get_ident() not in threads and renders == ["/"]
+
+        generation[0] = 2
+        _call(middleware, "/")
+        assert len(threads) == 2 and renders == ["/", "/"]
+
+    def test_vary_headers_select_pages(self):
+        """Partial and full pages are cached apart."""
+        backend, renders = MemoryBackend(), []
+        middleware = self._middleware(renders, backend)
+
+        _call(middleware, "/")
+        _call(middleware, "/", headers=[(b"hx-request", b"true")])
+        _call(middleware, "/")
+        assert renders == ["/", "/"]
+
+    def test_query_parameters_select_pages(self):
+        """Pagination parameters key pages in any order; other parameters bypass the cache."""
+        backend, renders = MemoryBackend(), []
+        middleware = self._middleware(renders, backend)
+
+        _call(middleware, "/", query=b"page=2&before=a")
+        _call(middleware, "/", query=b"before=a&page=2")
+        _call(middleware, "/", query=b"page=3")
+        assert len(renders) == 2
+
+        for query in (b"page=2&utm_source=x", b"page=2&page=3", b"junk"):
+            _call(middleware, "/", query=query)
+        assert len(renders) == 5 and len(backend) == 2
+
+    @pytest.mark.parametrize(
+        "page",
+        [
+            {"status": 404},
+            {"content_type": b"application/json"},
+            {"chunks": (b"<p>", b"streamed</p>")},
+            {"cookie": True},
+        ],
+    )
+    def test_uncacheable_responses(self, page):
+        """Errors, non-HTML, streamed responses and responses setting cookies are rendered every time."""
+        backend, renders = MemoryBackend(), []
+        middleware = self._middleware(renders, backend, **page)
+
+        _call(middleware, "/x")
+        _call(middleware, "/x")
+        assert len(renders) == 2 and len(backend) == 0
+
+    def test_entry_round_trip(self):
+        """Cached entries keep status, headers, body and route template."""
+        headers = [(b"content-type", b"text/html"), (b"x-a", b"\xe9")]
+        assert decode_page(encode_page(200, headers, b"a\nb", "/posts/{slug}")) == (
+            200,
+            headers,
+            b"a\nb",
+            "/posts/{slug}",
+        )
+
+    def test_app_pages_and_posts_filled_in_shared_tier(self, shared):
+        """Pages served by the app, and the posts they render, are stored in the shared backend."""
+        clear_content_cache()
+        client = TestClient(app)
+        path = f"/posts/{content.load_all_posts()[0].slug}"
+        first = client.get(path)
+        second = client.get(path)
+
+        assert first.status_code == second.status_code == 200
+        assert first.text == second.text
+        assert {key.split(":")[0] for key in shared._entries} >= {"page", "post"}
+
+
+class TestFastPathSharing:
+    """Test fast-path bodies and variants shared between workers."""
+
+    def test_bodies_and_variants_built_once(self, shared):
+        """A second worker reuses the body and gzip variant built by the first."""
+        builds = []
+        routes = {"/feed": FastRoute(lambda: builds.append(1) or "x" * 2000, "application/xml", "no-store")}
+        worker_a = FastPathMiddleware(None, routes, fingerprint=lambda: "c1")
+        worker_b = FastPathMiddleware(None, routes, fingerprint=lambda: "c1")
+
+        _call(worker_a, "/feed", headers=[(b"accept-encoding", b"gzip")])
+        stored = len(shared)
+        response = _call(worker_b, "/feed", headers=[(b"accept-encoding", b"gzip")])
+
+        assert builds == [1]
+        assert stored == 2 and len(shared) == 2
+        assert gzip.decompress(response[1]["body"]) == b"x" * 2000
+
+    def test_concurrent_builds_run_once_off_event_loop(self, shared):
+        """Concurrent requests for a body not built yet build it once, in a worker thread."""
+        threads = []
+
+        def build():
+            threads.append(threading.get_ident())
+            return "x" * 2000
+
+        middleware = FastPathMiddleware(None, {"/feed": FastRoute(build, "application/xml", "no-store")})
+        scope = {"type": "http", "method": "GET", "path": "/feed", "query_string": b"", "headers": []}
+        bodies = []
+
+        async def send(message):
+            if message["type"] == "http.response.body":
+                bodies.append(message["body"])
+
+        async def requests():
+            await asyncio.gather(*(middleware(dict(scope), None, send) for _ in range(3)))
+
+        asyncio.run(requests())
+        assert bodies == [b"x" * 2000] * 3
+        assert len(threads) == 1 and threads[0] != threading.get_ident()
+
+    def test_new_content_gets_new_entries(self, shared):
+        """Bodies are keyed by the content fingerprint."""
+        fingerprint = ["c1"]
+        routes = {"/feed": FastRoute(lambda: f"v-{fingerprint[0]}", "application/xml", "no-store")}
+
+        first = _call(FastPathMiddleware(None, routes, fingerprint=lambda: fingerprint[0]), "/feed")
+        fingerprint[0] = "c2"
+        second = _call(FastPathMiddleware(None, routes, fingerprint=lambda: fingerprint[0]), "/feed")
+
+        assert (first[1]["body"], second[1]["body"]) == (b"v-c1", b"v-c2")
+
+
+class TestSharedPosts:
+    """Test rendered markdown posts in the shared tier."""
+
+    def test_fingerprint_and_rendered_posts(self, tmp_path, monkeypatch, shared):
+        """Editing a post changes the fingerprint and the post is rendered again."""
+        post = tmp_path / "cached.md"
+        post.write_text(POST.format(version=1), encoding="utf-8")
+        monkeypatch.setenv("POSTS_DIR", str(tmp_path))
+        clear_content_cache()
+        try:
+            before = content_fingerprint()
+            assert "Body 1." in load_post("cached").content
+            assert sum(key.startswith("post:") for key in shared._entries) == 1
+
+            clear_content_cache()
+            assert content_fingerprint() == before
+            parse = content._parse_post_file
+            monkeypatch.setattr(content, "_parse_post_file", lambda path: pytest.fail("rendered"))
+            assert "Body 1." in load_post("cached").content
+
+            monkeypatch.setattr(content, "_parse_post_file", parse)
+            post.write_text(POST.format(version=22), encoding="utf-8")
+            clear_content_cache()
+            assert content_fingerprint() != before
+            assert "Body 22." in load_post("cached").content
+        finally:
+            monkeypatch.delenv("POSTS_DIR", raising=False)
+            clear_content_cache()
+
+    def test_shared_tier_off_by_default(self):
+        """Without CACHE_URL no backend is configured."""
+        assert get_backend() is None
+        assert not RENDERED_POSTS.enabled()
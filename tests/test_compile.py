@@ -0,0 +1,116 @@
+"""Tests for the batch content compiler."""
+
+import json
+
+import pytest
+
+from src.main_app.tools.compile import compile_directory, main
+from src.main_app.utils.content import (
+    PYGMENTS_CSS_FILE,
+    clear_content_cache,
+    get_pygments_css,
+    load_all_posts,
+    load_post,
+)
+
+POST = """---
+title: "{title}"
+date: "2024-01-0{day}"
+tags: ["python"]
+---
+
+# {title}
+
+Body text.
+"""
+
+
+@pytest.fixture
+def posts_dir(tmp_path):
+    """Create a directory with two valid posts."""
+    directory = tmp_path / "posts"
+    directory.mkdir()
+    (directory / "first.md").write_text(POST.format(title="First", day=1), encoding="utf-8")
+    (directory / "second.md").write_text(POST.format(title="Second", day=2), encoding="utf-8")
+    return directory
+
+
+class TestCompileDirectory:
+    """Test incremental compilation and the diff report."""
+
+    def test_incremental_runs(self, posts_dir, tmp_path):
+        """Test that only changed posts are recompiled and the diff is reported."""
+        output = tmp_path / "compiled"
+        first = compile_directory(posts_dir, output)
+        assert first.added == ["first", "second"]
+
+        manifest = json.loads((output / "manifest.json").read_text())
+        assert set(manifest["posts"]["first"]) == {"source", "sha256", "size", "html_size", "compile_ms", "meta"}
+        assert manifest["posts"]["first"]["meta"]["title"] == "First"
+
+        (posts_dir / "first.md").write_text(POST.format(title="First, revised", day=1), encoding="utf-8")
+        (posts_dir / "second.md").unlink()
+        (posts_dir / "third.md").write_text(POST.format(title="Third", day=3), encoding="utf-8")
+        second = compile_directory(posts_dir, output)
+
+        assert (second.added, second.changed, second.removed) == (["third"], ["first"], ["second"])
+        assert not (output / "posts" / "second.json").exists()
+        assert compile_directory(posts_dir, output).unchanged == ["first", "third"]
+        assert second.lines()[-1] == "1 added, 1 changed, 1 removed, 0 unchanged, 0 failed"
+
+    def test_nested_roots(self, posts_dir, tmp_path):
+        """Test that posts below subdirectories of several roots are compiled with their relative source."""
+        extra = tmp_path / "extra"
+        (extra / "2025").mkdir(parents=True)
+        (extra / "2025" / "third.md").write_text(POST.format(title="Third", day=3), encoding="utf-8")
+        output = tmp_path / "compiled"
+
+        assert compile_directory([posts_dir, extra], output).added == ["first", "second", "third"]
+        manifest = json.loads((output / "manifest.json").read_text())
+        assert manifest["posts"]["third"]["source"] == "2025/third.md"
+
+    def test_broken_posts_fail(self, posts_dir, tmp_path, capsys):
+        """Test that invalid dates, missing titles and bad YAML fail the run."""
+        (posts_dir / "bad-date.md").write_text('---\ntitle: "X"\ndate: "soon"\n---\nBody', encoding="utf-8")
+        (posts_dir / "no-title.md").write_text('---\ndate: "2024-01-01"\n---\nBody', encoding="utf-8")
+        (posts_dir / "bad-yaml.md").write_text("---\ntitle: [unclosed\n---\nBody", encoding="utf-8")
+
+        assert main(["--posts", str(posts_dir), "--output", str(tmp_path / "compiled")]) == 1
+        output = capsys.readouterr().out
+        assert "! bad-date: Invalid date: 'soon'" in output
+        assert "! no-title: Missing title" in output
+        assert "! bad-yaml: Invalid frontmatter" in output
+
+    def test_check_does_not_write(self, posts_dir, tmp_path):
+        """Test that check mode validates without producing artifacts."""
+        output = tmp_path / "compiled"
+
+        assert main(["--posts", str(posts_dir), "--output", str(output), "--check"]) == 0
+        assert not output.exists()
+
+
+class TestCompiledContent:
+    """Test serving posts from compiled artifacts."""
+
+    def test_compiled_posts_match_markdown(self, posts_dir, tmp_path, monkeypatch):
+        """Test that COMPILED_DIR serves the same posts as parsing markdown."""
+        output = tmp_path / "compiled"
+        compile_directory(posts_dir, output)
+        monkeypatch.setenv("POSTS_DIR", str(posts_dir))
+
+        clear_content_cache()
+        parsed = load_all_posts()
+        rendered = load_post("first")
+        css = get_pygments_css()
+        assert (output / PYGMENTS_CSS_FILE).read_text(encoding="utf-8") == css
+        (output / PYGMENTS_CSS_FILE).write_text(css + "/* compiled */", encoding="utf-8")
+        monkeypatch.setenv("COMPILED_DIR", str(output))
+        clear_content_cache()
+        try:
+            assert load_all_posts() == parsed
+            assert load_post("first") == rendered
+            assert load_post("missing") is None
+            assert get_pygments_css() == css + "/* compiled */"
+        finally:
+            monkeypatch.delenv("COMPILED_DIR")
+            clear_content_cache()
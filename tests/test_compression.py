@@ -0,0 +1,127 @@
+"""Tests for response compression and the compressed-body cache."""
+
+import asyncio
+import gzip
+import threading
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils import compression
+from src.main_app.utils.compression import (
+    COMPRESSION_CACHE,
+    CompressedBodyCache,
+    compression_level,
+    negotiate,
+)
+from src.main_app.utils.content import clear_content_cache
+
+
+class TestNegotiation:
+    """Test Accept-Encoding negotiation and level selection."""
+
+    def test_preference_and_quality_values(self):
+        """Test server preference, q-values, wildcards and refusals."""
+        available = ("br", "zstd", "gzip")
+
+        assert negotiate("gzip, br", available) == "br"
+        assert negotiate("gzip, br;q=0.5", available) == "gzip"
+        assert negotiate("zstd, gzip;q=0.9", available) == "zstd"
+        assert negotiate("*", available) == "br"
+        assert negotiate("*, br;q=0", available) == "zstd"
+        assert negotiate("identity", available) is None
+        assert negotiate("", available) is None
+        assert negotiate("br, gzip", ("gzip",)) == "gzip"
+
+    def test_levels_per_content_type(self):
+        """Test content type overrides and defaults."""
+        levels = {"text/html": {"gzip": 9}}
+
+        assert compression_level("gzip", "text/html; charset=utf-8", levels) == 9
+        assert compression_level("gzip", "application/json", levels) == 6
+
+
+class TestCompressedBodyCache:
+    """Test that bodies are compressed once per ETag and generation."""
+
+    def test_compresses_once_per_generation(self):
+        """Test cache hits and invalidation when the generation changes."""
+        generation = [0]
+        cache = CompressedBodyCache(max_entries=2, generation=lambda: generation[0])
+        body = b"hello " * 500
+
+        first = cache.get_or_compress('"a"', "gzip", 6, body)
+        assert cache.get_or_compress('"a"', "gzip", 6, b"ignored") is first
+        assert gzip.decompress(first) == body
+
+        generation[0] += 1
+        assert gzip.decompress(cache.get_or_compress('"a"', "gzip", 6, b"new")) == b"new"
+
+    def test_bounded(self):
+        """Test that the least recently used body is evicted."""
+        cache = CompressedBodyCache(max_entries=2, generation=lambda: 0)
+        for etag in ('"a"', '"b"', '"c"'):
+            cache.get_or_compress(etag, "gzip", 6, b"x")
+
+        assert len(cache) == 2
+
+    def test_async_misses_built_off_event_loop(self, monkeypatch):
+        """Test that misses are compressed and minified in a worker thread, and hits are not rebuilt."""
+        threads = []
+        compress, minify = compression.compress, compression.minify_and_record
+        monkeypatch.setattr(
+            compression, "compress", lambda *args: threads.append(threading.get_ident()) or compress(*args)
+        )
+        monkeypatch.setattr(
+            compression, "minify_and_record", lambda *args: threads.append(threading.get_ident()) or minify(*args)
+        )
+        cache = CompressedBodyCache(generation=lambda: 0)
+
+        async def lookups():
+            for _ in range(2):
+                assert gzip.decompress(await cache.aget_or_compress('"a"', "gzip", 6, b"body")) == b"body"
+                assert await cache.aget_or_minify('"a"', b"<p>  page  </p>", "/") == b"<p>page</p>"
+            return threading.get_ident()
+
+        loop_thread = asyncio.run(lookups())
+        assert len(threads) == 2 and loop_thread not in threads
+
+
+class TestCompressionMiddleware:
+    """Test compression through the application."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_pages_get_etags_and_are_compressed_once(self):
+        """Test that repeated requests for a page reuse the compressed body."""
+        clear_content_cache()
+        misses = COMPRESSION_CACHE.value("miss")
+        first = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+        hits = COMPRESSION_CACHE.value("hit")
+        second = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert first.headers["content-encoding"] == "gzip"
+        assert first.headers["etag"].endswith('-gzip"')
+        assert first.headers["etag"] == second.headers["etag"]
+        assert "Accept-Encoding" in first.headers["vary"]
+        assert first.text == second.text
+        assert COMPRESSION_CACHE.value("miss") == misses + 1
+        assert COMPRESSION_CACHE.value("hit") == hits + 1
+
+    def test_identity_keeps_plain_etag(self):
+        """Test that uncompressed responses carry the body ETag."""
+        response = self.client.get("/", headers={"Accept-Encoding": "identity"})
+
+        assert "content-encoding" not in response.headers
+        assert not response.headers["etag"].endswith('-gzip"')
+
+    def test_brotli_when_installed(self):
+        """Test brotli responses when the optional dependency is available."""
+        pytest.importorskip("brotli")
+        response = self.client.get("/", headers={"Accept-Encoding": "br"})
+
+        assert response.headers["content-encoding"] == "br"
+        assert "<html" in response.text
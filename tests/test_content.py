@@ -6,15 +6,23 @@ from pathlib import Path
 
 import pytest
 
+from src.main_app.tools.corpus import generate_corpus
 from src.main_app.utils.content import (
+    COMPILE_SECONDS,
     _parse_post_file,
     clear_content_cache,
+    discover_posts,
     get_all_tags,
+    get_archive_months,
+    get_page_index,
     load_all_posts,
     load_post,
+    load_posts_by_date,
     load_posts_by_tag,
     load_recent_posts,
 )
+from src.main_app.utils.feeds import build_rss_feed
+from src.main_app.utils.schema import Post, PostMeta
 
 
 @pytest.fixture
@@ -116,9 +124,31 @@ This is a test post with **bold** text.
         assert isinstance(result["date"], datetime)
         assert result["tags"] == ["test", "example"]
         assert result["excerpt"] == "A test post"
-        assert "<h1>Test Post</h1>" in result["content"]
+        assert '<h1 id="test-post">Test Post</h1>' in result["content"]
         assert "<strong>bold</strong>" in result["content"]
 
+    def test_table_of_contents(self, temp_posts_dir):
+        """Test that section headings get anchors and a table of contents."""
+        post_path = temp_posts_dir / "sections.md"
+        post_path.write_text(
+            "---\ntitle: Sections\n---\n# Sections\n\n## First part\n\nText\n\n### Detail\n\n## Second part\n",
+            encoding="utf-8",
+        )
+
+        result = _parse_post_file(post_path)
+
+        assert '<h2 id="first-part">First part</h2>' in result.content
+        assert 'href="#first-part"' in result.toc
+        assert 'href="#detail"' in result.toc
+        assert 'href="#sections"' not in result.toc
+
+    def test_table_of_contents_needs_two_headings(self, temp_posts_dir):
+        """Test that posts with a single section get no table of contents."""
+        post_path = temp_posts_dir / "short.md"
+        post_path.write_text("---\ntitle: Short\n---\n## Only part\n\nText\n", encoding="utf-8")
+
+        assert _parse_post_file(post_path).toc == ""
+
     def test_parse_post_file_invalid(self, temp_posts_dir):
         """Test parsing an invalid post file."""
         post_path = temp_posts_dir / "invalid.md"
@@ -195,6 +225,16 @@ class TestPostLoading:
         nonexistent_posts = load_posts_by_tag("nonexistent")
         assert len(nonexistent_posts) == 0
 
+    def test_get_page_index(self, sample_posts):
+        """Test page indexes for the home and tag listings."""
+        assert get_page_index().total_posts == 3
+        assert get_page_index("Python").total_posts == 2
+        assert get_page_index("python") is get_page_index("python")
+
+        unknown = get_page_index("nonexistent")
+        assert unknown.total_posts == 0
+        assert unknown.page(1).posts == []
+
     def test_get_all_tags(self, sample_posts):
         """Test getting all unique tags."""
         tags = get_all_tags()
@@ -202,6 +242,18 @@ class TestPostLoading:
         expected_tags = ["python", "testing", "web-development"]
         assert sorted(tags) == sorted(expected_tags)
 
+    def test_load_posts_by_date(self, sample_posts, temp_posts_dir):
+        """Test year and month listings from the date index."""
+        (temp_posts_dir / "older-post.md").write_text("---\ntitle: Older Post\ndate: 2024-12-31\n---\nBody\n")
+        (temp_posts_dir / "undated-post.md").write_text("---\ntitle: Undated Post\n---\nBody\n")
+
+        assert [post.title for post in load_posts_by_date(2025)] == ["First Post", "Second Post", "Third Post"]
+        assert load_posts_by_date(2025, 8) == load_posts_by_date(2025)
+        assert [post.slug for post in load_posts_by_date(2024, 12)] == ["older-post"]
+        assert load_posts_by_date(2025, 7) == []
+        assert load_posts_by_date(1970) == []
+        assert get_archive_months() == [(2025, 8, 3), (2024, 12, 1)]
+
 
 class TestEmptyPostsDirectory:
     """Test behavior with empty posts directory."""
@@ -220,3 +272,99 @@ class TestEmptyPostsDirectory:
         """Test getting tags from empty directory."""
         tags = get_all_tags()
         assert tags == []
+
+
+class TestHeaderScan:
+    """Test metadata-only index builds."""
+
+    def test_listings_do_not_render_bodies(self, sample_posts):
+        """Test that listings carry metadata only and bodies render on demand."""
+        posts = load_all_posts()
+
+        assert all(isinstance(post, PostMeta) and not isinstance(post, Post) for post in posts)
+        before = COMPILE_SECONDS.count()
+        get_all_tags()
+        get_page_index("python")
+        assert COMPILE_SECONDS.count() == before
+
+        post = load_post(posts[0].slug)
+        assert isinstance(post, Post)
+        assert COMPILE_SECONDS.count() == before + 1
+        assert post.title == posts[0].title and post.tags == posts[0].tags
+
+    def test_listing_word_counts_match_compiled_posts(self, sample_posts):
+        """Test that the header scan counts the same words as the compiler."""
+        for meta in load_all_posts():
+            post = load_post(meta.slug)
+            assert meta.word_count == post.word_count > 0
+            assert meta.reading_minutes == 1
+
+    def test_parallel_scan_matches_serial(self, sample_posts, monkeypatch):
+        """Test that the threaded scan produces the same index."""
+        serial = load_all_posts()
+
+        monkeypatch.setattr("src.main_app.utils.content.SCAN_WORKERS", 4)
+        monkeypatch.setattr("src.main_app.utils.content.PARALLEL_SCAN_THRESHOLD", 1)
+        clear_content_cache()
+        assert load_all_posts() == serial
+
+    def test_feed_renders_bodies_without_excerpts(self, temp_posts_dir):
+        """Test that the feed falls back to the rendered body, as plain text, when a post has no excerpt."""
+        (temp_posts_dir / "bare.md").write_text(
+            '---\ntitle: "Bare"\ndate: "2024-01-01"\n---\nOnly a **body**.', encoding="utf-8"
+        )
+
+        assert "<description>Only a body.</description>" in build_rss_feed(load_all_posts())
+
+
+def _write_post(path: Path, title: str, date: str = "2025-01-01"):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(f"---\ntitle: {title}\ndate: {date}\n---\n\n{title} body.\n", encoding="utf-8")
+
+
+class TestContentLayout:
+    """Test nested, sharded and multiple content roots."""
+
+    def test_nested_posts_are_found(self, temp_posts_dir):
+        """Posts below subdirectories are listed and served by file name; hidden directories are skipped."""
+        _write_post(temp_posts_dir / "2025" / "08" / "deep.md", "Deep", "2025-08-01")
+        _write_post(temp_posts_dir / "flat.md", "Flat")
+        _write_post(temp_posts_dir / ".trash" / "gone.md", "Gone")
+
+        assert [post.slug for post in load_all_posts()] == ["deep", "flat"]
+        assert load_post("deep").title == "Deep"
+        assert load_post("gone") is None
+
+    def test_multiple_roots_earlier_wins(self, tmp_path, monkeypatch):
+        """Roots listed in POSTS_DIR are merged, and a duplicate slug resolves to the earlier root."""
+        _write_post(tmp_path / "a" / "shared.md", "From A")
+        _write_post(tmp_path / "b" / "2024" / "shared.md", "From B")
+        _write_post(tmp_path / "b" / "only-b.md", "Only B")
+        monkeypatch.setenv("POSTS_DIR", f"{tmp_path / 'a'}:{tmp_path / 'b'}")
+        clear_content_cache()
+        try:
+            assert sorted(post.slug for post in load_all_posts()) == ["only-b", "shared"]
+            assert load_post("shared").title == "From A"
+            assert load_post("only-b").title == "Only B"
+        finally:
+            clear_content_cache()
+
+    def test_lookups_do_not_walk_the_tree(self, temp_posts_dir, monkeypatch):
+        """After the index is built, loading posts lists no directories."""
+        _write_post(temp_posts_dir / "2025" / "01" / "one.md", "One")
+        load_all_posts()
+
+        monkeypatch.setattr("src.main_app.utils.content._scan_directory", lambda path: pytest.fail(f"walked {path}"))
+        assert load_post("one").title == "One"
+        assert load_post("missing") is None
+
+    def test_parallel_walk_matches_layouts(self, tmp_path, monkeypatch):
+        """A sharded corpus indexes the same slugs as a flat one, walked by several threads."""
+        monkeypatch.setattr("src.main_app.utils.content.SCAN_WORKERS", 4)
+        flat = generate_corpus(tmp_path / "flat", 30)
+        sharded = generate_corpus(tmp_path / "sharded", 30, sharded=True)
+
+        index = discover_posts([tmp_path / "sharded"])
+        assert list(index) == sorted(path.stem for path in flat)
+        assert set(index.values()) == set(sharded)
+        assert any(len(path.relative_to(tmp_path / "sharded").parts) == 3 for path in sharded)
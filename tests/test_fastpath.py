@@ -0,0 +1,134 @@
+"""Tests for the fast path serving hot read-only endpoints."""
+
+import asyncio
+import gzip
+
+from starlette.testclient import TestClient
+
+from src.main_app.app import SECURITY_HEADERS, app
+from src.main_app.utils.compression import AVAILABLE_ENCODINGS
+from src.main_app.utils.content import clear_content_cache, content_generation
+from src.main_app.utils.fastpath import FastPathMiddleware, FastRoute
+from src.main_app.utils.metrics import HTTP_REQUESTS
+
+
+async def _fallback(scope, receive, send):
+    await send({"type": "http.response.start", "status": 204, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _call(middleware, path, method="GET", headers=()):
+    """Run one request through a middleware and collect the sent messages."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {"type": "http", "method": method, "path": path, "headers": list(headers)}
+    asyncio.run(middleware(scope, None, send))
+    return messages
+
+
+class TestFastPathMiddleware:
+    """Test prebuilt responses and pass-through."""
+
+    def test_other_requests_pass_through(self):
+        """Test that unknown paths and other methods reach the wrapped app."""
+        middleware = FastPathMiddleware(_fallback, {"/x": FastRoute(lambda: "x", "text/plain", "no-store")})
+
+        assert _call(middleware, "/y")[0]["status"] == 204
+        assert _call(middleware, "/x", method="POST")[0]["status"] == 204
+        assert _call(middleware, "/x")[0]["status"] == 200
+
+    def test_rebuilt_once_per_generation(self):
+        """Test that bodies are built once and rebuilt when the generation changes."""
+        builds = []
+        generation = [0]
+        middleware = FastPathMiddleware(
+            _fallback,
+            {"/x": FastRoute(lambda: builds.append(1) or f"v{generation[0]}", "text/plain", "no-store")},
+            generation=lambda: generation[0],
+        )
+
+        assert _call(middleware, "/x")[1]["body"] == b"v0"
+        assert _call(middleware, "/x")[1]["body"] == b"v0"
+        generation[0] += 1
+        assert _call(middleware, "/x")[1]["body"] == b"v1"
+        assert len(builds) == 2
+
+    def test_gzip_variant_and_head(self):
+        """Test the gzip variant is negotiated and HEAD sends no body."""
+        body = "x" * 5000
+        middleware = FastPathMiddleware(_fallback, {"/x": FastRoute(lambda: body, "text/plain", "no-store")})
+
+        start, message = _call(middleware, "/x", headers=[(b"accept-encoding", b"gzip, br")])
+        assert (b"content-encoding", b"gzip") in start["headers"]
+        assert gzip.decompress(message["body"]).decode() == body
+
+        start, message = _call(middleware, "/x", method="HEAD")
+        assert (b"content-length", b"5000") in start["headers"]
+        assert message["body"] == b""
+
+    def test_resolved_routes_follow_generation(self):
+        """Test that resolved paths are resolved once and forgotten when the generation changes."""
+        generation = [0]
+        resolved = []
+
+        def resolve(path):
+            resolved.append(path)
+            return (
+                FastRoute(lambda: path, "text/plain", "no-store", route_path="/items/{id}")
+                if generation[0] == 0
+                else None
+            )
+
+        middleware = FastPathMiddleware(_fallback, {}, generation=lambda: generation[0], resolve=resolve)
+
+        assert _call(middleware, "/items/1")[1]["body"] == b"/items/1"
+        assert _call(middleware, "/items/1")[1]["body"] == b"/items/1"
+        assert resolved == ["/items/1"]
+        generation[0] += 1
+        assert _call(middleware, "/items/1")[0]["status"] == 204
+        assert middleware._prebuilt == {}
+
+    def test_precompressed_variants(self):
+        """Test that precompressed routes build every encoding up front."""
+        middleware = FastPathMiddleware(
+            _fallback, {"/x": FastRoute(lambda: "x" * 5000, "text/plain", "no-store", precompress=True)}
+        )
+
+        assert set(middleware.prebuilt("/x").variants) == {None, *AVAILABLE_ENCODINGS}
+
+
+class TestFastPathRoutes:
+    """Test the fast-path endpoints of the application."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_headers_match_regular_responses(self):
+        """Test that fast-path responses carry security and cache headers."""
+        for path, cache_control in (("/health", "no-store"), ("/feed.xml", "public, max-age=300")):
+            response = self.client.get(path)
+            assert response.status_code == 200
+            assert response.headers["Cache-Control"] == cache_control
+            for name, value in SECURITY_HEADERS.items():
+                assert response.headers[name] == value
+
+    def test_feed_follows_content_generation(self):
+        """Test that the feed is stable within a generation and rebuilt after a change."""
+        first = self.client.get("/feed.xml").content
+        assert self.client.get("/feed.xml").content == first
+
+        generation = content_generation()
+        clear_content_cache()
+        assert content_generation() == generation + 1
+        assert "<rss" in self.client.get("/feed.xml").text
+
+    def test_counted_by_path(self):
+        """Test that fast-path requests are still counted in metrics."""
+        before = HTTP_REQUESTS.value("GET", "/sitemap.xml", "200")
+        self.client.get("/sitemap.xml")
+
+        assert HTTP_REQUESTS.value("GET", "/sitemap.xml", "200") == before + 1
@@ -0,0 +1,135 @@
+"""Tests for the feed model and the RSS, Atom and JSON feeds."""
+
+import json
+import tempfile
+import xml.etree.ElementTree as ET
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app, resolve_tag_feed
+from src.main_app.utils.content import clear_content_cache
+from src.main_app.utils.feeds import get_feed, plain_text, summarize
+from src.main_app.utils.metrics import HTTP_REQUESTS
+
+ATOM = "{http://www.w3.org/2005/Atom}"
+
+
+class TestSummaries:
+    """Test plain-text summaries."""
+
+    def test_plain_text_drops_markup_and_code(self):
+        """Markup is stripped, code blocks are skipped and blocks stay separated."""
+        html = '<p>Use <a href="/x">links</a> &amp; <em>more</em>.</p><pre><code>x = 1</code></pre><p>Done</p>'
+
+        assert plain_text(html) == "Use links & more. Done"
+
+    def test_summarize_cuts_at_word_boundary(self):
+        """Long text is cut between words and marked with an ellipsis."""
+        summary = summarize("alpha beta gamma delta", length=14)
+
+        assert summary == "alpha beta…"
+        assert summarize("short text", length=14) == "short text"
+
+
+@pytest.fixture
+def posts_dir(monkeypatch):
+    """Create a temporary posts directory with tagged posts."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        posts_dir = Path(temp_dir)
+        (posts_dir / "first.md").write_text(
+            '---\ntitle: "First <post>"\ndate: "2024-01-01"\ntags: ["python"]\n---\n'
+            + "Some **bold** words. " * 40
+            + "\n\n```python\nsecret_code()\n```\n",
+            encoding="utf-8",
+        )
+        (posts_dir / "second.md").write_text(
+            '---\ntitle: "Second"\ndate: "2024-02-01"\ntags: ["baking"]\nexcerpt: "Bread & butter"\n---\nBody.',
+            encoding="utf-8",
+        )
+
+        clear_content_cache()
+        monkeypatch.setattr("src.main_app.utils.content._get_posts_directory", lambda: posts_dir)
+        yield posts_dir
+        clear_content_cache()
+
+
+class TestFeedModel:
+    """Test the shared feed model."""
+
+    def test_entries_have_plain_text_summaries(self, posts_dir):
+        """Posts without excerpts are summarized from their body without markup or code."""
+        feed = get_feed()
+        first = next(entry for entry in feed.entries if entry.title == "First <post>")
+
+        assert [entry.title for entry in feed.entries] == ["Second", "First <post>"]
+        assert feed.entries[0].summary == "Bread & butter"
+        assert first.summary.startswith("Some bold words.")
+        assert first.summary.endswith("…") and "<" not in first.summary
+        assert "secret_code" not in first.summary
+        assert feed.updated == feed.entries[0].published
+
+    def test_cached_per_generation(self, posts_dir):
+        """The model is built once per content generation and per tag."""
+        assert get_feed() is get_feed()
+        assert get_feed("Python") is get_feed("python")
+        assert get_feed("missing") is None
+
+        first = get_feed()
+        clear_content_cache()
+        assert get_feed() is not first
+
+
+class TestFeedRoutes:
+    """Test the served feeds."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_formats_share_entries(self, posts_dir):
+        """RSS, Atom and JSON Feed list the same entries with escaped text."""
+        rss = ET.fromstring(self.client.get("/feed.xml").content)
+        atom = ET.fromstring(self.client.get("/atom.xml").content)
+        response = self.client.get("/feed.json")
+        document = json.loads(response.content)
+
+        assert response.headers["Content-Type"].startswith("application/feed+json")
+        assert [item.findtext("title") for item in rss.iter("item")] == ["Second", "First <post>"]
+        assert [entry.findtext(f"{ATOM}title") for entry in atom.iter(f"{ATOM}entry")] == ["Second", "First <post>"]
+        assert [item["title"] for item in document["items"]] == ["Second", "First <post>"]
+        assert document["items"][0]["summary"] == "Bread & butter"
+        assert atom.findtext(f"{ATOM}updated") == "2024-02-01T00:00:00Z"
+
+    def test_tag_feed(self, posts_dir):
+        """Tag feeds only list the tag's posts and are labelled by route template."""
+        before = HTTP_REQUESTS.value("GET", "/tags/{tag}/feed.xml", "200")
+        rss = ET.fromstring(self.client.get("/tags/python/feed.xml").content)
+
+        assert [item.findtext("title") for item in rss.iter("item")] == ["First <post>"]
+        assert HTTP_REQUESTS.value("GET", "/tags/{tag}/feed.xml", "200") == before + 1
+        assert self.client.get("/tags/baking/feed.json").json()["title"].endswith("baking")
+
+    def test_unknown_tag_feed_is_not_found(self, posts_dir):
+        """Feeds of tags without posts, and unknown feed names, are 404s."""
+        assert self.client.get("/tags/missing/feed.xml").status_code == 404
+        assert self.client.get("/tags/python/feed.txt").status_code == 404
+
+    def test_resolving_does_not_build_feeds(self, posts_dir, monkeypatch):
+        """Tag feed paths are resolved from the tag index; the feed is only built when served."""
+        monkeypatch.setattr("src.main_app.utils.feeds.build_feed", lambda *args, **kwargs: pytest.fail("built"))
+
+        assert resolve_tag_feed("/tags/python/feed.xml") is not None
+        assert resolve_tag_feed("/tags/missing/feed.xml") is None
+
+    def test_served_precompressed(self, posts_dir):
+        """Compressed feeds decode to the identity body, which is stable within a generation."""
+        identity = self.client.get("/tags/python/atom.xml", headers={"Accept-Encoding": "identity"})
+        compressed = self.client.get("/tags/python/atom.xml", headers={"Accept-Encoding": "gzip"})
+
+        assert compressed.headers["Content-Encoding"] == "gzip"
+        assert compressed.content == identity.content
+        assert self.client.get("/tags/python/atom.xml", headers={"Accept-Encoding": "identity"}).content == (
+            identity.content
+        )
@@ -0,0 +1,81 @@
+"""Tests for the load-test harness."""
+
+import asyncio
+import itertools
+
+import httpx
+import pytest
+
+from src.main_app.app import app
+from src.main_app.tools.loadtest import Site, discover_site, parse_access_log, parse_mix, run_load, synthetic_requests
+
+
+def _client():
+    """Create an httpx client driving the app in-process."""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest")
+
+
+class TestTraffic:
+    """Test traffic mixes and log replay parsing."""
+
+    def test_parse_mix(self):
+        """Test named and custom mixes."""
+        assert parse_mix("realistic")["read"] == 45
+        assert parse_mix("read=3,feed=1") == {"read": 3.0, "feed": 1.0}
+        with pytest.raises(ValueError):
+            parse_mix("write=1")
+
+    def test_synthetic_requests_follow_mix(self):
+        """Test that only categories in the mix are generated."""
+        site = Site(posts=["/posts/a", "/posts/b"], tags=["/tags/x"], pages=3)
+        requests = list(itertools.islice(synthetic_requests(site, {"read": 1, "static": 1}), 200))
+
+        assert {request.category for request in requests} == {"read", "static"}
+        assert all(request.path in ("/posts/a", "/posts/b") for request in requests if request.category == "read")
+
+    def test_parse_access_log(self):
+        """Test combined log lines, bare paths and skipped methods."""
+        lines = [
+            '10.0.0.1 - - [10/Oct/2025:13:55:36 +0000] "GET /posts/a HTTP/1.1" 200 512 "-" "Mozilla/5.0"',
+            '10.0.0.2 - - [10/Oct/2025:13:55:40 +0000] "POST /contact HTTP/1.1" 200 12',
+            '10.0.0.3 - - [10/Oct/2025:13:55:46 +0000] "HEAD /feed.xml HTTP/1.1" 200 0',
+            "/tags/python?page=2",
+            "not a request",
+        ]
+        requests = list(parse_access_log(iter(lines)))
+
+        assert [(r.method, r.path, r.category) for r in requests] == [
+            ("GET", "/posts/a", "read"),
+            ("HEAD", "/feed.xml", "feed"),
+            ("GET", "/tags/python?page=2", "tags"),
+        ]
+        assert requests[0].offset == 0.0
+        assert requests[1].offset == 10.0
+
+
+class TestRunLoad:
+    """Test issuing load against the in-process app."""
+
+    def test_discover_and_run(self):
+        """Test site discovery and a short run."""
+
+        async def scenario():
+            async with _client() as client:
+                site = await discover_site(client)
+                results = await run_load(
+                    client,
+                    synthetic_requests(site, parse_mix("realistic")),
+                    concurrency=4,
+                    limit=40,
+                    duration=None,
+                )
+            return site, results
+
+        site, results = asyncio.run(scenario())
+
+        assert "/posts/welcome-to-my-blog" in site.posts
+        assert "/tags/python" in site.tags
+        assert results["requests"] == 40
+        assert results["errors"] == 0
+        assert results["throughput_rps"] > 0
+        assert set(results["latency"]) >= {"p50_ms", "p99_ms"}
@@ -0,0 +1,125 @@
+"""Tests for the content layer memory report."""
+
+import subprocess
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.routes.admin import MAX_MEMORY_PAGES, MEMORY_REPORT_TIMEOUT
+from src.main_app.tools.compile import compile_directory
+from src.main_app.tools.corpus import generate_corpus
+from src.main_app.tools.memory import format_report, run
+from src.main_app.utils.content import clear_content_cache
+
+STRUCTURES = ["load_all_posts", "indexes", "pygments_css", "related_index", "renderer", "load_post", "pages"]
+
+
+@pytest.fixture
+def compiled_corpus(tmp_path, monkeypatch):
+    """Serve a small compiled synthetic corpus."""
+    posts, compiled = tmp_path / "posts", tmp_path / "compiled"
+    generate_corpus(posts, 6)
+    compile_directory(posts, compiled)
+    monkeypatch.setenv("POSTS_DIR", str(posts))
+    monkeypatch.setenv("COMPILED_DIR", str(compiled))
+    clear_content_cache()
+    yield
+    monkeypatch.delenv("COMPILED_DIR")
+    monkeypatch.delenv("POSTS_DIR")
+    clear_content_cache()
+
+
+class TestMemoryReport:
+    """Test measuring the corpus under tracemalloc."""
+
+    def test_reports_structures_and_posts(self, compiled_corpus):
+        """Every structure is measured, and every post with the raw_content saving."""
+        report = run(top=3, pages=2, sample=None)
+
+        assert report["mode"] == "compiled"
+        assert report["posts"] == 6
+        assert [stage["name"] for stage in report["structures"]] == STRUCTURES
+        assert report["structures"][0]["entries"] == 6
+
+        per_post = report["per_post"]
+        assert per_post["measured"] == 6
+        sizes = [size["bytes"] for size in per_post["largest"]]
+        assert len(sizes) == 3 and sizes == sorted(sizes, reverse=True)
+        assert all(size["raw_content"] > 0 for size in per_post["largest"])
+
+        raw = report["raw_content"]
+        assert raw["saved_per_post"] > 0
+        assert raw["saved_in_full_cache"] == raw["saved_per_post"] * 6
+
+    def test_sample_limits_posts_measured(self, compiled_corpus):
+        """Only the sampled posts are measured on their own, and none with a sample of 0."""
+        assert run(top=3, pages=0, sample=2)["per_post"]["measured"] == 2
+        assert "per_post" not in run(top=3, pages=0, sample=0)
+
+    def test_format_report(self, compiled_corpus):
+        """The table lists each structure, the largest posts and the saving."""
+        lines = format_report(run(top=2, pages=0, sample=3))
+
+        assert lines[0].startswith("6 posts (compiled)")
+        assert any(line.startswith("related_index") for line in lines)
+        assert "3 of 6 posts measured" in "\n".join(lines)
+        assert lines[-1].startswith("Dropping raw_content saves")
+
+
+class TestAdminMemoryRoute:
+    """Test the admin endpoint serving the report."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_hidden_without_admin_token(self, monkeypatch):
+        """Test that the report is not exposed unless a token is configured."""
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        assert self.client.get("/admin/memory").status_code == 404
+
+    def test_report_from_subprocess(self, monkeypatch):
+        """Test that the endpoint returns the report of a child process."""
+        calls = []
+
+        def fake_report(sample, top, pages):
+            calls.append((sample, top, pages))
+            return {"posts": 3, "structures": []}
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr("src.main_app.routes.admin.run_memory_report", fake_report)
+        response = self.client.get("/admin/memory?sample=5&top=2&pages=1", headers={"Authorization": "Bearer secret"})
+
+        assert response.status_code == 200
+        assert response.json() == {"posts": 3, "structures": []}
+        assert calls == [(5, 2, 1)]
+
+    def test_parameters_are_clamped(self, monkeypatch):
+        """Test that oversized or negative parameters are clamped before starting the report."""
+        calls = []
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr("src.main_app.routes.admin.run_memory_report", lambda *args: calls.append(args) or {})
+        self.client.get("/admin/memory?sample=-1&top=0&pages=100000", headers={"Authorization": "Bearer secret"})
+
+        assert calls == [(0, 1, MAX_MEMORY_PAGES)]
+
+    @pytest.mark.parametrize(
+        ("error", "status"),
+        [
+            (subprocess.CalledProcessError(1, "memory", stderr="Traceback...\nMemoryError"), 500),
+            (subprocess.TimeoutExpired("memory", MEMORY_REPORT_TIMEOUT), 504),
+        ],
+    )
+    def test_failures_are_json_errors(self, monkeypatch, error, status):
+        """Test that a failed or timed out report returns a JSON error instead of an error page."""
+
+        def failing_report(*args):
+            raise error
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        monkeypatch.setattr("src.main_app.routes.admin.run_memory_report", failing_report)
+        response = self.client.get("/admin/memory", headers={"Authorization": "Bearer secret"})
+
+        assert response.status_code == status
+        assert "error" in response.json()
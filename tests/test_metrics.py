@@ -0,0 +1,135 @@
+"""Tests for the Prometheus-style metrics endpoint."""
+
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils import content
+from src.main_app.utils.cache import CACHE_EVICTIONS, TieredCache
+from src.main_app.utils.metrics import HTTP_REQUESTS, Counter, Histogram, Registry, render_metrics
+
+
+class TestExposition:
+    """Test metric types and the text exposition format."""
+
+    def test_counter_with_labels(self):
+        """Test counter samples and label escaping."""
+        registry = Registry()
+        counter = registry.register(Counter("jobs_total", "Jobs run.", ("kind",)))
+        counter.inc("build")
+        counter.inc("build", amount=2)
+        counter.inc('say "hi"')
+
+        text = registry.render()
+        assert "# TYPE jobs_total counter" in text
+        assert 'jobs_total{kind="build"} 3' in text
+        assert 'jobs_total{kind="say \\"hi\\""} 1' in text
+
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram bucket, sum and count samples."""
+        registry = Registry()
+        histogram = registry.register(Histogram("job_seconds", "Job duration.", buckets=(0.1, 1.0)))
+        histogram.observe(0.05)
+        histogram.observe(0.5)
+        histogram.observe(5)
+
+        text = registry.render()
+        assert 'job_seconds_bucket{le="0.1"} 1' in text
+        assert 'job_seconds_bucket{le="1"} 2' in text
+        assert 'job_seconds_bucket{le="+Inf"} 3' in text
+        assert "job_seconds_sum 5.55" in text
+        assert "job_seconds_count 3" in text
+
+    def test_collectors_run_at_scrape_time(self):
+        """Test that registered collectors contribute families."""
+        registry = Registry()
+        registry.register_collector(lambda: [("queue_depth", "gauge", "Queue depth.", [("queue_depth", {}, 7)])])
+
+        assert "queue_depth 7" in registry.render()
+
+
+class TestMetricsEndpoint:
+    """Test metrics collected through the application."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_requests_counted_by_route_template(self):
+        """Test that requests are labelled with the route template, not the path."""
+        before = HTTP_REQUESTS.value("GET", "/posts/{slug}", "200")
+        self.client.get("/posts/welcome-to-my-blog")
+
+        assert HTTP_REQUESTS.value("GET", "/posts/{slug}", "200") == before + 1
+
+    def test_unmatched_paths_share_one_label(self):
+        """Test that 404s for arbitrary paths do not create new label values."""
+        self.client.get("/some/random/path")
+
+        text = self.client.get("/metrics").text
+        assert 'route="/some/random/path"' not in text
+        assert 'http_requests_total{method="GET",route="unmatched",status="404"}' in text
+
+    def test_metrics_endpoint_exposes_content_and_compression(self):
+        """Test the endpoint format and the content and compression families."""
+        self.client.get("/", headers={"Accept-Encoding": "gzip"})
+        response = self.client.get("/metrics")
+
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert response.headers["Cache-Control"] == "no-store"
+        for family in (
+            "http_request_duration_seconds_bucket",
+            "content_cache_hits_total",
+            'content_cache_entries{cache="load_corpus"}',
+            "content_posts",
+            "content_compile_seconds",
+            'http_response_body_bytes_total{stage="after_compression"}',
+            "process_resident_memory_bytes",
+        ):
+            assert family in response.text
+
+
+def _sample(text: str, prefix: str) -> float:
+    return float(next(line for line in text.splitlines() if line.startswith(prefix)).rsplit(" ", 1)[1])
+
+
+class TestContentCacheMetrics:
+    """Test that content cache counters are monotonic and count evictions."""
+
+    def test_totals_survive_cache_clears(self):
+        """Test that clearing the content caches does not reset the exported hit and miss totals."""
+        slug = content.load_all_posts()[0].slug
+        content.load_post(slug)
+        content.load_post(slug)
+        before = render_metrics()
+        content.clear_content_cache()
+        after = render_metrics()
+
+        for family in ("content_cache_hits_total", "content_cache_misses_total"):
+            family += '{cache="load_post"}'
+            assert _sample(after, family) == _sample(before, family) > 0
+
+    def test_load_post_evictions(self, tmp_path, monkeypatch):
+        """Test that misses in the full post cache are counted as evictions."""
+        size = content._load_post.cache_info().maxsize
+        for i in range(size + 2):
+            (tmp_path / f"post-{i}.md").write_text(f"---\ntitle: Post {i}\ndate: 2024-01-01\n---\n\nBody {i}.\n")
+        monkeypatch.setenv("POSTS_DIR", str(tmp_path))
+        content.clear_content_cache()
+        try:
+            before = content.CACHE_EVICTIONS.value("load_post")
+            for i in range(size + 2):
+                content.load_post(f"post-{i}")
+            content.load_post("post-0")
+            assert content.CACHE_EVICTIONS.value("load_post") == before + 3
+        finally:
+            monkeypatch.delenv("POSTS_DIR")
+            content.clear_content_cache()
+
+    def test_tiered_cache_evictions(self):
+        """Test that entries dropped from a full in-process tier are counted."""
+        cache = TieredCache("evictions-test", max_entries=2, backend=lambda: None)
+        for key in ("a", "b", "c", "d"):
+            cache.set(key, b"x")
+
+        assert CACHE_EVICTIONS.value("evictions-test") == 2
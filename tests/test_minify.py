@@ -0,0 +1,74 @@
+"""Tests for HTML minification."""
+
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils.content import clear_content_cache, load_post
+from src.main_app.utils.minify import SAVINGS, minify_css, minify_html
+
+CODE_BLOCK = '<div class="highlight"><pre><span></span><code>def f():\n    return  1\n\n</code></pre></div>'
+
+
+class TestMinifyHtml:
+    """Test whitespace removal rules."""
+
+    def test_drops_indentation_between_blocks(self):
+        """Whitespace around block-level tags is removed."""
+        html = "<html>\n  <body>\n    <div>\n      <p>Hello   world</p>\n    </div>\n  </body>\n</html>\n"
+
+        assert minify_html(html) == "<html><body><div><p>Hello world</p></div></body></html>"
+
+    def test_keeps_space_between_inline_elements(self):
+        """Whitespace between inline elements still renders as one space."""
+        html = "<p>\n  <a href='/a'>one</a>\n  <a href='/b'>two</a>\n</p>"
+
+        assert minify_html(html) == "<p><a href='/a'>one</a> <a href='/b'>two</a></p>"
+
+    def test_preserves_code_blocks(self):
+        """Codehilite blocks, scripts and tag attributes are left untouched."""
+        html = f"<article>\n  {CODE_BLOCK}\n  <script>if (a  &&  b) {{\n}}</script>\n</article>"
+        minified = minify_html(html)
+
+        assert CODE_BLOCK in minified
+        assert "<script>if (a  &&  b) {\n}</script>" in minified
+        assert minify_html('<p title="a   b">x</p>') == '<p title="a   b">x</p>'
+
+    def test_minifies_inline_styles(self):
+        """Style sheets lose comments and whitespace around punctuation."""
+        assert minify_css("pre { line-height: 125%; }\n/* Comment */ a, b { color: red; }") == (
+            "pre{line-height: 125%}a,b{color: red}"
+        )
+        assert minify_html("<style>\n  p { margin: 0; }\n</style>") == "<style>p{margin: 0}</style>"
+
+
+class TestCacheFillMinification:
+    """Test that pages and post bodies are minified when cached."""
+
+    def setup_method(self):
+        """Set up test client."""
+        clear_content_cache()
+        self.client = TestClient(app)
+
+    def test_pages_are_minified_and_reported(self, monkeypatch):
+        """Pages are sent minified, compressed or not, and their savings are reported."""
+        identity = self.client.get("/", headers={"Accept-Encoding": "identity"})
+        compressed = self.client.get("/", headers={"Accept-Encoding": "gzip"})
+
+        assert "\n    " not in identity.text
+        assert identity.headers["Content-Length"] == str(len(identity.content))
+        assert compressed.text == identity.text
+        row = next(row for row in SAVINGS.report() if row["page"] == "/")
+        assert row["after"] == len(identity.content)
+        assert row["saved"] > 0
+
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        report = self.client.get("/admin/minify", headers={"Authorization": "Bearer secret"}).json()
+        assert report["saved"] == sum(page["saved"] for page in report["report"])
+
+    def test_post_bodies_minified_once_with_code_intact(self):
+        """Rendered bodies are minified when compiled, keeping highlighted code line by line."""
+        post = load_post("python-development-best-practices")
+
+        assert "</p>\n" not in post.content
+        assert "<pre>" in post.content and "\n" in post.content
+        assert any(row["page"] == "post:python-development-best-practices" for row in SAVINGS.report())
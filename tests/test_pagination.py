@@ -0,0 +1,67 @@
+"""Tests for the listing pagination index."""
+
+from src.main_app.utils.pagination import PageIndex
+
+
+def _posts(count):
+    """Build a minimal ordered listing of fake posts."""
+    return [{"slug": f"post-{i}"} for i in range(count)]
+
+
+class TestPageIndex:
+    """Test page lookups and bounds validation."""
+
+    def test_page_slices_listing(self):
+        """Test that numbered pages return consecutive slices."""
+        index = PageIndex(_posts(25), per_page=10)
+
+        assert index.total_pages == 3
+        assert [post["slug"] for post in index.page(1).posts] == [f"post-{i}" for i in range(10)]
+        assert [post["slug"] for post in index.page(3).posts] == [f"post-{i}" for i in range(20, 25)]
+
+    def test_page_navigation_flags(self):
+        """Test previous/next information on numbered pages."""
+        index = PageIndex(_posts(25), per_page=10)
+
+        first = index.page(1)
+        assert not first.has_prev
+        assert first.next_cursor == "post-9"
+
+        last = index.page(3)
+        assert last.prev_number == 2
+        assert not last.has_next
+
+    def test_out_of_range_pages(self):
+        """Test that invalid page numbers are rejected without slicing."""
+        index = PageIndex(_posts(25), per_page=10)
+
+        assert index.page(0) is None
+        assert index.page(-3) is None
+        assert index.page(4) is None
+        assert index.page(10**12) is None
+
+    def test_empty_listing_has_single_page(self):
+        """Test that an empty listing still has a valid first page."""
+        index = PageIndex([], per_page=10)
+
+        assert index.total_pages == 1
+        assert index.page(1).posts == []
+        assert index.page(2) is None
+
+    def test_page_before_cursor(self):
+        """Test cursor navigation continues after the given slug."""
+        index = PageIndex(_posts(25), per_page=10)
+
+        page = index.page_before("post-4")
+        assert page.cursor
+        assert page.start == 5
+        assert [post["slug"] for post in page.posts] == [f"post-{i}" for i in range(5, 15)]
+        assert page.prev_number == 1
+        assert page.next_cursor == "post-14"
+
+    def test_page_before_invalid_cursor(self):
+        """Test that unknown or final cursors are rejected."""
+        index = PageIndex(_posts(25), per_page=10)
+
+        assert index.page_before("missing") is None
+        assert index.page_before("post-24") is None
@@ -0,0 +1,81 @@
+"""Tests for htmx partial-page navigation."""
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.components import HTMX_CDN, HTMX_SRC, HTMX_VENDORED, SCRIPT_SRC, _htmx_src
+
+PARTIAL = {"HX-Request": "true"}
+SLUG = "welcome-to-my-blog"
+
+
+class TestPartialNavigation:
+    """Test that htmx navigations get only the title and main content."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_full_pages_load_htmx(self):
+        """Test that full pages boost in-site links and the CSP allows the htmx script."""
+        response = self.client.get("/")
+
+        assert f'<script src="{HTMX_SRC}" defer></script>' in response.text
+        assert 'hx-boost="true"' in response.text
+        assert 'hx-target="#main-content"' in response.text
+        assert f"script-src {SCRIPT_SRC};" in response.headers["Content-Security-Policy"]
+
+    def test_vendored_htmx_is_served_from_self(self, tmp_path):
+        """Test that a vendored htmx build replaces the CDN, which the CSP then no longer allows."""
+        assert _htmx_src(tmp_path) == HTMX_CDN
+        (tmp_path / "js").mkdir()
+        (tmp_path / "js" / "htmx.min.js").write_text("/* htmx */")
+        assert _htmx_src(tmp_path) == HTMX_VENDORED
+        assert SCRIPT_SRC == ("'self'" if HTMX_SRC == HTMX_VENDORED else f"'self' {HTMX_CDN}")
+
+    @pytest.mark.parametrize("path", ["/", f"/posts/{SLUG}", "/tags", "/archive", "/about"])
+    def test_partial_has_title_and_main_only(self, path):
+        """Test that partial responses drop the head, sidebar and toggle."""
+        full = self.client.get(path)
+        partial = self.client.get(path, headers=PARTIAL)
+
+        assert partial.status_code == 200
+        assert partial.text.lstrip().startswith("<title>")
+        assert '<main id="main-content"' in partial.text
+        for marker in ("<html", "<head>", "Recent Posts", "theme-toggle", ".highlight"):
+            assert marker not in partial.text
+        assert len(partial.content) < len(full.content) / 2
+
+    def test_history_restore_gets_full_page(self):
+        """Test that htmx history restores receive the whole document."""
+        response = self.client.get("/", headers={**PARTIAL, "HX-History-Restore-Request": "true"})
+
+        assert "<html" in response.text
+        assert "Recent Posts" in response.text
+
+    def test_partials_are_cached_separately(self):
+        """Test that partial and full pages vary on the htmx headers and have distinct ETags."""
+        full = self.client.get("/")
+        partial = self.client.get("/", headers=PARTIAL)
+
+        assert "HX-Request" in partial.headers["Vary"]
+        assert full.headers["ETag"] != partial.headers["ETag"]
+
+    def test_streamed_post_partial(self, monkeypatch):
+        """Test that streamed posts also render as partials."""
+        monkeypatch.setenv("STREAM_THRESHOLD_BYTES", "1")
+        response = self.client.get(f"/posts/{SLUG}", headers=PARTIAL)
+
+        assert "<html" not in response.text
+        assert response.text.rstrip().endswith("</main>")
+        assert "HX-Request" in response.headers["Vary"]
+
+    def test_not_found_partial(self):
+        """Test that 404 pages render as partials so htmx can swap them in."""
+        response = self.client.get("/missing-page", headers=PARTIAL)
+
+        assert response.status_code == 404
+        assert "<html" not in response.text
+        assert "Page Not Found" in response.text
+        assert "HX-Request" in response.headers["Vary"]
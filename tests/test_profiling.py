@@ -0,0 +1,125 @@
+"""Tests for the sampling profiler and admin profiling routes."""
+
+import pstats
+import threading
+import time
+from collections import Counter
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils.profiling import Profiler, to_collapsed, to_pstats
+
+ROOT = ("app.py", 1, "handle")
+LEAF = ("content.py", 10, "parse")
+
+
+def _busy(stop: threading.Event):
+    """Spin until told to stop, so the sampler has something to see."""
+    while not stop.is_set():
+        sum(range(1000))
+
+
+class TestExport:
+    """Test collapsed stack and pstats export."""
+
+    def test_collapsed_stacks(self):
+        """Test collapsed output is root-first with sample counts."""
+        text = to_collapsed(Counter({(ROOT, LEAF): 3, (ROOT,): 1}))
+
+        assert text.splitlines()[0] == "handle (app.py:1);parse (content.py:10) 3"
+        assert text.splitlines()[1] == "handle (app.py:1) 1"
+
+    def test_pstats_loads(self, tmp_path):
+        """Test that the pstats table loads and reflects self and cumulative time."""
+        path = tmp_path / "profile.pstats"
+        path.write_bytes(to_pstats(Counter({(ROOT, LEAF): 3, (ROOT,): 1}), interval=0.01))
+
+        stats = pstats.Stats(str(path)).stats
+        cc, nc, tt, ct, callers = stats[LEAF]
+        assert nc == 3
+        assert abs(tt - 0.03) < 1e-9
+        assert ROOT in callers
+        assert abs(stats[ROOT][3] - 0.04) < 1e-9
+
+
+class TestProfiler:
+    """Test capture modes."""
+
+    def test_window_mode_samples_busy_threads(self):
+        """Test that window mode collects stacks from running threads."""
+        profiler = Profiler()
+        stop = threading.Event()
+        worker = threading.Thread(target=_busy, args=(stop,))
+        worker.start()
+        try:
+            profiler.start("window", interval=0.001, window=0.2)
+            time.sleep(0.1)
+            profiler.stop()
+        finally:
+            stop.set()
+            worker.join()
+
+        assert any(frame[2] == "_busy" for stack in profiler.samples() for frame in stack)
+
+    def test_slowest_mode_keeps_n_requests(self):
+        """Test that only the slowest requests are kept."""
+        profiler = Profiler()
+        profiler.start("slowest", interval=0.001, slowest=2)
+        try:
+            for delay in (0.0, 0.03, 0.01, 0.02):
+                token = profiler.request_started(f"GET /{delay}")
+                time.sleep(delay)
+                profiler.request_finished(token)
+        finally:
+            profiler.stop()
+
+        assert [entry["request"] for entry in profiler.status()["slowest"]] == ["GET /0.03", "GET /0.02"]
+
+    def test_invalid_mode_rejected(self):
+        """Test that unknown modes raise ValueError."""
+        profiler = Profiler()
+        with pytest.raises(ValueError):
+            profiler.start("everything")
+        assert not profiler.running
+
+
+class TestAdminProfileRoutes:
+    """Test admin-only access to the profiler."""
+
+    def setup_method(self):
+        """Set up test client."""
+        self.client = TestClient(app)
+
+    def test_hidden_without_admin_token(self, monkeypatch):
+        """Test that admin routes do not exist unless a token is configured."""
+        monkeypatch.delenv("ADMIN_TOKEN", raising=False)
+        assert self.client.get("/admin/profile").status_code == 404
+
+    def test_wrong_token_rejected(self, monkeypatch):
+        """Test that a wrong bearer token is rejected."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        response = self.client.get("/admin/profile", headers={"Authorization": "Bearer nope"})
+        assert response.status_code == 403
+
+    def test_capture_and_download(self, monkeypatch):
+        """Test starting, stopping and downloading a capture."""
+        monkeypatch.setenv("ADMIN_TOKEN", "secret")
+        headers = {"Authorization": "Bearer secret"}
+
+        started = self.client.post("/admin/profile?mode=window&seconds=5&interval_ms=1", headers=headers)
+        assert started.status_code == 202
+        assert started.json()["running"]
+
+        self.client.get("/")
+        stopped = self.client.delete("/admin/profile", headers=headers)
+        assert not stopped.json()["running"]
+
+        collapsed = self.client.get("/admin/profile.collapsed", headers=headers)
+        assert collapsed.status_code == 200
+        assert "attachment" in collapsed.headers["Content-Disposition"]
+        assert collapsed.headers["Cache-Control"] == "no-store"
+
+        assert self.client.get("/admin/profile.pstats", headers=headers).status_code == 200
+        assert self.client.post("/admin/profile?mode=bogus", headers=headers).status_code == 400
@@ -0,0 +1,130 @@
+"""Tests for drafts and scheduled publication."""
+
+import tempfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.utils import content
+from src.main_app.utils.content import (
+    clear_content_cache,
+    content_generation,
+    get_all_tags,
+    get_publication_index,
+    load_all_posts,
+    load_post,
+)
+
+NOW = datetime(2025, 6, 1, 12, 0)
+
+
+def _epoch(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class Clock:
+    """Manually advanced epoch clock."""
+
+    def __init__(self, start: datetime):
+        self.now = _epoch(start)
+
+    def __call__(self) -> float:
+        return self.now
+
+    def move_to(self, value: datetime):
+        self.now = _epoch(value)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Freeze the publication clock at ``NOW``."""
+    clock = Clock(NOW)
+    monkeypatch.setattr(content, "_clock", clock)
+    return clock
+
+
+@pytest.fixture
+def posts_dir(monkeypatch, clock):
+    """Create published, scheduled and draft posts."""
+    posts = {
+        "published": ("2025-05-01", "[python]", ""),
+        "draft": ("2025-05-02", "[python]", "draft: true\n"),
+        "soon": ("2025-06-01T13:00:00", "[python, scheduling]", ""),
+        "later": ("2025-07-01", "[python]", ""),
+    }
+    with tempfile.TemporaryDirectory() as temp_dir:
+        posts_dir = Path(temp_dir)
+        for slug, (date, tags, extra) in posts.items():
+            (posts_dir / f"{slug}.md").write_text(
+                f"---\ntitle: {slug}\ndate: {date}\ntags: {tags}\n{extra}---\n\nBody of {slug}.\n", encoding="utf-8"
+            )
+
+        clear_content_cache()
+        monkeypatch.setattr("src.main_app.utils.content._get_posts_directory", lambda: posts_dir)
+        yield posts_dir
+        clear_content_cache()
+
+
+class TestPublicationIndex:
+    """Test which posts are visible over time."""
+
+    def test_drafts_and_future_posts_are_hidden(self, posts_dir):
+        """Only past, non-draft posts are listed or loadable."""
+        assert [post.slug for post in load_all_posts()] == ["published"]
+        assert load_post("published") is not None
+        assert load_post("draft") is None
+        assert load_post("soon") is None
+        assert get_all_tags() == ["python"]
+
+    def test_scheduled_posts_ordered_by_publication(self, posts_dir):
+        """The index knows which post publishes next."""
+        index = get_publication_index()
+
+        assert [post.slug for post in index.scheduled] == ["later", "soon"]
+        assert index.next_publication == datetime(2025, 6, 1, 13, 0)
+
+    def test_publishes_at_boundary_without_rescan(self, posts_dir, clock, monkeypatch):
+        """Crossing a publication date starts a new generation and lists the post, without reading files."""
+        load_all_posts()
+        generation = content_generation()
+
+        clock.move_to(datetime(2025, 6, 1, 12, 59, 59))
+        assert content_generation() == generation
+
+        monkeypatch.setattr(content, "_scan_headers", lambda paths: pytest.fail("rescanned posts directory"))
+        clock.move_to(datetime(2025, 6, 1, 13, 0))
+        assert content_generation() == generation + 1
+        assert [post.slug for post in load_all_posts()] == ["soon", "published"]
+        assert load_post("soon").title == "soon"
+        assert get_all_tags() == ["python", "scheduling"]
+        assert content_generation() == generation + 1
+
+    def test_boundary_reached_through_listing(self, posts_dir, clock):
+        """Listings check the schedule too, not only the generation."""
+        load_all_posts()
+        clock.move_to(datetime(2025, 8, 1))
+
+        assert [post.slug for post in load_all_posts()] == ["later", "soon", "published"]
+        assert get_publication_index().next_publication is None
+
+
+class TestScheduledRoutes:
+    """Test that served artifacts follow publication."""
+
+    def test_pages_feeds_and_sitemap_update_at_boundary(self, posts_dir, clock):
+        """The post page, feed and sitemap appear exactly when the post is published."""
+        from src.main_app.app import app
+
+        client = TestClient(app)
+        assert client.get("/posts/soon").status_code == 404
+        assert "/posts/soon" not in client.get("/feed.xml").text
+        assert "/posts/soon" not in client.get("/sitemap.xml").text
+        assert client.get("/tags/scheduling/feed.xml").status_code == 404
+
+        clock.move_to(datetime(2025, 6, 1, 13, 0))
+        assert client.get("/posts/soon").status_code == 200
+        assert "/posts/soon" in client.get("/feed.xml").text
+        assert "/posts/soon" in client.get("/sitemap.xml").text
+        assert client.get("/tags/scheduling/feed.xml").status_code == 200
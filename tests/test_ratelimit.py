@@ -0,0 +1,202 @@
+"""Tests for per-client rate limiting."""
+
+import asyncio
+
+import pytest
+
+from src.main_app.utils.ratelimit import (
+    DEFAULT_BUDGETS,
+    RATE_LIMIT_DECISIONS,
+    Budget,
+    RateLimiter,
+    RateLimitMiddleware,
+    client_class,
+    limiter_from_env,
+    parse_budgets,
+    route_class,
+)
+
+GOOGLEBOT = "Mozilla/5.0 (compatible; Googlebot/2.1; +http://www.google.com/bot.html)"
+FIREFOX = "Mozilla/5.0 (X11; Linux x86_64; rv:128.0) Gecko/20100101 Firefox/128.0"
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _call(middleware, path, user_agent=FIREFOX, client=("10.0.0.1", 1234), headers=()):
+    """Run one request through the middleware and return the response start message."""
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "GET",
+        "path": path,
+        "client": client,
+        "headers": [(b"user-agent", user_agent.encode()), *headers],
+    }
+    asyncio.run(middleware(scope, None, send))
+    return messages[0]
+
+
+class Clock:
+    """Manually advanced clock."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def _limiter(clock, **budgets):
+    base = {route: dict(clients) for route, clients in DEFAULT_BUDGETS.items()}
+    for name, budget in budgets.items():
+        route, _, client = name.partition("_")
+        base[route][client] = budget
+    return RateLimiter(base, clock=clock)
+
+
+class TestClassification:
+    """Test route and client classes."""
+
+    def test_route_classes(self):
+        """Listings, feeds and other pages get separate budgets; static files and health are exempt."""
+        assert route_class("/") == "listing"
+        assert route_class("/tags/python") == "listing"
+        assert route_class("/archive/2025") == "listing"
+        assert route_class("/tags/python/feed.xml") == "feed"
+        assert route_class("/sitemap.xml") == "feed"
+        assert route_class("/posts/hello") == "default"
+        assert route_class("/static/css/custom.css") is None
+        assert route_class("/health") is None
+
+    def test_client_classes(self):
+        """Crawlers are named after their product; browsers are human."""
+        assert client_class(FIREFOX) == ("human", "")
+        assert client_class(GOOGLEBOT) == ("crawler", "googlebot")
+        assert client_class("curl/8.5.0") == ("crawler", "curl")
+        assert client_class("") == ("crawler", "anonymous")
+
+
+class TestParseBudgets:
+    """Test budget configuration."""
+
+    def test_overrides(self):
+        """Overrides replace single budgets and keep the rest."""
+        budgets = parse_budgets("listing=1/2, feed.crawler=3")
+
+        assert budgets["listing"]["human"] == Budget(1, 2)
+        assert budgets["feed"]["crawler"] == Budget(3, 3)
+        assert budgets["default"] == DEFAULT_BUDGETS["default"]
+
+    @pytest.mark.parametrize("spec", ["nope=1/2", "listing.robot=1/2", "listing=fast", "listing=0/5"])
+    def test_invalid(self, spec):
+        """Unknown classes and malformed values are rejected."""
+        with pytest.raises(ValueError):
+            parse_budgets(spec)
+
+    def test_env(self, monkeypatch):
+        """Limiting is off by default and configured by the environment."""
+        monkeypatch.delenv("RATE_LIMIT", raising=False)
+        assert limiter_from_env() is None
+
+        monkeypatch.setenv("RATE_LIMIT", "on")
+        monkeypatch.setenv("RATE_LIMIT_BUDGETS", "listing=1/2")
+        monkeypatch.setenv("RATE_LIMIT_TRUSTED_HOPS", "1")
+        monkeypatch.delenv("WEB_CONCURRENCY", raising=False)
+        limiter = limiter_from_env()
+        assert limiter.budgets["listing"]["human"] == Budget(1, 2)
+        assert limiter.trusted_hops == 1
+
+    def test_budgets_split_between_workers(self, monkeypatch):
+        """Each worker enforces its share of the site-wide budgets, with bursts of at least one request."""
+        monkeypatch.setenv("RATE_LIMIT", "on")
+        monkeypatch.setenv("RATE_LIMIT_BUDGETS", "listing=8/40,feed=4/2")
+        monkeypatch.setenv("WEB_CONCURRENCY", "4")
+        limiter = limiter_from_env()
+
+        assert limiter.budgets["listing"]["human"] == Budget(2, 10)
+        assert limiter.budgets["feed"]["human"] == Budget(1, 1)
+
+
+class TestRateLimitMiddleware:
+    """Test admission and rejection."""
+
+    def test_rejects_over_budget_with_retry_after(self):
+        """Requests beyond the burst get a 429 with Retry-After until tokens refill."""
+        clock = Clock()
+        middleware = RateLimitMiddleware(_ok, _limiter(clock, listing_human=Budget(0.5, 2)))
+        before = RATE_LIMIT_DECISIONS.value("listing", "human", "limited")
+
+        assert [_call(middleware, "/")["status"] for _ in range(2)] == [200, 200]
+        rejected = _call(middleware, "/")
+        assert rejected["status"] == 429
+        assert (b"retry-after", b"2") in rejected["headers"]
+        assert RATE_LIMIT_DECISIONS.value("listing", "human", "limited") == before + 1
+
+        clock.now += 2
+        assert _call(middleware, "/")["status"] == 200
+
+    def test_rejection_carries_configured_headers(self):
+        """429 responses get the headers the outer layers would add, such as security headers."""
+        limiter = _limiter(Clock(), listing_human=Budget(1, 1))
+        middleware = RateLimitMiddleware(_ok, limiter, headers={"X-Frame-Options": "DENY"})
+
+        _call(middleware, "/")
+        rejected = _call(middleware, "/")
+        assert rejected["status"] == 429
+        assert (b"x-frame-options", b"DENY") in rejected["headers"]
+
+    def test_buckets_per_client_and_route(self):
+        """One client exhausting a listing budget affects neither other clients nor other routes."""
+        middleware = RateLimitMiddleware(_ok, _limiter(Clock(), listing_human=Budget(1, 1)))
+
+        assert _call(middleware, "/")["status"] == 200
+        assert _call(middleware, "/")["status"] == 429
+        assert _call(middleware, "/posts/hello")["status"] == 200
+        assert _call(middleware, "/", client=("10.0.0.2", 1234))["status"] == 200
+
+    def test_crawlers_share_budgets(self):
+        """A crawler's budget spans addresses, and all crawlers share a combined budget."""
+        middleware = RateLimitMiddleware(
+            _ok, _limiter(Clock(), listing_crawler=Budget(1, 2), listing_crawlers=Budget(1, 3))
+        )
+
+        assert _call(middleware, "/", GOOGLEBOT, client=("1.1.1.1", 1))["status"] == 200
+        assert _call(middleware, "/", GOOGLEBOT, client=("2.2.2.2", 1))["status"] == 200
+        assert _call(middleware, "/", GOOGLEBOT, client=("3.3.3.3", 1))["status"] == 429
+        assert _call(middleware, "/", "AhrefsBot/7.0")["status"] == 200
+        assert _call(middleware, "/", "bingbot/2.0")["status"] == 429
+        assert _call(middleware, "/")["status"] == 200
+
+    def test_forwarded_address_from_trusted_proxy(self):
+        """Behind a trusted proxy, clients are told apart by X-Forwarded-For."""
+        limiter = _limiter(Clock(), listing_human=Budget(1, 1))
+        limiter.trusted_hops = 1
+        middleware = RateLimitMiddleware(_ok, limiter)
+
+        assert _call(middleware, "/", headers=[(b"x-forwarded-for", b"9.9.9.9, 10.1.1.1")])["status"] == 200
+        assert _call(middleware, "/", headers=[(b"x-forwarded-for", b"9.9.9.9, 10.1.1.2")])["status"] == 200
+        assert _call(middleware, "/", headers=[(b"x-forwarded-for", b"10.1.1.1")])["status"] == 429
+
+    def test_exempt_and_disabled(self):
+        """Static files are never limited, and no limiter means no limiting."""
+        middleware = RateLimitMiddleware(_ok, _limiter(Clock(), default_human=Budget(1, 1)))
+        assert all(_call(middleware, "/static/css/custom.css")["status"] == 200 for _ in range(5))
+
+        passthrough = RateLimitMiddleware(_ok, None)
+        assert all(_call(passthrough, "/")["status"] == 200 for _ in range(100))
+
+    def test_bucket_count_is_bounded(self):
+        """The least recently used buckets are dropped beyond the limit."""
+        limiter = RateLimiter(clock=Clock(), max_buckets=3)
+        middleware = RateLimitMiddleware(_ok, limiter)
+        for i in range(10):
+            _call(middleware, "/", client=(f"10.0.0.{i}", 1))
+
+        assert len(limiter) == 3
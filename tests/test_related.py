@@ -0,0 +1,156 @@
+"""Tests for the related-posts engine."""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+
+import pytest
+from starlette.testclient import TestClient
+
+from src.main_app.utils import related
+from src.main_app.utils.content import clear_content_cache
+from src.main_app.utils.related import build_index, get_related_posts, tokenize
+from src.main_app.utils.schema import PostMeta
+
+BODIES = {
+    "asgi-middleware": "Writing raw ASGI middleware: scopes, receive and send callables, and streaming bodies.",
+    "starlette-middleware": "Starlette middleware wraps ASGI apps; streaming bodies need care with send callables.",
+    "sourdough": "Sourdough bread needs a lively starter, flour, water, salt and a long cold proof.",
+    "baguettes": "Baguettes want a strong flour, a short proof and a very hot oven with steam.",
+    "untagged": "Nothing in common with anything else here.",
+}
+
+TAGS = {
+    "asgi-middleware": ["python", "asgi"],
+    "starlette-middleware": ["python", "starlette"],
+    "sourdough": ["baking"],
+    "baguettes": ["baking"],
+    "untagged": [],
+}
+
+
+def _posts() -> list[PostMeta]:
+    return [
+        PostMeta(slug, slug.replace("-", " ").title(), datetime(2025, 1, 10 - i), TAGS[slug], "")
+        for i, slug in enumerate(BODIES)
+    ]
+
+
+@pytest.fixture
+def python_only(monkeypatch):
+    """Force the pure-Python scoring path."""
+    monkeypatch.setattr(related, "np", None)
+
+
+class TestTokenize:
+    """Test term extraction."""
+
+    def test_drops_stopwords_and_short_terms(self):
+        """Stopwords and terms under three characters are not counted."""
+        assert tokenize("The ASGI app is an ASGI app") == {"asgi": 2, "app": 2}
+
+
+class TestBuildIndex:
+    """Test neighbour computation."""
+
+    def test_ranks_similar_posts_first(self, python_only):
+        """Posts sharing tags and vocabulary are each other's best match."""
+        index = build_index(_posts(), load_body=BODIES.get)
+
+        assert index.neighbors["asgi-middleware"][0] == "starlette-middleware"
+        assert index.neighbors["sourdough"][0] == "baguettes"
+        assert "asgi-middleware" not in index.neighbors["asgi-middleware"]
+
+    def test_unrelated_post_has_no_neighbors(self, python_only):
+        """Posts with nothing in common get no related posts rather than arbitrary ones."""
+        index = build_index(_posts(), load_body=BODIES.get)
+
+        assert index.neighbors["untagged"] == ()
+
+    def test_k_limits_neighbors(self, python_only):
+        """At most k neighbours are kept per post."""
+        index = build_index(_posts(), load_body=BODIES.get, k=1)
+
+        assert all(len(neighbors) <= 1 for neighbors in index.neighbors.values())
+
+    def test_numpy_matches_python(self, monkeypatch):
+        """The vectorized path ranks posts exactly like the inverted-index path."""
+        pytest.importorskip("numpy")
+        vectorized = build_index(_posts(), load_body=BODIES.get)
+        monkeypatch.setattr(related, "np", None)
+        reference = build_index(_posts(), load_body=BODIES.get)
+
+        assert vectorized.neighbors == reference.neighbors
+
+    def test_rebuild_only_tokenizes_changed_posts(self, python_only):
+        """Term counts of unchanged bodies are reused by the next build."""
+        first = build_index(_posts(), load_body=BODIES.get)
+        changed = {**BODIES, "sourdough": BODIES["sourdough"] + " Rye flour too."}
+        second = build_index(_posts(), load_body=changed.get, previous=first)
+
+        assert first.tokenized == len(BODIES)
+        assert second.tokenized == 1
+
+
+@pytest.fixture
+def posts_dir(monkeypatch):
+    """Create a temporary posts directory from the sample bodies."""
+    with tempfile.TemporaryDirectory() as temp_dir:
+        posts_dir = Path(temp_dir)
+        for i, (slug, body) in enumerate(BODIES.items()):
+            (posts_dir / f"{slug}.md").write_text(
+                f"---\ntitle: {slug}\ndate: 2025-01-{10 - i:02d}\ntags: {TAGS[slug]}\n---\n\n{body}\n"
+            )
+
+        clear_content_cache()
+        monkeypatch.setattr("src.main_app.utils.content._get_posts_directory", lambda: posts_dir)
+        yield posts_dir
+        clear_content_cache()
+
+
+class TestRelatedPosts:
+    """Test the cached index and the post page section."""
+
+    def test_index_is_cached_per_generation(self, posts_dir):
+        """The index is built once and rebuilt after the content cache is cleared."""
+        first = related.get_related_index()
+        assert related.get_related_index() is first
+
+        clear_content_cache()
+        second = related.get_related_index()
+        assert second is not first
+        assert second.tokenized == 0
+
+    def test_rebuild_reads_only_changed_files(self, posts_dir, monkeypatch):
+        """Posts whose source file is unchanged are not read again on a rebuild."""
+        related.get_related_index()
+        reads = []
+        load = related.load_raw_content
+        monkeypatch.setattr(related, "load_raw_content", lambda slug: reads.append(slug) or load(slug))
+        (posts_dir / "sourdough.md").write_text(
+            f"---\ntitle: sourdough\ndate: 2025-01-10\ntags: {TAGS['sourdough']}\n---\n\nA longer starter story.\n"
+        )
+
+        clear_content_cache()
+        assert related.get_related_index().tokenized == 1
+        assert reads == ["sourdough"]
+
+    def test_post_page_lists_related_posts(self, posts_dir):
+        """Post pages link to their related posts."""
+        from src.main_app.app import app
+
+        response = TestClient(app).get("/posts/sourdough")
+
+        assert response.status_code == 200
+        assert "Related posts" in response.text
+        assert 'href="/posts/baguettes"' in response.text
+        assert [post.slug for post in get_related_posts("sourdough")][0] == "baguettes"
+
+    def test_post_page_without_related_posts(self, posts_dir):
+        """The section is omitted when no post is related."""
+        from src.main_app.app import app
+
+        response = TestClient(app).get("/posts/untagged")
+
+        assert response.status_code == 200
+        assert "Related posts" not in response.text
@@ -0,0 +1,116 @@
+"""Tests for typed post records and frontmatter validation."""
+
+from datetime import date, datetime
+
+import pytest
+
+from src.main_app.utils.content import clear_content_cache, load_all_posts
+from src.main_app.utils.schema import (
+    UNDATED,
+    Post,
+    PostError,
+    PostMeta,
+    parse_date,
+    read_header,
+    validate_metadata,
+)
+
+
+class TestSchema:
+    """Test date parsing and frontmatter validation."""
+
+    def test_parse_date(self):
+        """Test accepted formats, timezone normalization and the deterministic fallback."""
+        assert parse_date(date(2024, 1, 2)) == datetime(2024, 1, 2)
+        assert parse_date("2024-01-02T10:00:00+02:00") == datetime(2024, 1, 2, 8, 0)
+        assert parse_date("not a date") == UNDATED
+        assert parse_date(None) == UNDATED
+        with pytest.raises(PostError):
+            parse_date("not a date", strict=True)
+
+    def test_lenient_coercion(self):
+        """Test that lenient validation coerces values instead of failing."""
+        fields = validate_metadata({"tags": "Python", "excerpt": 3})
+
+        assert fields["title"] == "Untitled"
+        assert fields["tags"] == ["python"]
+        assert fields["excerpt"] == "3"
+        assert fields["date"] == UNDATED
+
+    def test_strict_rejections(self):
+        """Test that strict validation rejects schema violations."""
+        valid = {"title": "T", "date": "2024-01-01"}
+        with pytest.raises(PostError, match="title"):
+            validate_metadata({"date": "2024-01-01"}, strict=True)
+        with pytest.raises(PostError, match="Tags"):
+            validate_metadata({**valid, "tags": [1, 2]}, strict=True)
+        assert validate_metadata(valid, strict=True)["tags"] == []
+        with pytest.raises(PostError, match="Draft"):
+            validate_metadata({**valid, "draft": "maybe"}, strict=True)
+
+    def test_draft_flag(self):
+        """Test that drafts default to false and lenient mode coerces strings."""
+        assert validate_metadata({"title": "T"})["draft"] is False
+        assert validate_metadata({"title": "T", "date": "2024-01-01", "draft": True}, strict=True)["draft"] is True
+        assert validate_metadata({"title": "T", "draft": "yes"})["draft"] is True
+        assert validate_metadata({"title": "T", "draft": "false"})["draft"] is False
+
+    def test_mapping_access(self):
+        """Test that posts support mapping-style access for older callers."""
+        post = Post("s", "Title", UNDATED, [], "", "<p></p>", "")
+
+        assert post["title"] == post.title
+        with pytest.raises(KeyError):
+            post["missing"]
+
+
+class TestReadHeader:
+    """Test the header-only frontmatter reader."""
+
+    def test_reads_frontmatter(self, tmp_path):
+        """Test that the frontmatter block is parsed."""
+        path = tmp_path / "post.md"
+        path.write_text('---\ntitle: "Hello"\ntags: [a]\n---\n# Body\n', encoding="utf-8")
+
+        assert read_header(path) == ({"title": "Hello", "tags": ["a"]}, 2)
+
+    def test_errors(self, tmp_path):
+        """Test unterminated, oversized and non-mapping frontmatter."""
+        path = tmp_path / "post.md"
+        for text, message in (
+            ("---\ntitle: x\n", "Unterminated"),
+            ("---\ntitle: " + "x" * 200 + "\n---\n", "larger"),
+            ("---\n- a\n---\n", "mapping"),
+        ):
+            path.write_text(text, encoding="utf-8")
+            with pytest.raises(PostError, match=message):
+                read_header(path, max_bytes=100)
+
+    def test_no_frontmatter(self, tmp_path):
+        """Test that files without frontmatter have an empty header and every line counts as body."""
+        path = tmp_path / "post.md"
+        path.write_text("# Just markdown\n\nand more words.\n", encoding="utf-8")
+
+        assert read_header(path) == ({}, 6)
+
+    def test_reading_minutes(self):
+        """Test that reading time rounds up and is at least a minute."""
+        meta = PostMeta("slug", "Title", UNDATED, [], "")
+        assert meta.reading_minutes == 1
+        assert PostMeta("slug", "Title", UNDATED, [], "", word_count=201).reading_minutes == 2
+
+
+class TestOrdering:
+    """Test that listings order deterministically."""
+
+    def test_undated_posts_sort_last(self, tmp_path, monkeypatch):
+        """Test that posts with bad dates sort last and ties order by slug."""
+        for slug, when in (("b", "2024-01-01"), ("a", "2024-01-01"), ("broken", "someday"), ("new", "2024-02-01")):
+            (tmp_path / f"{slug}.md").write_text(f'---\ntitle: "{slug}"\ndate: "{when}"\n---\nBody', encoding="utf-8")
+        monkeypatch.setenv("POSTS_DIR", str(tmp_path))
+        clear_content_cache()
+        try:
+            assert [post.slug for post in load_all_posts()] == ["new", "a", "b", "broken"]
+        finally:
+            monkeypatch.delenv("POSTS_DIR")
+            clear_content_cache()
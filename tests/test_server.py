@@ -0,0 +1,145 @@
+"""Tests for the production launcher."""
+
+import asyncio
+import importlib.util
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from pathlib import Path
+
+import httpx
+
+from src.main_app.server import (
+    WorkerServer,
+    available_cpus,
+    close_connections,
+    select_implementations,
+    worker_count,
+)
+
+ROOT = Path(__file__).resolve().parents[1]
+
+
+async def _ok(scope, receive, send):
+    await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/plain")]})
+    await send({"type": "http.response.body", "body": b"ok"})
+
+
+def _response_headers(app) -> list:
+    messages = []
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(app({"type": "http"}, None, send))
+    return messages[0]["headers"]
+
+
+class TestSizing:
+    """Test worker count and implementation selection."""
+
+    def test_cgroup_quota_caps_cpus(self, tmp_path, monkeypatch):
+        """A CPU quota below the affinity mask limits the CPU count, rounding up."""
+        monkeypatch.setattr("os.sched_getaffinity", lambda pid: set(range(8)))
+        cpu_max = tmp_path / "cpu.max"
+
+        cpu_max.write_text("150000 100000\n")
+        assert available_cpus(cpu_max) == 2
+        cpu_max.write_text("max 100000\n")
+        assert available_cpus(cpu_max) == 8
+        assert available_cpus(tmp_path / "missing") == 8
+
+    def test_web_concurrency_overrides(self, monkeypatch):
+        """WEB_CONCURRENCY sets the worker count; otherwise it follows the CPUs."""
+        monkeypatch.setenv("WEB_CONCURRENCY", "3")
+        assert worker_count() == 3
+
+        monkeypatch.delenv("WEB_CONCURRENCY")
+        monkeypatch.setattr("src.main_app.server.available_cpus", lambda: 5)
+        assert worker_count() == 5
+
+    def test_implementations_fall_back(self, monkeypatch):
+        """uvloop and httptools are used when present, asyncio and h11 otherwise."""
+        monkeypatch.setattr(importlib.util, "find_spec", lambda name: object())
+        assert select_implementations() == ("uvloop", "httptools")
+
+        monkeypatch.setattr(importlib.util, "find_spec", lambda name: None)
+        assert select_implementations() == ("asyncio", "h11")
+
+
+class TestDraining:
+    """Test that draining workers end keep-alive connections."""
+
+    def test_connection_close_only_while_draining(self):
+        """Responses are marked Connection: close once the worker drains."""
+        server = WorkerServer.__new__(WorkerServer)
+        app = close_connections(_ok, server)
+
+        assert (b"connection", b"close") not in _response_headers(app)
+        server.draining = True
+        assert (b"connection", b"close") in _response_headers(app)
+
+
+class TestSupervisor:
+    """Test the supervisor end to end."""
+
+    def test_roll_and_stop_without_dropping_requests(self):
+        """SIGHUP replaces every worker while requests keep succeeding, and SIGTERM exits cleanly."""
+        with socket.socket() as probe:
+            probe.bind(("127.0.0.1", 0))
+            port = probe.getsockname()[1]
+
+        process = subprocess.Popen(
+            [sys.executable, "-m", "src.main_app.server", "--host", "127.0.0.1", "--port", str(port), "--workers", "2"],
+            cwd=ROOT,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        output: list[str] = []
+        threading.Thread(target=lambda: output.extend(process.stdout), daemon=True).start()
+        url = f"http://127.0.0.1:{port}/health"
+        try:
+            for _ in range(100):
+                try:
+                    httpx.get(url)
+                    break
+                except httpx.TransportError:
+                    time.sleep(0.1)
+
+            results: list = []
+            done = threading.Event()
+
+            def load():
+                with httpx.Client() as client:
+                    while not done.is_set():
+                        try:
+                            results.append(client.get(url).status_code)
+                        except httpx.HTTPError as e:
+                            results.append(repr(e))
+
+            clients = [threading.Thread(target=load) for _ in range(2)]
+            for client in clients:
+                client.start()
+            process.send_signal(signal.SIGHUP)
+            deadline = time.monotonic() + 30
+            while not any("Rolled 2 workers" in line for line in output) and time.monotonic() < deadline:
+                time.sleep(0.1)
+            done.set()
+            for client in clients:
+                client.join()
+            fds = Path(f"/proc/{process.pid}/fd")
+            readiness_pipes = [fd for fd in fds.iterdir() if int(fd.name) > 2 and "pipe" in str(fd.readlink())]
+
+            process.send_signal(signal.SIGTERM)
+            assert process.wait(timeout=30) == 0
+        finally:
+            if process.poll() is None:
+                process.kill()
+
+        assert any("Rolled 2 workers" in line for line in output)
+        assert results and set(results) == {200}
+        assert readiness_pipes == []
@@ -0,0 +1,67 @@
+"""Tests for the worker start-up profile."""
+
+from src.main_app.tools.startup import HEAVY_MODULES, compare, parse_importtime, run, summarize_importtime
+
+IMPORTTIME = """\
+import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       2000 |     yaml.reader
+import time:      3000 |       5000 |   yaml
+import time:       500 |       5500 | src.main_app.utils.schema
+"""
+
+
+def _result(import_ms: float, heavy: list[str]) -> dict:
+    timing = {"mean_ms": import_ms, "p50_ms": import_ms}
+    return {
+        "modes": {
+            "compiled": {
+                "process": timing,
+                "import": timing,
+                "first_request": timing,
+                "heavy_modules": {"after_import": heavy, "after_request": heavy},
+            }
+        }
+    }
+
+
+class TestImportTime:
+    """Test parsing and summarizing ``-X importtime`` output."""
+
+    def test_parse(self):
+        """Every module line is parsed with its times and nesting depth."""
+        modules = parse_importtime(IMPORTTIME)
+
+        assert [m["module"] for m in modules] == ["_io", "yaml.reader", "yaml", "src.main_app.utils.schema"]
+        assert modules[2] == {"module": "yaml", "self_us": 3000, "cumulative_us": 5000, "depth": 1}
+        assert modules[1]["depth"] == 2
+        assert modules[3]["depth"] == 0
+
+    def test_summarize(self):
+        """Self time is grouped by package, and application modules are listed."""
+        summary = summarize_importtime(parse_importtime(IMPORTTIME), top=2)
+
+        assert summary["total_ms"] == 5.62
+        assert [row["module"] for row in summary["top_cumulative"]] == ["src.main_app.utils.schema", "yaml"]
+        assert summary["packages"] == {"yaml": 5.0, "src": 0.5}
+        assert [row["module"] for row in summary["app_modules"]] == ["src.main_app.utils.schema"]
+
+
+class TestStartupProfile:
+    """Test profiling real worker start-up."""
+
+    def test_compiled_workers_skip_rendering_dependencies(self):
+        """A worker serving compiled posts imports none of the markdown rendering stack."""
+        mode = run(["compiled"], repeat=1, top=5)["modes"]["compiled"]
+
+        assert mode["status"] == 200
+        assert mode["heavy_modules"] == {"after_import": [], "after_request": []}
+        assert mode["import"]["count"] == 1
+        assert any(row["module"] == "src.main_app.app" for row in mode["importtime"]["app_modules"])
+
+    def test_compare_reports_timings_and_heavy_imports(self):
+        """Comparisons show the change of each timing and newly imported heavy modules."""
+        lines = compare(_result(100.0, []), _result(80.0, [HEAVY_MODULES[0]]))
+
+        assert any(line.startswith("compiled.import.p50_ms") and line.endswith("-20.0%") for line in lines)
+        assert lines[-1] == f"compiled: now imports {HEAVY_MODULES[0]} at start-up"
@@ -0,0 +1,64 @@
+"""Tests for streamed rendering of long posts."""
+
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.components import STREAM_SLOT
+from src.main_app.routes.posts import _chunks
+from src.main_app.utils.content import load_post
+from src.main_app.utils.pagecache import RENDERED_PAGES
+
+SLUG = "welcome-to-my-blog"
+
+
+class TestStreamedPosts:
+    """Test that long posts are streamed in chunks."""
+
+    def setup_method(self):
+        """Set up test client and render every page again."""
+        self.client = TestClient(app)
+        RENDERED_PAGES.clear()
+
+    def test_chunks_cover_input_and_end_after_tags(self):
+        """Test that chunks reassemble to the input and split after a tag."""
+        html = "<p>" + "word " * 50 + "</p>" * 20
+        chunks = list(_chunks(html, size=16))
+
+        assert "".join(chunks) == html
+        assert len(chunks) > 1
+        assert all(chunk.endswith(">") for chunk in chunks[:-1])
+
+    def test_short_posts_are_not_streamed(self):
+        """Test that posts under the threshold get a regular response."""
+        response = self.client.get(f"/posts/{SLUG}")
+
+        assert response.status_code == 200
+        assert "content-length" in response.headers
+
+    def test_post_page_shows_reading_time(self):
+        """Test that the post header shows the precomputed reading time."""
+        response = self.client.get(f"/posts/{SLUG}")
+
+        assert f"{load_post(SLUG).reading_minutes} min read" in response.text
+
+    def test_long_posts_are_streamed(self, monkeypatch):
+        """Test that posts over the threshold stream the whole document."""
+        monkeypatch.setenv("STREAM_THRESHOLD_BYTES", "1")
+        response = self.client.get(f"/posts/{SLUG}", headers={"Accept-Encoding": "identity"})
+
+        assert response.status_code == 200
+        assert "content-length" not in response.headers
+        assert response.headers["content-type"].startswith("text/html")
+        assert response.headers["Cache-Control"] == "public, max-age=300"
+        assert response.text.index("Recent Posts") < response.text.index(load_post(SLUG)["content"])
+        assert STREAM_SLOT not in response.text
+        assert response.text.rstrip().endswith("</html>")
+
+    def test_streaming_with_gzip(self, monkeypatch):
+        """Test that streamed posts are compressed and decode to the same document."""
+        monkeypatch.setenv("STREAM_THRESHOLD_BYTES", "1")
+        plain = self.client.get(f"/posts/{SLUG}", headers={"Accept-Encoding": "identity"})
+        compressed = self.client.get(f"/posts/{SLUG}", headers={"Accept-Encoding": "gzip"})
+
+        assert compressed.headers["content-encoding"] == "gzip"
+        assert compressed.text == plain.text
@@ -0,0 +1,78 @@
+"""Tests for per-request Server-Timing instrumentation."""
+
+import logging
+
+from starlette.testclient import TestClient
+
+from src.main_app.app import app
+from src.main_app.utils.pagecache import RENDERED_PAGES
+from src.main_app.utils.timing import RequestTimings, ServerTimingMiddleware, phase, timed
+
+
+class TestRequestTimings:
+    """Test exclusive phase accounting."""
+
+    def test_nested_phases_are_exclusive(self):
+        """Test that nested phases are not double counted."""
+        timings = RequestTimings()
+        timings.push("layout")
+        timings.push("content")
+        timings.pop("content")
+        timings.pop("layout")
+
+        phases = timings.phases()
+        assert set(phases) == {"layout", "content", "middleware", "total"}
+        assert abs(sum(v for k, v in phases.items() if k != "total") - phases["total"]) < 1.0
+
+    def test_pop_ignores_phase_that_is_not_innermost(self):
+        """Test that mismatched pops leave the stack untouched."""
+        timings = RequestTimings()
+        timings.push("layout")
+        timings.pop("render")
+        timings.unwind()
+
+        assert "layout" in timings.durations
+        assert "render" not in timings.durations
+
+    def test_header_format(self):
+        """Test the Server-Timing header syntax."""
+        timings = RequestTimings()
+        timings.push("content")
+        timings.unwind()
+
+        assert timings.header().startswith("content;dur=")
+        assert "total;dur=" in timings.header()
+
+    def test_helpers_are_noops_without_active_request(self):
+        """Test that phase helpers work outside an instrumented request."""
+
+        @timed("content")
+        def work():
+            return 42
+
+        with phase("layout"):
+            assert work() == 42
+
+
+class TestServerTimingMiddleware:
+    """Test Server-Timing headers through the full application."""
+
+    def test_disabled_by_default(self):
+        """Test that the app does not emit timings unless enabled."""
+        response = TestClient(app).get("/")
+        assert "Server-Timing" not in response.headers
+
+    def test_enabled_reports_phases(self, caplog):
+        """Test that enabled timing reports every phase and logs the request."""
+        client = TestClient(ServerTimingMiddleware(app, enabled=True))
+        RENDERED_PAGES.clear()
+
+        with caplog.at_level(logging.INFO, logger="src.main_app.utils.timing"):
+            response = client.get("/posts/welcome-to-my-blog", headers={"Accept-Encoding": "gzip"})
+
+        assert response.status_code == 200
+        header = response.headers["Server-Timing"]
+        for name in ("layout", "render", "compress", "middleware", "total"):
+            assert f"{name};dur=" in header
+
+        assert any('"path": "/posts/welcome-to-my-blog"' in record.message for record in caplog.records)